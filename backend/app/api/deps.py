@@ -1,10 +1,15 @@
-from typing import Optional
+from typing import Iterable, Optional
 
-from fastapi import Depends, HTTPException, status
+from fastapi import Depends, HTTPException, Query, Request, status
 from fastapi.security import OAuth2PasswordBearer
-from jose import jwt, JWTError
 from app.core.config import settings
-from app.core.security import ALGORITHM
+from app.core.ratelimit import client_ip, ip_allowed
+from app.core.security import decode_access_token
+from app.db.session import read_session
+from app.db.tags import TagFilter
+
+# Upper bound on ids= for the batch endpoints: one IN list, one response
+MAX_BATCH_IDS = 100
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/api/v1/login/token")
 oauth2_scheme_optional = OAuth2PasswordBearer(tokenUrl="/api/v1/login/token", auto_error=False)
@@ -15,12 +20,12 @@ async def get_current_user(token: str = Depends(oauth2_scheme)):
         detail="Could not validate credentials",
         headers={"WWW-Authenticate": "Bearer"},
     )
-    try:
-        payload = jwt.decode(token, settings.JWT_SECRET_KEY, algorithms=[ALGORITHM])
-        username: str = payload.get("sub")
-        if username is None:
-            raise credentials_exception
-    except JWTError:
+    # Verified claims are cached per token until its exp; revoked tokens come back as None
+    payload = decode_access_token(token)
+    if payload is None:
+        raise credentials_exception
+    username: str = payload.get("sub")
+    if username is None:
         raise credentials_exception
     return username
 
@@ -29,9 +34,70 @@ async def get_current_user_optional(token: Optional[str] = Depends(oauth2_scheme
     """Return username if valid token present, else None. Use when endpoint allows both public and admin access."""
     if not token:
         return None
+    payload = decode_access_token(token)
+    return payload.get("sub") if payload else None
+
+
+async def require_metrics_access(request: Request, current_user: Optional[str] = Depends(get_current_user_optional)) -> None:
+    """/metrics carries route latencies and slow-query SQL: the admin, or a scraper on METRICS_ALLOWED_IPS."""
+    if current_user is None and not ip_allowed(client_ip(request), settings.METRICS_ALLOWED_IPS):
+        raise HTTPException(status_code=403, detail="Not allowed to read metrics")
+
+
+async def get_read_session(current_user: Optional[str] = Depends(get_current_user_optional)):
+    """
+    Session for read-only endpoints. Anonymous reads may go to the read replica
+    (DATABASE_READ_URL); the admin always reads from the primary, so it sees its own writes.
+    """
+    async with read_session(use_replica=current_user is None) as session:
+        yield session
+
+
+def sparse_fields(allowed: Iterable[str]):
+    """
+    Build a dependency for the `fields=` sparse-fieldset query parameter.
+    It resolves to the requested names in `allowed` order (`id` is always kept),
+    or None when the client wants every field.
+    """
+    allowed = tuple(allowed)
+
+    def dependency(
+        fields: Optional[str] = Query(None, description=f"Comma-separated subset of: {', '.join(allowed)}"),
+    ) -> Optional[tuple[str, ...]]:
+        if not fields:
+            return None
+        requested = {name.strip() for name in fields.split(",") if name.strip()}
+        unknown = requested.difference(allowed)
+        if unknown:
+            raise HTTPException(status_code=400, detail=f"Unknown fields: {', '.join(sorted(unknown))}")
+        return tuple(name for name in allowed if name in requested or name == "id")
+
+    return dependency
+
+
+def batch_ids(
+    ids: str = Query(..., description=f"Comma-separated ids (at most {MAX_BATCH_IDS}), returned in this order"),
+) -> tuple[int, ...]:
+    """The `ids=` list of a batch endpoint, deduplicated, in the requested order."""
     try:
-        payload = jwt.decode(token, settings.JWT_SECRET_KEY, algorithms=[ALGORITHM])
-        username: Optional[str] = payload.get("sub")
-        return username
-    except JWTError:
-        return None
\ No newline at end of file
+        requested = tuple(dict.fromkeys(int(value) for value in ids.split(",") if value.strip()))
+    except ValueError:
+        raise HTTPException(status_code=400, detail="ids must be comma-separated integers")
+    if not requested:
+        raise HTTPException(status_code=400, detail="ids is empty")
+    if len(requested) > MAX_BATCH_IDS:
+        raise HTTPException(status_code=400, detail=f"At most {MAX_BATCH_IDS} ids per request")
+    return requested
+
+
+def _split_tags(value: Optional[str]) -> tuple[str, ...]:
+    return tuple(dict.fromkeys(tag.strip() for tag in (value or "").split(",") if tag.strip()))
+
+
+def tag_filter(
+    tag: Optional[str] = Query(None, description="Only items carrying this tag"),
+    tags_any: Optional[str] = Query(None, description="Comma-separated; items carrying at least one of these tags"),
+    tags_all: Optional[str] = Query(None, description="Comma-separated; items carrying every one of these tags"),
+) -> TagFilter:
+    """`tag` is shorthand for a one-element `tags_all`."""
+    return TagFilter(any=_split_tags(tags_any), all=_split_tags(",".join(filter(None, (tag, tags_all)))))
@@ -0,0 +1,80 @@
+"""
+/feed.xml (RSS 2.0), /atom.xml and /sitemap.xml at the site root.
+
+A miss streams the document from the database (see app/db/feeds.py) while
+keeping a copy of the chunks; once the stream finishes, documents up to
+FEED_CACHE_MAX_BYTES are cached under the "feeds" namespace, which the blog
+and project write handlers invalidate. Larger documents are streamed every
+time and lean on conditional GET instead.
+"""
+from typing import AsyncIterator
+
+from fastapi import APIRouter, Depends, Request
+from fastapi.responses import Response, StreamingResponse
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from app.api.deps import get_read_session
+from app.core.cache import response_cache
+from app.core.conditional import Validator, is_not_modified, make_validator, not_modified_response, with_validator
+from app.core.config import settings
+from app.core.render import RENDERER_VERSION
+from app.db.feeds import MEDIA_TYPES, FeedKind, feed_state, stream_feed
+
+router = APIRouter()
+
+
+def _site_url(request: Request) -> str:
+    return (settings.SITE_URL or str(request.base_url)).rstrip("/")
+
+
+async def _tee_into_cache(chunks: AsyncIterator[bytes], key: tuple, validator: Validator) -> AsyncIterator[bytes]:
+    """Pass chunks through, caching the whole document if it stays under FEED_CACHE_MAX_BYTES."""
+    kept: list[bytes] | None = []
+    size = 0
+    async for chunk in chunks:
+        if kept is not None:
+            size += len(chunk)
+            if size <= settings.FEED_CACHE_MAX_BYTES:
+                kept.append(chunk)
+            else:
+                kept = None
+        yield chunk
+    if kept is not None:
+        response_cache.set(key, (b"".join(kept), validator))
+
+
+async def _feed_response(kind: FeedKind, request: Request, session: AsyncSession) -> Response:
+    site_url = _site_url(request)
+    cache_key = ("feeds", kind, site_url)
+    cached = response_cache.get(cache_key)
+    if cached is not None:
+        body, validator = cached
+        if is_not_modified(request, validator):
+            return not_modified_response(validator)
+        return with_validator(Response(body, media_type=MEDIA_TYPES[kind]), validator)
+
+    count, last_modified = await feed_state(session, kind)
+    validator = make_validator(
+        "feeds", kind, site_url, settings.FEED_MAX_ITEMS, RENDERER_VERSION, count, last_modified=last_modified,
+    )
+    # Unlike the JSON collections, If-Modified-Since is honoured too: feed readers rely on it, and the
+    # only miss (a deleted post lingering until the next write) is harmless for a feed or sitemap
+    if is_not_modified(request, validator):
+        return not_modified_response(validator)
+    chunks = _tee_into_cache(stream_feed(kind, site_url, last_modified), cache_key, validator)
+    return with_validator(StreamingResponse(chunks, media_type=MEDIA_TYPES[kind]), validator)
+
+
+@router.get("/feed.xml", include_in_schema=False)
+async def rss_feed(request: Request, session: AsyncSession = Depends(get_read_session)):
+    return await _feed_response("rss", request, session)
+
+
+@router.get("/atom.xml", include_in_schema=False)
+async def atom_feed(request: Request, session: AsyncSession = Depends(get_read_session)):
+    return await _feed_response("atom", request, session)
+
+
+@router.get("/sitemap.xml", include_in_schema=False)
+async def sitemap(request: Request, session: AsyncSession = Depends(get_read_session)):
+    return await _feed_response("sitemap", request, session)
@@ -1,8 +1,11 @@
 from fastapi import APIRouter
-from app.api.v1.endpoints import blog, projects, login
+from app.api.v1.endpoints import admin, blog, images, projects, login, tags
 
 api_router = APIRouter()
 
 api_router.include_router(login.router, prefix="/login", tags=["auth"])
 api_router.include_router(blog.router, prefix="/blog", tags=["blog"])
-api_router.include_router(projects.router, prefix="/projects", tags=["projects"])
\ No newline at end of file
+api_router.include_router(projects.router, prefix="/projects", tags=["projects"])
+api_router.include_router(tags.router, prefix="/tags", tags=["tags"])
+api_router.include_router(images.router, prefix="/images", tags=["images"])
+api_router.include_router(admin.router, prefix="/admin", tags=["admin"])
\ No newline at end of file
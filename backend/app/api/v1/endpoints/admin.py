@@ -0,0 +1,79 @@
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from fastapi.responses import StreamingResponse
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from app.api.deps import get_current_user
+from app.core.cache import response_cache
+from app.core.config import settings
+from app.core.snapshot import export_snapshot, schedule_export
+from app.db import jobs
+from app.db.bulk import IMPORT_BATCH_SIZE, BulkKind, export_ndjson, import_ndjson
+from app.db.session import async_engine, get_session
+
+router = APIRouter()
+
+
+@router.get("/cache")
+async def read_cache_stats(username: str = Depends(get_current_user)):
+    """Hit/miss/eviction counters of this worker's response cache."""
+    return response_cache.stats()
+
+
+@router.delete("/cache")
+async def clear_cache(username: str = Depends(get_current_user)):
+    response_cache.clear()
+    return {"ok": True}
+
+
+@router.get("/jobs")
+async def read_job_queue(
+        session: AsyncSession = Depends(get_session),
+        username: str = Depends(get_current_user),
+    ):
+    """
+    Background job queue (app/db/jobs.py): depth per status and kind, latency of recently
+    finished jobs (wait = queued until started, including the coalescing delay) and the latest failures.
+    """
+    return await jobs.queue_stats(session)
+
+
+@router.post("/export")
+async def run_static_export(
+        full: bool = Query(False, description="Re-export every post instead of only those changed since the last run"),
+        username: str = Depends(get_current_user),
+    ):
+    """Write the public API snapshot to STATIC_EXPORT_DIR now."""
+    if not settings.STATIC_EXPORT_DIR:
+        raise HTTPException(status_code=400, detail="STATIC_EXPORT_DIR is not configured")
+    return await export_snapshot(settings.STATIC_EXPORT_DIR, full=full)
+
+
+@router.post("/import/{kind}")
+async def bulk_import(
+        kind: BulkKind,
+        request: Request,
+        batch_size: int = Query(IMPORT_BATCH_SIZE, ge=1, le=5000),
+        session: AsyncSession = Depends(get_session),
+        username: str = Depends(get_current_user),
+    ):
+    """
+    Import posts or projects from an NDJSON body (one object per line, e.g. an export).
+    Valid rows are committed in one transaction; invalid ones are reported by line number.
+    """
+    report = await import_ndjson(session, kind, request.stream(), batch_size=batch_size)
+    if report["inserted"]:
+        await schedule_export(session)
+    await session.commit()
+    if report["inserted"]:
+        response_cache.clear()
+    return report
+
+
+@router.get("/export/{kind}")
+async def bulk_export(kind: BulkKind, username: str = Depends(get_current_user)):
+    """Stream every post or project (drafts included) as NDJSON, in id order."""
+    return StreamingResponse(
+        export_ndjson(async_engine, kind),
+        media_type="application/x-ndjson",
+        headers={"Content-Disposition": f'attachment; filename="{kind}.ndjson"'},
+    )
@@ -1,69 +1,427 @@
+import asyncio
+import base64
+import json
 from datetime import datetime, timezone
 
-from fastapi import APIRouter, Depends, HTTPException, Query
-from sqlmodel import Session, select, func
-from typing import List, Dict, Any
+import orjson
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from pydantic import ValidationError
+from sqlalchemy import Select, tuple_, update
+from sqlmodel import select, func
+from sqlmodel.ext.asyncio.session import AsyncSession
+from typing import List, Dict, Any, Literal, Optional, Union
 
-from app.api.deps import get_current_user, get_current_user_optional
-from app.db.session import get_session
-from app.models.blog import Blog
+from app.api.deps import batch_ids, get_current_user, get_current_user_optional, get_read_session, sparse_fields, tag_filter
+from app.core.cache import response_cache
+from app.core.conditional import is_not_modified, latest, make_validator, not_modified_response, with_validator
+from app.core.patch import (
+    CONTENT_DIFF_MEDIA_TYPE, JSON_PATCH_MEDIA_TYPE, PatchError, PatchTestFailed, apply_content_diff, apply_json_patch,
+)
+from app.core.render import RENDERER_VERSION, render_markdown
+from app.core.responses import dump_json, encoded_json_response
+from app.core.snapshot import schedule_export
+from app.db import jobs, related, rendering, rollups, search, versions
+from app.db.session import async_engine, get_session
+from app.db.tags import TagFilter, apply_tag_filter, clear_tags, sync_tags
+from app.models.blog import Blog, BlogRender
+from app.schemas.blog import ArchiveMonth, BlogDetail, BlogEditable, BlogHTML, BlogSummary, BlogVersion
 
 router = APIRouter()
 
+BLOG_SUMMARY_FIELDS = tuple(BlogSummary.model_fields)
+BLOG_FIELDS = tuple(Blog.model_fields)
+
+# Posts without an excerpt fall back to the start of their content, cut in SQL
+EXCERPT_FALLBACK_LENGTH = 100
+
+
+def _summary_columns(fields: tuple[str, ...]) -> list:
+    """Columns for the list query; `content` is never loaded as a whole."""
+    columns = []
+    for name in fields:
+        if name == "excerpt":
+            columns.append(func.coalesce(Blog.excerpt, func.substr(Blog.content, 1, EXCERPT_FALLBACK_LENGTH)).label("excerpt"))
+        else:
+            columns.append(getattr(Blog, name))
+    # The cursor needs (created_at, id) even when the client didn't ask for them
+    for required in ("id", "created_at"):
+        if required not in fields:
+            columns.append(getattr(Blog, required))
+    return columns
+
+
+def _invalidate_caches() -> None:
+    """Drop every cached read a post write can change (post pages too: they link their neighbours by title)."""
+    for namespace in ("blog:post", "blog:list", "blog:batch", "blog:search", "blog:archive", "tags", "feeds"):
+        response_cache.invalidate(namespace)
+
+
+async def _schedule_render(session: AsyncSession, blog_id: int) -> None:
+    await jobs.enqueue(session, "render_post", f"render_post:{blog_id}", {"blog_id": blog_id})
+
+
+async def render_post_job(payload: dict) -> None:
+    """Job handler (app/db/jobs.py): store a post's rendered HTML after its latest edit."""
+    blog_id = payload["blog_id"]
+    if await rendering.render_committed_post(async_engine, blog_id):
+        # Feeds embed the stored HTML (and take its time as Last-Modified); single-post reads were rendering on the fly.
+        # Both formats are cached per post as ("blog:post", id, format)
+        for format in ("markdown", "html"):
+            response_cache.invalidate("blog:post", blog_id, format)
+        response_cache.invalidate("feeds")
+
+
+async def _schedule_related(session: AsyncSession, blog_id: int) -> None:
+    await jobs.enqueue(session, "related_posts", f"related_posts:{blog_id}", {"blog_id": blog_id})
+
+
+async def related_posts_job(payload: dict) -> None:
+    """
+    Job handler (app/db/jobs.py): update the related-post lists a post's latest write affects,
+    or rebuild them all ({"rebuild": true}, after a bulk import).
+    """
+    if payload.get("rebuild"):
+        from app.db.session import engine
+
+        await related.run_rebuild(engine)
+    else:
+        async with AsyncSession(async_engine) as session:
+            if not await related.run_update(session, payload["blog_id"]):
+                return
+            # Post documents embed their related posts
+            await versions.bump(session, "blog")
+            await schedule_export(session)
+            await session.commit()
+    response_cache.invalidate("blog:post")
+
+
+def _if_match_version(request: Request) -> Optional[int]:
+    """The post version named in If-Match ("7" or 7); None without the header."""
+    value = request.headers.get("if-match")
+    if value is None:
+        return None
+    try:
+        return int(value.strip().strip('"'))
+    except ValueError:
+        raise HTTPException(status_code=400, detail='If-Match must be the post version, e.g. "7"')
+
+
+async def _claim_version(session: AsyncSession, blog_id: int, expected: Optional[int]) -> None:
+    """
+    Bump the post's version first thing in the write transaction, only if it is still `expected`
+    (any version when None). The row stays locked until commit, so of two edits of the same
+    version exactly one gets through; the other gets 409 with the current version.
+    """
+    statement = update(Blog).where(Blog.id == blog_id)
+    if expected is not None:
+        statement = statement.where(Blog.version == expected)
+    if (await session.execute(statement.values(version=Blog.version + 1))).rowcount != 1:
+        current = await session.scalar(select(Blog.version).where(Blog.id == blog_id))
+        raise HTTPException(status_code=409, detail={"message": "Post was changed by another edit", "version": current})
+
+
+async def _save_update(session: AsyncSession, db_blog: Blog, changed: set[str], archived: Optional[rollups.Month]) -> None:
+    """
+    Write an edited post and keep its derived rows and jobs in step, in the caller's transaction.
+    `archived` is the post's archive month before the edit.
+    """
+    db_blog.updated_at = datetime.now(timezone.utc)
+    session.add(db_blog)
+    await session.flush()
+    if changed & {"title", "excerpt", "content"}:
+        await search.index_post(session, db_blog)
+    if "tags" in changed:
+        await sync_tags(session, Blog, db_blog.id, db_blog.tags)
+    if "content" in changed:
+        await _schedule_render(session, db_blog.id)
+    if changed & {"tags", "is_published", "created_at"}:
+        await _schedule_related(session, db_blog.id)
+    if changed & {"is_published", "created_at"}:
+        await rollups.refresh_archive(session, (archived, await rollups.locked_archive_month(session, db_blog.id)))
+    await versions.bump(session, "blog")
+    await schedule_export(session)
+
+
+def _encode_cursor(created_at: datetime, blog_id: int) -> str:
+    """Opaque keyset cursor pointing just past this row in (created_at, id) DESC order."""
+    raw = json.dumps([created_at.isoformat(), blog_id]).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def _decode_cursor(cursor: str) -> tuple[datetime, int]:
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        created_at, blog_id = json.loads(raw)
+        return datetime.fromisoformat(created_at), int(blog_id)
+    except (ValueError, TypeError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
+def list_posts_statement(
+    fields: tuple[str, ...],
+    *,
+    published: bool,
+    tags: TagFilter,
+    after: Optional[tuple[datetime, int]],
+    page: int,
+    size: int,
+) -> Select:
+    """
+    The list query: keyset seek past `after` (created_at, id) when given, OFFSET otherwise.
+    Served by ix_blog_published_created_at_id / ix_blog_created_at_id read backwards
+    (see tests/test_query_plans.py).
+    """
+    # (created_at, id) gives a stable total order so keyset paging never skips or repeats rows
+    statement = select(*_summary_columns(fields)).order_by(Blog.created_at.desc(), Blog.id.desc())
+    if published:
+        statement = statement.where(Blog.is_published == True)
+    statement = apply_tag_filter(statement, Blog, tags)
+    if after is not None:
+        statement = statement.where(tuple_(Blog.created_at, Blog.id) < after)
+    else:
+        statement = statement.offset((page - 1) * size)
+    return statement.limit(size + 1)
+
+
 # Read all Blog Posts (only published for anonymous; admin sees all including drafts)
 @router.get("/", response_model=Dict[str, Any])
-def read_posts(
+async def read_posts(
         *,
-        session: Session = Depends(get_session),
+        request: Request,
+        session: AsyncSession = Depends(get_read_session),
         current_user: str | None = Depends(get_current_user_optional),
         page: int = Query(1, ge=1),      # Which page, default 1
         size: int = Query(12, ge=1, le=100),  # How many records per page, default 12
-        published_only: bool = Query(False, description="When true, return only published posts (e.g. for landing)")
+        cursor: Optional[str] = Query(None, description="Opaque next_cursor from a previous response; switches to keyset paging"),
+        include_total: Optional[bool] = Query(None, description="Count matching posts (default: true for page mode, false for cursor mode)"),
+        published_only: bool = Query(False, description="When true, return only published posts (e.g. for landing)"),
+        fields: Optional[tuple[str, ...]] = Depends(sparse_fields(BLOG_SUMMARY_FIELDS)),
+        tags: TagFilter = Depends(tag_filter),
     ):
+    fields = fields or BLOG_SUMMARY_FIELDS
+    if include_total is None:
+        include_total = cursor is None
+
+    # Anonymous readers always get the published-only view, so published_only isn't part of the key
+    cache_key = ("blog:list", page, size, cursor, include_total, fields, tags)
+    if not current_user:
+        cached = response_cache.get(cache_key)
+        if cached is not None:
+            body, validator = cached
+            if is_not_modified(request, validator):
+                return not_modified_response(validator)
+            return with_validator(encoded_json_response(body), validator)
+
     # 1. published_only 或未登入：只顯示已發表；登入且唔要 published_only：顯示全部
-    list_statement = select(Blog).order_by(Blog.created_at.desc())
-    if published_only or not current_user:
-        list_statement = list_statement.where(Blog.is_published == True)
-
-    # 2. Total count for pagination (same filter)
-    total_statement = select(func.count()).select_from(Blog)
-    if published_only or not current_user:
-        total_statement = total_statement.where(Blog.is_published == True)
-    total = session.exec(total_statement).one()
-
-    # 3. Current page of items
-    offset = (page - 1) * size
-    list_statement = list_statement.offset(offset).limit(size)
-    results = session.exec(list_statement).all()
-
-    return {
-        "items": results,
-        "total": total,
-        "page": page,
-        "size": size
+    published = published_only or not current_user
+    # 2. Validator from the posts' write version (one primary-key read), not from the rows themselves
+    version, changed_at = await versions.current(session, "blog")
+    validator = make_validator(
+        "blog:list", published, page, size, cursor, include_total, fields, tags, version,
+        last_modified=changed_at,
+    )
+    if is_not_modified(request, validator):
+        return not_modified_response(validator)
+
+    # 3. Current page of items; one extra row is fetched to know whether a next page exists
+    after = _decode_cursor(cursor) if cursor is not None else None
+    list_statement = list_posts_statement(fields, published=published, tags=tags, after=after, page=page, size=size)
+    rows = (await session.exec(list_statement)).all()
+    next_cursor = _encode_cursor(rows[size - 1].created_at, rows[size - 1].id) if len(rows) > size else None
+    items = [{name: row._mapping[name] for name in fields} for row in rows[:size]]
+
+    # The total is a count over the whole filter: only when asked for (cursor paging skips it by default)
+    count = None
+    if include_total:
+        count_statement = select(func.count()).select_from(Blog)
+        if published:
+            count_statement = count_statement.where(Blog.is_published == True)
+        count = (await session.exec(apply_tag_filter(count_statement, Blog, tags))).one()
+
+    response = {
+        "items": items,
+        "total": count,
+        "size": size,
+        "next_cursor": next_cursor,
     }
+    if cursor is None:
+        response["page"] = page
+
+    # Encoded once; anonymous responses are cached as bytes so hits skip serialization entirely
+    body = dump_json(response)
+    if not current_user:
+        response_cache.set(cache_key, (body, validator))
+    return with_validator(encoded_json_response(body), validator)
+
+
+# Full-text search (same visibility rule as read_posts). Declared before /{blog_id} so "search" isn't parsed as an id
+@router.get("/search", response_model=Dict[str, Any])
+async def search_blog_posts(
+        *,
+        session: AsyncSession = Depends(get_read_session),
+        current_user: str | None = Depends(get_current_user_optional),
+        q: str = Query(..., min_length=1, max_length=200),
+        page: int = Query(1, ge=1),
+        size: int = Query(10, ge=1, le=50),
+        published_only: bool = Query(False, description="When true, return only published posts"),
+    ):
+    q = q.strip()
+    if not q:
+        raise HTTPException(status_code=400, detail="Empty search query")
+
+    cache_key = ("blog:search", q, page, size)
+    if not current_user:
+        cached = response_cache.get(cache_key)
+        if cached is not None:
+            return encoded_json_response(cached)
+
+    items = await search.search_posts(
+        session,
+        q,
+        published_only=published_only or not current_user,
+        limit=size,
+        offset=(page - 1) * size,
+    )
+    response = {"items": items, "q": q, "page": page, "size": size}
+    if not current_user:
+        # Anonymous responses are cached already encoded, so hits skip serialization entirely
+        body = dump_json(response)
+        response_cache.set(cache_key, body)
+        return encoded_json_response(body)
+    return response
+
+
+# Several posts by id in one query (same visibility rule as read_post). Declared before /{blog_id}
+@router.get("/batch", response_model=Dict[str, Any])
+async def read_posts_batch(
+        request: Request,
+        session: AsyncSession = Depends(get_read_session),
+        current_user: str | None = Depends(get_current_user_optional),
+        ids: tuple[int, ...] = Depends(batch_ids),
+        fields: Optional[tuple[str, ...]] = Depends(sparse_fields(BLOG_FIELDS)),
+    ):
+    """
+    Posts as read_post returns them, without the related/adjacent links, in the order of `ids`.
+    Ids that don't exist (or are drafts, for anonymous readers) are listed in `missing`.
+    """
+    fields = fields or BLOG_FIELDS
+    cache_key = ("blog:batch", ids, fields)
+    if not current_user:
+        cached = response_cache.get(cache_key)
+        if cached is not None:
+            body, validator = cached
+            if is_not_modified(request, validator, use_date=False):
+                return not_modified_response(validator)
+            return with_validator(encoded_json_response(body), validator)
+
+    # updated_at is the validator's source even when the client didn't ask for it
+    columns = [getattr(Blog, name) for name in dict.fromkeys((*fields, "updated_at"))]
+    statement = select(*columns).where(Blog.id.in_(ids))
+    if not current_user:
+        statement = statement.where(Blog.is_published == True)
+    found = {row.id: row for row in (await session.exec(statement)).all()}
+
+    validator = make_validator(
+        "blog:batch", current_user is not None, ids, fields, tuple(sorted(found)),
+        last_modified=max((row.updated_at for row in found.values()), default=None),
+    )
+    if is_not_modified(request, validator, use_date=False):
+        return not_modified_response(validator)
+    body = dump_json({
+        "items": [{name: found[blog_id]._mapping[name] for name in fields} for blog_id in ids if blog_id in found],
+        "missing": [blog_id for blog_id in ids if blog_id not in found],
+    })
+    if not current_user:
+        response_cache.set(cache_key, (body, validator))
+    return with_validator(encoded_json_response(body), validator)
+
+
+# Posts per month, from the blog_archive rollup (published posts only, for everyone). Declared before /{blog_id}
+@router.get("/archive", response_model=List[ArchiveMonth])
+async def read_archive(
+        request: Request,
+        session: AsyncSession = Depends(get_read_session),
+    ):
+    cached = response_cache.get(("blog:archive",))
+    if cached is not None:
+        body, validator = cached
+        if is_not_modified(request, validator, use_date=False):
+            return not_modified_response(validator)
+        return with_validator(encoded_json_response(body), validator)
+
+    # One row per month: the rollup is the whole body, so it's read before validating
+    months, last_modified = await rollups.read_archive(session)
+    validator = make_validator("blog:archive", len(months), last_modified=last_modified)
+    if is_not_modified(request, validator, use_date=False):
+        return not_modified_response(validator)
+    body = dump_json(months)
+    response_cache.set(("blog:archive",), (body, validator))
+    return with_validator(encoded_json_response(body), validator)
 
 
 # Read a specific Blog Post (drafts only visible to authenticated admin)
-@router.get("/{blog_id}", response_model=Blog)
-def read_post(
+@router.get("/{blog_id}", response_model=BlogDetail, responses={200: {"model": Union[BlogDetail, BlogHTML]}})
+async def read_post(
     blog_id: int,
-    session: Session = Depends(get_session),
+    request: Request,
+    session: AsyncSession = Depends(get_read_session),
     current_user: str | None = Depends(get_current_user_optional),
+    format: Literal["markdown", "html"] = Query("markdown", description="html: write-time rendered HTML, TOC and reading time instead of the Markdown source"),
 ):
-    blog = session.get(Blog, blog_id)
-    if not blog:
+    cache_key = ("blog:post", blog_id, format)
+    if not current_user:
+        cached = response_cache.get(cache_key)
+        if cached is not None:
+            body, validator = cached
+            if is_not_modified(request, validator):
+                return not_modified_response(validator)
+            return with_validator(encoded_json_response(body), validator)
+
+    # Validate against updated_at and the linked posts before loading the (possibly large) row
+    state = (await session.exec(
+        select(Blog.updated_at, Blog.created_at, Blog.is_published).where(Blog.id == blog_id)
+    )).first()
+    if not state:
         raise HTTPException(status_code=404, detail="Post not found")
-    if not blog.is_published and not current_user:
+    updated_at, created_at, is_published = state
+    if not is_published and not current_user:
         raise HTTPException(status_code=404, detail="Post not found")
-    return blog
+    links, linked = await related.post_links(session, blog_id, created_at)
+    # The linked posts' dates can't show a neighbour being deleted or a related list changing, but the
+    # blog's write version moves with both, so Last-Modified includes it and If-Modified-Since stays safe
+    changed_at = (await versions.current(session, "blog")).changed_at
+    validator = make_validator(
+        "blog:post", blog_id, format, RENDERER_VERSION if format == "html" else None, linked,
+        last_modified=latest(updated_at, changed_at, *(linked_at for _, linked_at in linked)),
+    )
+    if is_not_modified(request, validator):
+        return not_modified_response(validator)
+
+    blog = await session.get(Blog, blog_id)
+    if format == "html":
+        rendered = await session.get(BlogRender, blog_id)
+        if rendered is None or rendered.rendered_at < updated_at:
+            # Not backfilled yet (see `python -m app.cli render-posts`), or edited since and the
+            # render_post job hasn't caught up; render without storing
+            rendered = await asyncio.to_thread(render_markdown, blog.content)
+            rendered = {"content_html": rendered.html, **rendered._asdict()}
+        else:
+            rendered = rendered.model_dump()
+        response = BlogHTML.model_validate({**blog.model_dump(exclude={"content"}), **rendered, **links}).model_dump()
+    else:
+        response = {**blog.model_dump(), **links}
+
+    body = dump_json(response)
+    if not current_user:
+        response_cache.set(cache_key, (body, validator))
+    return with_validator(encoded_json_response(body), validator)
 
 
 # Create a new Blog Post
 @router.post("/", response_model=Blog)
-def create_post(
+async def create_post(
         blog_input: Blog, 
-        session: Session = Depends(get_session), 
+        session: AsyncSession = Depends(get_session), 
         username: str = Depends(get_current_user)
     ):
     """
@@ -75,50 +433,143 @@ def create_post(
     
     # Store the blog data in the session (temporary storage)
     session.add(db_blog)
+
+    # Flush to get the id, then index it in the same transaction
+    await session.flush()
+    await search.index_post(session, db_blog)
+    await sync_tags(session, Blog, db_blog.id, db_blog.tags)
+    # HTML, related posts, snapshot export: queued in this transaction, run after the response (app/db/jobs.py)
+    await _schedule_render(session, db_blog.id)
+    await _schedule_related(session, db_blog.id)
+    await rollups.refresh_archive(session, (rollups.archive_month(db_blog),))
+    await versions.bump(session, "blog")
+    await schedule_export(session)
     
     # Commit the changes to the database (save to the database)
-    session.commit()
+    await session.commit()
     
     # Refresh the blog object from the database (get the id or timestamp of the blog)
-    session.refresh(db_blog)
-    
+    await session.refresh(db_blog)
+
+    # A new post shifts every list page, and becomes a neighbour of the posts around it
+    _invalidate_caches()
+
     return db_blog
 
 
+@router.patch("/{blog_id}/delta", response_model=BlogVersion, openapi_extra={
+    "parameters": [{"name": "If-Match", "in": "header", "required": True, "schema": {"type": "string"},
+                    "description": 'Version the patch was made against, e.g. "7"'}],
+    "requestBody": {"required": True, "content": {
+        JSON_PATCH_MEDIA_TYPE: {"schema": {"type": "array", "items": {"type": "object"}},
+                                "example": [{"op": "replace", "path": "/title", "value": "New title"}]},
+        CONTENT_DIFF_MEDIA_TYPE: {"schema": {"type": "object"},
+                                  "example": {"content": [[120, 125, "new text"]], "is_published": True}},
+    }},
+})
+async def patch_post(
+        blog_id: int,
+        request: Request,
+        session: AsyncSession = Depends(get_session),
+        username: str = Depends(get_current_user)
+    ):
+    """
+    Edit part of a post without resending it: an RFC 6902 JSON Patch, or a content diff of
+    [start, end, text] splices against the base content (see app/core/patch.py). Answers 409
+    with the current version if If-Match is stale; the response carries the new version.
+    """
+    base = _if_match_version(request)
+    if base is None:
+        raise HTTPException(status_code=428, detail='If-Match with the post version (e.g. "7") is required')
+    media_type = request.headers.get("content-type", "").split(";", 1)[0].strip().lower()
+    if media_type not in (JSON_PATCH_MEDIA_TYPE, CONTENT_DIFF_MEDIA_TYPE):
+        raise HTTPException(status_code=415, detail=f"Use {JSON_PATCH_MEDIA_TYPE} or {CONTENT_DIFF_MEDIA_TYPE}")
+    try:
+        patch = orjson.loads(await request.body())
+    except orjson.JSONDecodeError as exc:
+        raise HTTPException(status_code=400, detail=f"Invalid JSON: {exc}")
+
+    db_blog = await session.get(Blog, blog_id)
+    if not db_blog:
+        raise HTTPException(status_code=404, detail="Post not found")
+    if db_blog.version != base:
+        raise HTTPException(status_code=409, detail={"message": "Post was changed by another edit", "version": db_blog.version})
+
+    document = {field: getattr(db_blog, field) for field in BlogEditable.model_fields}
+    try:
+        apply = apply_json_patch if media_type == JSON_PATCH_MEDIA_TYPE else apply_content_diff
+        edited = BlogEditable.model_validate(apply(document, patch)).model_dump()
+    except PatchTestFailed as exc:
+        raise HTTPException(status_code=409, detail={"message": str(exc), "version": db_blog.version})
+    except PatchError as exc:
+        raise HTTPException(status_code=422, detail=str(exc))
+    except ValidationError as exc:
+        raise HTTPException(status_code=422, detail="; ".join(
+            f"{'.'.join(map(str, error['loc']))}: {error['msg']}" for error in exc.errors()))
+
+    changed = [field for field in edited if edited[field] != document[field]]
+    if changed:
+        await _claim_version(session, blog_id, base)
+        archived = await rollups.locked_archive_month(session, blog_id)
+        for field in changed:
+            setattr(db_blog, field, edited[field])
+        await _save_update(session, db_blog, set(changed), archived)
+        await session.commit()
+        _invalidate_caches()
+    return BlogVersion(id=blog_id, version=db_blog.version, updated_at=db_blog.updated_at, changed=changed)
+
+
 @router.patch("/{blog_id}", response_model=Blog)
-def update_post(
+async def update_post(
         blog_id: int,
         blog_in: Blog,
-        session: Session = Depends(get_session),
+        request: Request,
+        session: AsyncSession = Depends(get_session),
         username: str = Depends(get_current_user)
     ):
-    db_blog = session.get(Blog, blog_id)
+    """Update the fields present in the body. With If-Match: "<version>", a stale version gets 409."""
+    db_blog = await session.get(Blog, blog_id)
     if not db_blog:
         raise HTTPException(status_code=404, detail="Post not found")
+    await _claim_version(session, blog_id, _if_match_version(request))
+    archived = await rollups.locked_archive_month(session, blog_id)
     
-    # Exclude id from being updated, update the rest of the fields dynamically
+    # Exclude id (and the version counter) from being updated, update the rest of the fields dynamically
     blog_data = blog_in.model_dump(exclude_unset=True)
     for key, value in blog_data.items():
-        if key != "id":
+        if key not in ("id", "version"):
             setattr(db_blog, key, value)
 
-    db_blog.updated_at = datetime.now(timezone.utc)
-    session.add(db_blog)
-    session.commit()
-    session.refresh(db_blog)
+    await _save_update(session, db_blog, set(blog_data), archived)
+    await session.commit()
+    await session.refresh(db_blog)
+
+    _invalidate_caches()
     return db_blog
 
 
 @router.delete("/{blog_id}")
-def delete_post(
+async def delete_post(
         blog_id: int,
-        session: Session = Depends(get_session),
+        session: AsyncSession = Depends(get_session),
         username: str = Depends(get_current_user)
     ):
-    db_blog = session.get(Blog, blog_id)
+    db_blog = await session.get(Blog, blog_id)
     if not db_blog:
         raise HTTPException(status_code=404, detail="Post not found")
     
-    session.delete(db_blog)
-    session.commit()
+    await clear_tags(session, Blog, blog_id)
+    await rendering.clear_render(session, blog_id)
+    await related.clear_related(session, blog_id)
+    archived = await rollups.locked_archive_month(session, blog_id)
+    await session.delete(db_blog)
+    await rollups.refresh_archive(session, (archived,))
+    # The lists that named the post are refilled afterwards
+    await _schedule_related(session, blog_id)
+    await search.unindex_post(session, blog_id)
+    await versions.bump(session, "blog")
+    await schedule_export(session)
+    await session.commit()
+
+    _invalidate_caches()
     return {"ok": True}
\ No newline at end of file
@@ -0,0 +1,72 @@
+from typing import List
+
+from fastapi import APIRouter, Depends, File, HTTPException, UploadFile
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from app.api.deps import get_current_user
+from app.core.cache import response_cache
+from app.core.images import UnsupportedImage
+from app.db import images, jobs
+from app.db.session import async_engine, get_session
+from app.models.image import ImageAsset
+
+router = APIRouter()
+
+
+async def process_image_job(payload: dict) -> None:
+    """Job handler (app/db/jobs.py): generate an upload's variants and publish them to its projects."""
+    counts = await images.process_images(async_engine, [payload["asset_id"]])
+    # Projects pointing at this image now carry its variants
+    response_cache.invalidate("projects:list")
+    if counts["failed"]:
+        # Retried with backoff; the asset's `error` has the details meanwhile
+        raise RuntimeError(f"image {payload['asset_id']} could not be processed")
+
+
+@router.post("/", status_code=202)
+async def upload_images(
+        files: List[UploadFile] = File(..., description="One or more JPEG/PNG/WebP/GIF/AVIF images"),
+        session: AsyncSession = Depends(get_session),
+        username: str = Depends(get_current_user),
+    ):
+    """
+    Store originals (content-addressed, so re-uploads are free) and queue their variants.
+    Set a project's `image` to the returned `url`; its `image_variants` fill in once processing is done.
+    """
+    # Every file is checked before any is stored, so a rejected request leaves no originals behind
+    checked = []
+    try:
+        for upload in files:
+            try:
+                checked.append(await images.check_upload(upload))
+            except images.UploadTooLarge as exc:
+                raise HTTPException(status_code=413, detail=str(exc))
+            except UnsupportedImage as exc:
+                raise HTTPException(status_code=415, detail=f"{upload.filename}: {exc}")
+
+        stored = []
+        for upload in checked:
+            asset, needs_processing = await images.store_upload(session, upload)
+            stored.append(asset)
+            if needs_processing:
+                # One job per image, due at once: the workers then spread uploads over the image pool
+                await jobs.enqueue(session, "process_image", f"process_image:{asset.id}", {"asset_id": asset.id}, delay=0)
+        await session.commit()
+    finally:
+        # Temp files not moved into place (the request failed, or the original was already there)
+        for upload in checked:
+            images.discard(upload)
+    return [images.as_dict(asset) for asset in stored]
+
+
+@router.get("/{asset_id}")
+async def read_image(
+        asset_id: str,
+        session: AsyncSession = Depends(get_session),
+        username: str = Depends(get_current_user),
+    ):
+    """Processing status and variant URLs of an upload."""
+    asset = await session.get(ImageAsset, asset_id)
+    if not asset:
+        raise HTTPException(status_code=404, detail="Image not found")
+    return images.as_dict(asset)
@@ -1,68 +1,217 @@
-from fastapi import APIRouter, Depends, HTTPException
-from sqlmodel import Session, select
-from typing import List
+from datetime import datetime, timezone
 
-from app.api.deps import get_current_user
+from fastapi import APIRouter, Depends, HTTPException, Request
+from sqlalchemy import Select
+from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
+from typing import Any, Dict, List, Optional
+
+from app.api.deps import batch_ids, get_current_user, get_read_session, sparse_fields, tag_filter
+from app.core.cache import response_cache
+from app.core.conditional import is_not_modified, make_validator, not_modified_response, with_validator
+from app.core.responses import dump_json, encoded_json_response
+from app.core.snapshot import schedule_export
+from app.db import rollups, versions
+from app.db.images import variants_for_image
 from app.db.session import get_session
-from app.models.project import Project
-from app.schemas.project import ProjectRead
+from app.db.tags import TagFilter, apply_tag_filter, clear_tags, sync_tags
+from app.models.project import Project, parse_order
+from app.schemas.project import CategoryCount, ProjectRead
 
 router = APIRouter()
 
+PROJECT_READ_FIELDS = tuple(ProjectRead.model_fields)
+
+
+def _invalidate_caches() -> None:
+    """Drop every cached read a project write can change."""
+    # "feeds": the sitemap's home-page <lastmod> follows the projects
+    for namespace in ("projects:list", "projects:batch", "projects:categories", "tags", "feeds"):
+        response_cache.invalidate(namespace)
+
+
+def _normalize_order(project_in: Project) -> None:
+    # Table models skip validation on input, so the string form of `order` is coerced here.
+    # Only when sent: assigning would mark it as set and a PATCH would reset it.
+    if "order" not in project_in.model_fields_set:
+        return
+    try:
+        project_in.order = parse_order(project_in.order)
+    except ValueError:
+        raise HTTPException(status_code=422, detail="order must be an integer")
+
+
+def list_projects_statement(fields: tuple[str, ...], tags: TagFilter) -> Select:
+    """The list query, served by ix_project_order_updated_at (see tests/test_query_plans.py)."""
+    # The columns are exactly ProjectRead's (or the requested subset), so the rows are sent as-is
+    statement = select(*[getattr(Project, name) for name in fields]).order_by(Project.order, Project.updated_at.desc())
+    return apply_tag_filter(statement, Project, tags)
+
+
 @router.get("/", response_model=List[ProjectRead])
-def read_projects(session: Session = Depends(get_session)):
-    statement = select(Project).order_by(Project.order, Project.updated_at.desc())
-    return session.exec(statement).all()
+async def read_projects(
+        request: Request,
+        session: AsyncSession = Depends(get_read_session),
+        fields: Optional[tuple[str, ...]] = Depends(sparse_fields(PROJECT_READ_FIELDS)),
+        tags: TagFilter = Depends(tag_filter),
+    ):
+    # Projects have no drafts, so admin and anonymous readers share one cached, pre-encoded list per query
+    cache_key = ("projects:list", fields, tags)
+    cached = response_cache.get(cache_key)
+    if cached is not None:
+        body, validator = cached
+        if is_not_modified(request, validator):
+            return not_modified_response(validator)
+        return with_validator(encoded_json_response(body), validator)
+
+    # Validator from the projects' write version (one primary-key read), not from the rows themselves
+    version, changed_at = await versions.current(session, "projects")
+    validator = make_validator("projects:list", fields, tags, version, last_modified=changed_at)
+    if is_not_modified(request, validator):
+        return not_modified_response(validator)
+
+    statement = list_projects_statement(fields or PROJECT_READ_FIELDS, tags)
+    body = dump_json([dict(row._mapping) for row in (await session.exec(statement)).all()])
+    response_cache.set(cache_key, (body, validator))
+    return with_validator(encoded_json_response(body), validator)
+
+
+# Several projects by id in one query; ids that don't exist are listed in `missing`
+@router.get("/batch", response_model=Dict[str, Any])
+async def read_projects_batch(
+        request: Request,
+        session: AsyncSession = Depends(get_read_session),
+        ids: tuple[int, ...] = Depends(batch_ids),
+        fields: Optional[tuple[str, ...]] = Depends(sparse_fields(PROJECT_READ_FIELDS)),
+    ):
+    fields = fields or PROJECT_READ_FIELDS
+    # No drafts: admin and anonymous readers share the cached body, as with read_projects
+    cache_key = ("projects:batch", ids, fields)
+    cached = response_cache.get(cache_key)
+    if cached is not None:
+        body, validator = cached
+        if is_not_modified(request, validator, use_date=False):
+            return not_modified_response(validator)
+        return with_validator(encoded_json_response(body), validator)
+
+    columns = [getattr(Project, name) for name in dict.fromkeys((*fields, "updated_at"))]
+    found = {row.id: row for row in (await session.exec(select(*columns).where(Project.id.in_(ids)))).all()}
+
+    validator = make_validator(
+        "projects:batch", ids, fields, tuple(sorted(found)),
+        last_modified=max((row.updated_at for row in found.values()), default=None),
+    )
+    if is_not_modified(request, validator, use_date=False):
+        return not_modified_response(validator)
+    body = dump_json({
+        "items": [{name: found[project_id]._mapping[name] for name in fields} for project_id in ids if project_id in found],
+        "missing": [project_id for project_id in ids if project_id not in found],
+    })
+    response_cache.set(cache_key, (body, validator))
+    return with_validator(encoded_json_response(body), validator)
+
+
+# Projects per category, from the project_category rollup
+@router.get("/categories", response_model=List[CategoryCount])
+async def read_categories(
+        request: Request,
+        session: AsyncSession = Depends(get_read_session),
+    ):
+    cached = response_cache.get(("projects:categories",))
+    if cached is not None:
+        body, validator = cached
+        if is_not_modified(request, validator, use_date=False):
+            return not_modified_response(validator)
+        return with_validator(encoded_json_response(body), validator)
+
+    # One row per category: the rollup is the whole body, so it's read before validating
+    categories, last_modified = await rollups.read_categories(session)
+    validator = make_validator("projects:categories", len(categories), last_modified=last_modified)
+    if is_not_modified(request, validator, use_date=False):
+        return not_modified_response(validator)
+    body = dump_json(categories)
+    response_cache.set(("projects:categories",), (body, validator))
+    return with_validator(encoded_json_response(body), validator)
 
 
 @router.post("/", response_model=Project)
-def create_project(
+async def create_project(
         *,
-        session: Session = Depends(get_session),
+        session: AsyncSession = Depends(get_session),
         project_in: Project,
         username: str = Depends(get_current_user)
     ):
     # db_project = Project.model_validate(project_in)
-    
+    _normalize_order(project_in)
+    # Derived from the image, never taken from the request body
+    project_in.image_variants = await variants_for_image(session, project_in.image)
+
     session.add(project_in)
-    session.commit()
-    session.refresh(project_in)
+    await session.flush()
+    await sync_tags(session, Project, project_in.id, project_in.tags)
+    await rollups.refresh_categories(session, (project_in.category,))
+    await versions.bump(session, "projects")
+    await schedule_export(session)
+    await session.commit()
+    await session.refresh(project_in)
+
+    _invalidate_caches()
     return project_in
 
 
 @router.patch("/{project_id}", response_model=Project)
-def update_project(
+async def update_project(
         project_id: int, 
         project_in: Project, 
-        session: Session = Depends(get_session),
+        session: AsyncSession = Depends(get_session),
         username: str = Depends(get_current_user)
     ):
-    db_project = session.get(Project, project_id)
+    # Row locked until commit, so the category recounted below as "old" is really the stored one
+    db_project = await session.get(Project, project_id, with_for_update=True)
     if not db_project:
         raise HTTPException(status_code=404, detail="Project not found")
     
     # Exclude id from being updated, update the rest of the fields dynamically
+    _normalize_order(project_in)
+    category = db_project.category
     project_data = project_in.model_dump(exclude_unset=True)
     for key, value in project_data.items():
-        if key != "id":
+        if key not in ("id", "image_variants"):
             setattr(db_project, key, value)
-            
+    if "image" in project_data:
+        db_project.image_variants = await variants_for_image(session, db_project.image)
+
+    db_project.updated_at = datetime.now(timezone.utc)
     session.add(db_project)
-    session.commit()
-    session.refresh(db_project)
+    if "tags" in project_data:
+        await sync_tags(session, Project, project_id, db_project.tags)
+    if db_project.category != category:
+        await rollups.refresh_categories(session, (category, db_project.category))
+    await versions.bump(session, "projects")
+    await schedule_export(session)
+    await session.commit()
+    await session.refresh(db_project)
+
+    _invalidate_caches()
     return db_project
 
 
 @router.delete("/{project_id}")
-def delete_project(
+async def delete_project(
         project_id: int, 
-        session: Session = Depends(get_session), 
+        session: AsyncSession = Depends(get_session), 
         username: str = Depends(get_current_user)
     ):
-    db_project = session.get(Project, project_id)
+    db_project = await session.get(Project, project_id, with_for_update=True)
     if not db_project:
         raise HTTPException(status_code=404, detail="Project not found")
     
-    session.delete(db_project)
-    session.commit()
+    await clear_tags(session, Project, project_id)
+    await session.delete(db_project)
+    await rollups.refresh_categories(session, (db_project.category,))
+    await versions.bump(session, "projects")
+    await schedule_export(session)
+    await session.commit()
+
+    _invalidate_caches()
     return {"ok": True}
\ No newline at end of file
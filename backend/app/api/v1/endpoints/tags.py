@@ -0,0 +1,34 @@
+from typing import Any, Dict
+
+from fastapi import APIRouter, Depends
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from app.api.deps import get_current_user_optional, get_read_session
+from app.core.cache import response_cache
+from app.core.responses import dump_json, encoded_json_response
+from app.db.tags import tag_counts
+from app.models.blog import Blog
+from app.models.project import Project
+
+router = APIRouter()
+
+# Tag cloud: per-tag counts for posts (published only unless admin) and projects
+@router.get("/", response_model=Dict[str, Any])
+async def read_tags(
+        session: AsyncSession = Depends(get_read_session),
+        current_user: str | None = Depends(get_current_user_optional),
+    ):
+    if not current_user:
+        cached = response_cache.get(("tags",))
+        if cached is not None:
+            return encoded_json_response(cached)
+
+    response = {
+        "blog": await tag_counts(session, Blog, published_only=not current_user),
+        "projects": await tag_counts(session, Project),
+    }
+    if not current_user:
+        body = dump_json(response)
+        response_cache.set(("tags",), body)
+        return encoded_json_response(body)
+    return response
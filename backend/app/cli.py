@@ -0,0 +1,170 @@
+"""
+Backend maintenance commands.
+
+    python -m app.cli seed [--migrate]
+    python -m app.cli render-posts [--force]
+    python -m app.cli related-posts
+    python -m app.cli rollups [--check]
+    python -m app.cli export-static [--out DIR] [--full]
+    python -m app.cli import-ndjson {blog,projects} FILE
+    python -m app.cli export-ndjson {blog,projects} [--out FILE]
+    python -m app.cli process-images [--force]
+"""
+import argparse
+import asyncio
+
+
+def seed(args: argparse.Namespace) -> None:
+    from app.db.schema import upgrade_to_head
+    from app.db.seed import seed_database
+    from app.db.session import engine
+
+    if args.migrate:
+        upgrade_to_head()
+    inserted = seed_database(engine)
+    print(f"Seeded {inserted['posts']} post(s) and {inserted['projects']} project(s)")
+
+
+def render_posts(args: argparse.Namespace) -> None:
+    from app.db.rendering import render_stale_posts
+    from app.db.session import engine
+
+    count = render_stale_posts(engine, force=args.force)
+    print(f"Rendered {count} post(s)")
+
+
+def related_posts(args: argparse.Namespace) -> None:
+    from app.db.related import rebuild_related
+    from app.db.session import engine
+
+    count = rebuild_related(engine)
+    print(f"Rebuilt related posts for {count} post(s)")
+
+
+def rollups(args: argparse.Namespace) -> None:
+    from app.db.rollups import rebuild_rollups
+    from app.db.session import engine
+
+    with engine.begin() as connection:
+        stale = rebuild_rollups(connection, check=args.check)
+    verb = "out of date" if args.check else "rebuilt"
+    print(f"Archive: {stale['archive']} month(s) {verb}; categories: {stale['categories']} {verb}")
+    if args.check and any(stale.values()):
+        raise SystemExit(1)
+
+
+def export_static(args: argparse.Namespace) -> None:
+    from app.core.config import settings
+    from app.core.snapshot import export_snapshot
+
+    out = args.out or settings.STATIC_EXPORT_DIR
+    if not out:
+        raise SystemExit("No output directory: pass --out or set STATIC_EXPORT_DIR")
+    result = asyncio.run(export_snapshot(out, full=args.full))
+    print(f"Exported to {out}: {result['written']} written, {result['removed']} removed ({result['posts']} post(s) changed)")
+
+
+def import_file(args: argparse.Namespace) -> None:
+    from sqlmodel.ext.asyncio.session import AsyncSession
+    from app.db.bulk import import_ndjson
+    from app.db.session import async_engine
+
+    async def chunks():
+        with open(args.file, "rb") as f:
+            while chunk := f.read(1 << 16):
+                yield chunk
+
+    async def run():
+        async with AsyncSession(async_engine) as session:
+            report = await import_ndjson(session, args.kind, chunks())
+            await session.commit()
+        await async_engine.dispose()
+        return report
+
+    report = asyncio.run(run())
+    print(f"Imported {report['inserted']} row(s), {report['failed']} failed")
+    for error in report["errors"]:
+        print(f"  line {error['line']}: {error['error']}")
+
+
+def export_file(args: argparse.Namespace) -> None:
+    import sys
+    from app.db.bulk import export_ndjson
+    from app.db.session import async_engine
+
+    async def run(out):
+        async for chunk in export_ndjson(async_engine, args.kind):
+            out.write(chunk)
+        await async_engine.dispose()
+
+    if args.out:
+        with open(args.out, "wb") as out:
+            asyncio.run(run(out))
+    else:
+        asyncio.run(run(sys.stdout.buffer))
+
+
+def process_images(args: argparse.Namespace) -> None:
+    from sqlmodel.ext.asyncio.session import AsyncSession
+    from app.core.images import shutdown_pool
+    from app.db.images import process_images as process, stale_asset_ids
+    from app.db.session import async_engine
+
+    async def run():
+        async with AsyncSession(async_engine) as session:
+            asset_ids = await stale_asset_ids(session, force=args.force)
+        counts = await process(async_engine, asset_ids) if asset_ids else {"ready": 0, "failed": 0}
+        await async_engine.dispose()
+        return counts
+
+    try:
+        counts = asyncio.run(run())
+    finally:
+        shutdown_pool()
+    print(f"Processed {counts['ready']} image(s), {counts['failed']} failed")
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(prog="python -m app.cli", description="Backend maintenance commands")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    seed_parser = commands.add_parser("seed", help="Insert the welcome post and sample projects into an empty database")
+    seed_parser.add_argument("--migrate", action="store_true", help="Run `alembic upgrade head` first")
+    seed_parser.set_defaults(func=seed)
+
+    render = commands.add_parser("render-posts", help="Backfill write-time HTML for posts that are missing or stale")
+    render.add_argument("--force", action="store_true", help="Re-render every post")
+    render.set_defaults(func=render_posts)
+
+    related = commands.add_parser("related-posts", help="Recompute every post's related posts (backfill, or after changing RELATED_*)")
+    related.set_defaults(func=related_posts)
+
+    rollup = commands.add_parser("rollups", help="Check the archive and category rollups against posts/projects and fix stale rows")
+    rollup.add_argument("--check", action="store_true", help="Only report stale rows (exit status 1 if any)")
+    rollup.set_defaults(func=rollups)
+
+    export = commands.add_parser("export-static", help="Write the public API as static files (+ .gz/.br) for nginx")
+    export.add_argument("--out", help="Output directory (default: STATIC_EXPORT_DIR)")
+    export.add_argument("--full", action="store_true", help="Ignore the previous run and re-export every post")
+    export.set_defaults(func=export_static)
+
+    bulk_import = commands.add_parser("import-ndjson", help="Bulk import posts or projects from an NDJSON file")
+    bulk_import.add_argument("kind", choices=["blog", "projects"])
+    bulk_import.add_argument("file")
+    bulk_import.set_defaults(func=import_file)
+
+    bulk_export = commands.add_parser("export-ndjson", help="Export posts or projects as NDJSON")
+    bulk_export.add_argument("kind", choices=["blog", "projects"])
+    bulk_export.add_argument("--out", help="Output file (default: stdout)")
+    bulk_export.set_defaults(func=export_file)
+
+    images = commands.add_parser("process-images", help="(Re)generate variants for pending, failed or outdated uploads")
+    images.add_argument("--force", action="store_true", help="Reprocess every image")
+    images.set_defaults(func=process_images)
+
+    args = parser.parse_args(argv)
+    args.func(args)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+"""
+Conditional GET helpers (ETag / Last-Modified / 304).
+
+Validators are derived from cheap lookups (a collection's write version from
+app/db/versions.py, a row's updated_at) plus anything else that shapes the
+body (query parameters, response format), so a matching request can be
+answered before any row is loaded.
+"""
+import hashlib
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from typing import Hashable, NamedTuple, Optional
+
+from fastapi import Request
+from fastapi.responses import Response
+
+
+class Validator(NamedTuple):
+    etag: str
+    last_modified: Optional[datetime]
+
+
+def _as_utc(value: datetime) -> datetime:
+    # Timestamps are written as UTC; naive values (timestamp without time zone) are UTC too
+    return value.replace(tzinfo=timezone.utc) if value.tzinfo is None else value.astimezone(timezone.utc)
+
+
+def latest(*values: Optional[datetime]) -> Optional[datetime]:
+    """The newest of the given timestamps (None entries ignored), for a body built from several rows."""
+    present = [_as_utc(value) for value in values if value is not None]
+    return max(present, default=None)
+
+
+def make_validator(*parts: Hashable, last_modified: Optional[datetime]) -> Validator:
+    """Strong ETag over `parts` (must include everything the body depends on)."""
+    last_modified = _as_utc(last_modified) if last_modified is not None else None
+    digest = hashlib.sha256(repr((parts, last_modified)).encode("utf-8")).hexdigest()[:32]
+    return Validator(etag=f'"{digest}"', last_modified=last_modified)
+
+
+def is_not_modified(request: Request, validator: Validator, *, use_date: bool = True) -> bool:
+    """
+    Evaluate If-None-Match (weak comparison, takes precedence) or If-Modified-Since.
+
+    Pass use_date=False when last_modified can't see every change to the body
+    (e.g. max(updated_at) over rows, which deleting a row doesn't move).
+    """
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        tags = {tag.strip().removeprefix("W/") for tag in if_none_match.split(",")}
+        return "*" in tags or validator.etag in tags
+    if_modified_since = request.headers.get("if-modified-since")
+    if use_date and if_modified_since and validator.last_modified is not None:
+        try:
+            since = parsedate_to_datetime(if_modified_since)
+        except (TypeError, ValueError):
+            return False
+        return _as_utc(since) >= validator.last_modified.replace(microsecond=0)
+    return False
+
+
+def with_validator(response: Response, validator: Validator) -> Response:
+    response.headers["ETag"] = validator.etag
+    if validator.last_modified is not None:
+        response.headers["Last-Modified"] = format_datetime(validator.last_modified, usegmt=True)
+    # Admin and anonymous readers see different bodies for the same URL
+    response.headers["Vary"] = "Authorization"
+    return response
+
+
+def not_modified_response(validator: Validator) -> Response:
+    return with_validator(Response(status_code=304), validator)
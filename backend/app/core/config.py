@@ -8,6 +8,12 @@ class Settings(BaseSettings):
     DEBUG: bool = False
     PORT: int = 8000
     
+    # Optional read replica for anonymous reads (see app/db/replica.py). Reads stay on the
+    # primary for REPLICA_WRITE_GRACE_SECONDS after a write; replica health is rechecked every REPLICA_CHECK_SECONDS
+    DATABASE_READ_URL: str = ""
+    REPLICA_WRITE_GRACE_SECONDS: float = 5.0
+    REPLICA_CHECK_SECONDS: float = 10.0
+
     # Admin settings
     ADMIN_DOCS_URL: str = "/admin"
     API_ADMIN_USERNAME: str
@@ -17,9 +23,87 @@ class Settings(BaseSettings):
     JWT_SECRET_KEY: str = "your-long-random-hex-string" 
     JWT_ALGORITHM: str = "HS256"
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 60 * 24  # 1 day
+    # Verified-token cache (see app/core/security.py); 0 verifies every request
+    TOKEN_CACHE_MAX_ENTRIES: int = 1024
 
     # Cloudflare Turnstile (optional). If set, login requires valid X-Turnstile-Token.
     TURNSTILE_SECRETKEY: str = ""
+    # Point at a local stand-in to test; verification gives up (and rejects) after the timeout
+    TURNSTILE_VERIFY_URL: str = "https://challenges.cloudflare.com/turnstile/v0/siteverify"
+    TURNSTILE_TIMEOUT_SECONDS: float = 3.0
+
+    # Login rate limits: token buckets per client IP and per username (burst, then N per minute)
+    LOGIN_IP_BURST: int = 10
+    LOGIN_IP_PER_MINUTE: float = 10
+    LOGIN_USERNAME_BURST: int = 5
+    LOGIN_USERNAME_PER_MINUTE: float = 5
+    # Comma-separated IPs/CIDRs whose X-Real-IP header is trusted (e.g. the frontend nginx: 172.16.0.0/12)
+    TRUSTED_PROXY_IPS: str = ""
+
+    # Postgres text search configuration for blog search (e.g. "english", "simple")
+    SEARCH_TEXT_CONFIG: str = "english"
+
+    # Related posts on a post page (see app/db/related.py): the RELATED_POSTS best by tag overlap (Jaccard)
+    # plus RELATED_RECENCY_WEIGHT x closeness in time, halving every RELATED_RECENCY_HALF_LIFE_DAYS apart.
+    # Changing these only affects lists written afterwards; rebuild with `python -m app.cli related-posts`
+    RELATED_POSTS: int = 5
+    RELATED_RECENCY_WEIGHT: float = 0.25
+    RELATED_RECENCY_HALF_LIFE_DAYS: float = 180.0
+
+    # Static snapshot of the public API (see app/core/snapshot.py); empty disables auto-export after writes
+    STATIC_EXPORT_DIR: str = ""
+
+    # Public origin of the site (e.g. https://example.com) for links in /feed.xml, /atom.xml and /sitemap.xml;
+    # empty uses the request's own base URL. Feeds list the newest FEED_MAX_ITEMS posts (0 = all); documents
+    # larger than FEED_CACHE_MAX_BYTES are streamed on every request instead of being cached
+    SITE_URL: str = ""
+    FEED_MAX_ITEMS: int = 50
+    FEED_CACHE_MAX_BYTES: int = 2_000_000
+
+    # Uploaded images (see app/db/images.py): originals and variants live under MEDIA_DIR, served at MEDIA_URL.
+    # Variants are IMAGE_WIDTHS wide (never upscaled) in WebP and, when Pillow supports it, AVIF
+    MEDIA_DIR: str = "media"
+    MEDIA_URL: str = "/media"
+    IMAGE_WIDTHS: str = "320,640,1280,1920"
+    IMAGE_WEBP_QUALITY: int = 80
+    IMAGE_AVIF_QUALITY: int = 55
+    IMAGE_MAX_BYTES: int = 20 * 1024 * 1024
+    IMAGE_WORKERS: int = 2
+
+    # Job queue for write side effects (see app/db/jobs.py): JOB_WORKERS tasks per API process (0 = none,
+    # e.g. when another process runs them). A job runs JOB_COALESCE_SECONDS after it is first queued, and
+    # repeat enqueues of its key merge into it. Failures retry after JOB_RETRY_BASE_SECONDS, doubling up to
+    # JOB_RETRY_MAX_SECONDS, for JOB_MAX_ATTEMPTS attempts. Idle workers poll every JOB_POLL_SECONDS; a
+    # running job is reclaimed after JOB_LEASE_SECONDS, and finished jobs are kept for JOB_RETENTION_HOURS
+    JOB_WORKERS: int = 2
+    JOB_COALESCE_SECONDS: float = 2.0
+    JOB_MAX_ATTEMPTS: int = 5
+    JOB_RETRY_BASE_SECONDS: float = 5.0
+    JOB_RETRY_MAX_SECONDS: float = 600.0
+    JOB_POLL_SECONDS: float = 5.0
+    JOB_LEASE_SECONDS: float = 300.0
+    JOB_RETENTION_HOURS: float = 24.0
+
+    # Response compression (brotli or gzip, negotiated); bodies below the threshold are sent as-is
+    COMPRESSION_MINIMUM_SIZE: int = 1024
+    COMPRESSION_GZIP_LEVEL: int = 6
+    COMPRESSION_BROTLI_QUALITY: int = 4
+
+    # In-process response cache for anonymous blog/project reads
+    CACHE_ENABLED: bool = True
+    CACHE_MAX_ENTRIES: int = 512
+    CACHE_TTL_SECONDS: int = 60
+
+    # Instrumentation: DB_ECHO logs every statement (debug only); slow statements are
+    # logged at SLOW_QUERY_SAMPLE_RATE and the last SLOW_QUERY_SAMPLES are exposed on /metrics
+    DB_ECHO: bool = False
+    SLOW_QUERY_MS: float = 100.0
+    SLOW_QUERY_SAMPLE_RATE: float = 1.0
+    SLOW_QUERY_SAMPLES: int = 50
+    METRICS_ENABLED: bool = True
+    # /metrics answers the admin (bearer token) and scrapers from these comma-separated IPs/CIDRs, by client_ip;
+    # in Docker a scraper on another container or the host shows up from the bridge network (e.g. 172.16.0.0/12)
+    METRICS_ALLOWED_IPS: str = "127.0.0.1,::1"
 
     # Comma-separated; dev (Vite :5173) + prod (e.g. nginx :80 on localhost)
     ALLOWED_ORIGINS: str = "http://localhost:5173,http://localhost,http://127.0.0.1"
@@ -30,8 +114,20 @@ class Settings(BaseSettings):
         extra="ignore" # Ignore extra variables to reduce errors
     )
     
+    @field_validator("JWT_ALGORITHM")
+    @classmethod
+    def hmac_algorithm(cls, value: str) -> str:
+        # Tokens are signed with JWT_SECRET_KEY, so only the HMAC family applies
+        if value not in ("HS256", "HS384", "HS512"):
+            raise ValueError("JWT_ALGORITHM must be one of HS256, HS384, HS512")
+        return value
+
     @property
     def origins_list(self) -> list[str]:
         return [item.strip() for item in self.ALLOWED_ORIGINS.split(",")]
 
+    @property
+    def image_widths(self) -> tuple[int, ...]:
+        return tuple(sorted({int(item) for item in self.IMAGE_WIDTHS.split(",") if item.strip()}))
+
 settings = Settings()
\ No newline at end of file
@@ -0,0 +1,125 @@
+"""
+Image processing that runs in a process pool, off the event loop.
+
+`probe_image` and `generate_variants` are plain functions of file paths so
+they can be pickled to worker processes; Pillow is only imported there (and
+never at API startup). Workers are spawned rather than forked, since the API
+process holds database connections and their threads.
+"""
+import base64
+import hashlib
+import io
+import multiprocessing
+import os
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Optional
+
+from app.core.config import settings
+
+# Bump when the encoding changes in a way the settings below don't capture
+PIPELINE_VERSION = 1
+PLACEHOLDER_SIZE = 16
+
+# Pillow format name -> (file extension, MIME type) for accepted originals
+ACCEPTED_FORMATS = {
+    "JPEG": (".jpg", "image/jpeg"),
+    "PNG": (".png", "image/png"),
+    "WEBP": (".webp", "image/webp"),
+    "GIF": (".gif", "image/gif"),
+    "AVIF": (".avif", "image/avif"),
+}
+
+VARIANT_FORMATS = ("avif", "webp")
+
+_pool: Optional[ProcessPoolExecutor] = None
+
+
+class UnsupportedImage(ValueError):
+    pass
+
+
+def pipeline_key() -> str:
+    """Short digest of everything that shapes variant bytes; part of their URLs, so those can be immutable."""
+    params = (PIPELINE_VERSION, settings.image_widths, settings.IMAGE_WEBP_QUALITY, settings.IMAGE_AVIF_QUALITY)
+    return hashlib.sha256(repr(params).encode("utf-8")).hexdigest()[:10]
+
+
+def get_pool() -> ProcessPoolExecutor:
+    global _pool
+    if _pool is None:
+        _pool = ProcessPoolExecutor(max_workers=settings.IMAGE_WORKERS, mp_context=multiprocessing.get_context("spawn"))
+    return _pool
+
+
+def shutdown_pool() -> None:
+    global _pool
+    if _pool is not None:
+        _pool.shutdown(wait=False, cancel_futures=True)
+        _pool = None
+
+
+def probe_image(path: str) -> tuple[str, int, int]:
+    """(Pillow format, width, height) of an accepted image; UnsupportedImage otherwise."""
+    from PIL import Image, UnidentifiedImageError
+
+    try:
+        with Image.open(path) as image:
+            image.verify()
+            fmt, (width, height) = image.format, image.size
+    except (UnidentifiedImageError, OSError, SyntaxError, Image.DecompressionBombError):
+        raise UnsupportedImage("not a readable image") from None
+    if fmt not in ACCEPTED_FORMATS:
+        raise UnsupportedImage(f"unsupported format {fmt}; use one of {', '.join(ACCEPTED_FORMATS)}")
+    return fmt, width, height
+
+
+def _save_atomic(image, path: Path, fmt: str) -> None:
+    fd, tmp = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.")
+    with os.fdopen(fd, "wb") as handle:
+        if fmt == "avif":
+            # One encoder thread per worker: the pool is what spreads work across cores
+            image.save(handle, "AVIF", quality=settings.IMAGE_AVIF_QUALITY, speed=8, max_threads=1)
+        else:
+            image.save(handle, "WEBP", quality=settings.IMAGE_WEBP_QUALITY, method=4)
+    os.replace(tmp, path)
+
+
+def generate_variants(source: str, out_dir: str) -> dict:
+    """
+    Write `<width>.<format>` variants of `source` into `out_dir` and return
+    {width, height, widths, formats, placeholder}. Widths never exceed the
+    original; the largest configured width is capped to it instead.
+    """
+    from PIL import Image, ImageOps, features
+
+    formats = [fmt for fmt in VARIANT_FORMATS if features.check(fmt)]
+    out = Path(out_dir)
+    out.mkdir(parents=True, exist_ok=True)
+    with Image.open(source) as opened:
+        image = ImageOps.exif_transpose(opened)  # also loads the (first) frame
+    has_alpha = "A" in image.getbands() or "transparency" in image.info
+    image = image.convert("RGBA" if has_alpha else "RGB")
+
+    width, height = image.size
+    widths = sorted({w for w in settings.image_widths if w < width} | {min(width, max(settings.image_widths))})
+    # Largest first: each step down resamples the previous variant, which is much cheaper than the original
+    current = image
+    for target in reversed(widths):
+        if target != current.width:
+            current = current.resize((target, max(1, round(height * target / width))), Image.Resampling.LANCZOS)
+        for fmt in formats:
+            _save_atomic(current, out / f"{target}.{fmt}", fmt)
+
+    tiny = current.copy()
+    tiny.thumbnail((PLACEHOLDER_SIZE, PLACEHOLDER_SIZE))
+    buffer = io.BytesIO()
+    tiny.save(buffer, "WEBP", quality=40)
+    return {
+        "width": width,
+        "height": height,
+        "widths": widths,
+        "formats": formats,
+        "placeholder": "data:image/webp;base64," + base64.b64encode(buffer.getvalue()).decode("ascii"),
+    }
@@ -0,0 +1,261 @@
+"""
+Request instrumentation: per-request DB timing, Server-Timing header, Prometheus /metrics.
+
+- `instrument_engine` hooks SQLAlchemy cursor events to count statements and sum
+  their time into the current request's `RequestStats` (a context variable set by
+  `MetricsMiddleware`), and feeds the sampled slow-query log.
+- `MetricsMiddleware` emits `Server-Timing: db;dur=..;desc="N queries", serialize;dur=.., total;dur=..`
+  and records a per-route latency histogram.
+- `render_metrics` writes everything in the Prometheus text exposition format,
+  including connection pool gauges for the engines that were instrumented.
+  GET /metrics serves it to the admin and to METRICS_ALLOWED_IPS only (the slow
+  query samples are SQL text).
+
+No prometheus_client dependency: the handful of series here is small enough to
+keep in dicts under one lock.
+"""
+import logging
+import random
+import threading
+import time
+from collections import deque
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Optional
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core.config import settings
+
+logger = logging.getLogger("app.db.slow")
+
+# Seconds; tuned for an API whose typical response is a few milliseconds
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+# Longest statement text kept in a slow-query sample / label
+STATEMENT_PREVIEW_LENGTH = 200
+
+
+@dataclass
+class RequestStats:
+    queries: int = 0
+    db_seconds: float = 0.0
+    serialize_seconds: float = 0.0
+    engines: set = field(default_factory=set)
+
+
+_request_stats: ContextVar[Optional[RequestStats]] = ContextVar("request_stats", default=None)
+
+
+def record_serialize(seconds: float) -> None:
+    stats = _request_stats.get()
+    if stats is not None:
+        stats.serialize_seconds += seconds
+
+
+class _Histogram:
+    __slots__ = ("counts", "total", "count")
+
+    def __init__(self):
+        self.counts = [0] * len(LATENCY_BUCKETS)
+        self.total = 0.0
+        self.count = 0
+
+    def observe(self, value: float) -> None:
+        for i, bound in enumerate(LATENCY_BUCKETS):
+            if value <= bound:
+                self.counts[i] += 1
+                break
+        self.total += value
+        self.count += 1
+
+
+class Metrics:
+    """Process-wide counters; every mutation holds the lock (sync DB events run in worker threads)."""
+
+    def __init__(self, slow_samples: int):
+        self._lock = threading.Lock()
+        self.request_latency: dict[tuple[str, str, str], _Histogram] = {}
+        self.queries_total = 0
+        self.query_seconds_total = 0.0
+        self.slow_queries_total = 0
+        self.slow_samples: deque = deque(maxlen=slow_samples)
+        self.pool_checkouts: dict[str, int] = {}
+        self.engines: dict[str, Engine] = {}
+
+    def observe_request(self, method: str, route: str, status: int, seconds: float) -> None:
+        key = (method, route, str(status))
+        with self._lock:
+            histogram = self.request_latency.get(key)
+            if histogram is None:
+                histogram = self.request_latency[key] = _Histogram()
+            histogram.observe(seconds)
+
+    def observe_query(self, statement: str, seconds: float) -> None:
+        with self._lock:
+            self.queries_total += 1
+            self.query_seconds_total += seconds
+        if seconds * 1000 < settings.SLOW_QUERY_MS:
+            return
+        with self._lock:
+            self.slow_queries_total += 1
+        # Sampled so a burst of slow queries (e.g. a cold DB) doesn't flood the log
+        if random.random() < settings.SLOW_QUERY_SAMPLE_RATE:
+            preview = " ".join(statement.split())[:STATEMENT_PREVIEW_LENGTH]
+            with self._lock:
+                self.slow_samples.append((time.time(), seconds, preview))
+            logger.warning("slow query (%.1f ms): %s", seconds * 1000, preview)
+
+    def count_checkout(self, name: str) -> None:
+        with self._lock:
+            self.pool_checkouts[name] = self.pool_checkouts.get(name, 0) + 1
+
+
+metrics = Metrics(slow_samples=settings.SLOW_QUERY_SAMPLES)
+
+
+def instrument_engine(engine: Engine, name: str) -> None:
+    """Attach timing and pool hooks. Pass `async_engine.sync_engine` for async engines."""
+    metrics.engines[name] = engine
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def _before(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("query_start", []).append(time.perf_counter())
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def _after(conn, cursor, statement, parameters, context, executemany):
+        elapsed = time.perf_counter() - conn.info["query_start"].pop()
+        # SQLAlchemy's greenlet bridge carries the caller's context, so this sees the request's stats
+        stats = _request_stats.get()
+        if stats is not None:
+            stats.queries += 1
+            stats.db_seconds += elapsed
+            stats.engines.add(name)
+        metrics.observe_query(statement, elapsed)
+
+    @event.listens_for(engine, "handle_error")
+    def _error(exception_context):
+        # A failed statement never reaches after_cursor_execute; drop its start time
+        connection = exception_context.connection
+        if connection is not None and connection.info.get("query_start"):
+            connection.info["query_start"].pop()
+
+    @event.listens_for(engine.pool, "checkout")
+    def _checkout(dbapi_connection, connection_record, connection_proxy):
+        metrics.count_checkout(name)
+
+
+def _route_template(scope: Scope) -> str:
+    """
+    Full route template (e.g. "/api/v1/blog/{blog_id}") used as the metric label, so the
+    series count stays bounded. Routes inside included routers only know their path
+    relative to the router prefix, so the prefix is taken from the matching request path.
+    """
+    route_path = getattr(scope.get("route"), "path", None)
+    if route_path is None:
+        return "unmatched"
+    return scope["path"].rsplit("/", route_path.count("/"))[0] + route_path
+
+
+class MetricsMiddleware:
+    """Pure ASGI: times the request, adds Server-Timing, records the route histogram."""
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        stats = RequestStats()
+        token = _request_stats.set(stats)
+        start = time.perf_counter()
+        status = 500
+
+        async def send_with_timing(message: Message) -> None:
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                total = (time.perf_counter() - start) * 1000
+                # Name the replica when it served the request, so routing is visible from the client
+                where = " (replica)" if "replica" in stats.engines else ""
+                headers = MutableHeaders(scope=message)
+                headers.append(
+                    "Server-Timing",
+                    f'db;dur={stats.db_seconds * 1000:.2f};desc="{stats.queries} queries{where}", '
+                    f"serialize;dur={stats.serialize_seconds * 1000:.2f}, "
+                    f"total;dur={total:.2f}",
+                )
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            _request_stats.reset(token)
+            metrics.observe_request(scope["method"], _route_template(scope), status, time.perf_counter() - start)
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def render_metrics() -> str:
+    lines = [
+        "# HELP http_request_duration_seconds Request latency by route template.",
+        "# TYPE http_request_duration_seconds histogram",
+    ]
+    with metrics._lock:
+        for (method, route, status), histogram in sorted(metrics.request_latency.items()):
+            labels = f'method="{method}",route="{_escape(route)}",status="{status}"'
+            cumulative = 0
+            for bound, count in zip(LATENCY_BUCKETS, histogram.counts):
+                cumulative += count
+                lines.append(f'http_request_duration_seconds_bucket{{{labels},le="{bound}"}} {cumulative}')
+            lines.append(f'http_request_duration_seconds_bucket{{{labels},le="+Inf"}} {histogram.count}')
+            lines.append(f"http_request_duration_seconds_sum{{{labels}}} {histogram.total:.6f}")
+            lines.append(f"http_request_duration_seconds_count{{{labels}}} {histogram.count}")
+
+        lines += [
+            "# HELP db_queries_total Statements executed.",
+            "# TYPE db_queries_total counter",
+            f"db_queries_total {metrics.queries_total}",
+            "# HELP db_query_seconds_total Time spent executing statements.",
+            "# TYPE db_query_seconds_total counter",
+            f"db_query_seconds_total {metrics.query_seconds_total:.6f}",
+            "# HELP db_slow_queries_total Statements slower than SLOW_QUERY_MS.",
+            "# TYPE db_slow_queries_total counter",
+            f"db_slow_queries_total {metrics.slow_queries_total}",
+            "# HELP db_slow_query_sample_seconds Most recent sampled slow statements.",
+            "# TYPE db_slow_query_sample_seconds gauge",
+        ]
+        # One series per statement text (its slowest recent sample); duplicate series are invalid
+        slowest: dict[str, float] = {}
+        for _, seconds, statement in metrics.slow_samples:
+            slowest[statement] = max(seconds, slowest.get(statement, 0.0))
+        for statement, seconds in slowest.items():
+            lines.append(f'db_slow_query_sample_seconds{{statement="{_escape(statement)}"}} {seconds:.6f}')
+
+        lines += [
+            "# HELP db_pool_checkouts_total Connections handed out by the pool.",
+            "# TYPE db_pool_checkouts_total counter",
+        ]
+        for name, count in sorted(metrics.pool_checkouts.items()):
+            lines.append(f'db_pool_checkouts_total{{engine="{name}"}} {count}')
+        engines = sorted(metrics.engines.items())
+
+    # Pool gauges; not every pool class (e.g. StaticPool, NullPool) exposes them
+    for metric, attribute, help_text in (
+        ("db_pool_size", "size", "Configured pool size."),
+        ("db_pool_checked_out", "checkedout", "Connections currently checked out."),
+        ("db_pool_overflow", "overflow", "Connections opened beyond pool_size."),
+    ):
+        lines += [f"# HELP {metric} {help_text}", f"# TYPE {metric} gauge"]
+        for name, engine in engines:
+            getter = getattr(engine.pool, attribute, None)
+            if getter is not None:
+                lines.append(f'{metric}{{engine="{name}"}} {getter()}')
+    return "\n".join(lines) + "\n"
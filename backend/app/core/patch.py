@@ -0,0 +1,182 @@
+"""
+Partial edits of a post: RFC 6902 JSON Patch, and a compact content diff.
+
+Both apply to the post's editable document ({title, excerpt, content, tags,
+is_published}) as of the version the client names in If-Match, so an autosave
+of a long post sends the change rather than the whole Markdown source.
+
+Content diff (CONTENT_DIFF_MEDIA_TYPE) is a JSON object of fields to set, in
+which `content` is a list of splices instead of a string:
+
+    {"content": [[120, 125, "new text"], [900, 900, "inserted"]], "title": "..."}
+
+Each splice [start, end, text] replaces base[start:end] with text. Offsets
+refer to the base content, are in UTF-16 code units (JavaScript string
+indexes, what an editor has at hand), and must be ascending and
+non-overlapping.
+"""
+import copy
+from typing import Any
+
+JSON_PATCH_MEDIA_TYPE = "application/json-patch+json"
+CONTENT_DIFF_MEDIA_TYPE = "application/x-content-diff+json"
+
+
+class PatchError(ValueError):
+    """The patch is malformed or doesn't apply to the document."""
+
+
+class PatchTestFailed(PatchError):
+    """A JSON Patch `test` operation didn't match: the document isn't what the client expects."""
+
+
+def _pointer(path: Any) -> list[str]:
+    if not isinstance(path, str) or (path and not path.startswith("/")):
+        raise PatchError(f"invalid JSON pointer {path!r}")
+    return [token.replace("~1", "/").replace("~0", "~") for token in path.split("/")[1:]]
+
+
+def _index(container: list, token: str, *, append: bool = False) -> int:
+    if append and token == "-":
+        return len(container)
+    if not token.isdigit() or (len(token) > 1 and token.startswith("0")):
+        raise PatchError(f"invalid array index {token!r}")
+    index = int(token)
+    if index > len(container) or (index == len(container) and not append):
+        raise PatchError(f"array index {index} out of range")
+    return index
+
+
+def _parent(document: Any, tokens: list[str]) -> tuple[Any, str]:
+    if not tokens:
+        raise PatchError("operations on the whole document are not supported")
+    target = document
+    for token in tokens[:-1]:
+        if isinstance(target, dict) and token in target:
+            target = target[token]
+        elif isinstance(target, list):
+            target = target[_index(target, token)]
+        else:
+            raise PatchError(f"path /{'/'.join(tokens)} does not exist")
+    return target, tokens[-1]
+
+
+def _get(document: Any, tokens: list[str]) -> Any:
+    container, token = _parent(document, tokens)
+    if isinstance(container, dict):
+        if token not in container:
+            raise PatchError(f"path /{'/'.join(tokens)} does not exist")
+        return container[token]
+    if isinstance(container, list):
+        return container[_index(container, token)]
+    raise PatchError(f"path /{'/'.join(tokens)} does not exist")
+
+
+def _add(document: Any, tokens: list[str], value: Any) -> None:
+    container, token = _parent(document, tokens)
+    if isinstance(container, dict):
+        container[token] = value
+    elif isinstance(container, list):
+        container.insert(_index(container, token, append=True), value)
+    else:
+        raise PatchError(f"cannot add to /{'/'.join(tokens)}")
+
+
+def _remove(document: Any, tokens: list[str]) -> Any:
+    value = _get(document, tokens)
+    container, token = _parent(document, tokens)
+    if isinstance(container, dict):
+        del container[token]
+    else:
+        del container[_index(container, token)]
+    return value
+
+
+def _json_equal(a: Any, b: Any) -> bool:
+    """JSON equality: unlike Python's ==, 1 and true (and 0 and false) are different values."""
+    if isinstance(a, bool) or isinstance(b, bool):
+        return type(a) is type(b) and a == b
+    if isinstance(a, dict) and isinstance(b, dict):
+        return a.keys() == b.keys() and all(_json_equal(a[key], b[key]) for key in a)
+    if isinstance(a, list) and isinstance(b, list):
+        return len(a) == len(b) and all(map(_json_equal, a, b))
+    return a == b
+
+
+def apply_json_patch(document: dict[str, Any], operations: Any) -> dict[str, Any]:
+    """Apply RFC 6902 operations to a copy of `document`, atomically: any failure leaves nothing applied."""
+    if not isinstance(operations, list):
+        raise PatchError("a JSON Patch is an array of operations")
+    document = copy.deepcopy(document)
+    for number, operation in enumerate(operations):
+        if not isinstance(operation, dict) or "op" not in operation or "path" not in operation:
+            raise PatchError(f"operation {number}: needs `op` and `path`")
+        op, tokens = operation["op"], _pointer(operation["path"])
+        if op in ("add", "replace", "test") and "value" not in operation:
+            raise PatchError(f"operation {number}: `{op}` needs `value`")
+        if op in ("move", "copy") and "from" not in operation:
+            raise PatchError(f"operation {number}: `{op}` needs `from`")
+
+        if op == "add":
+            _add(document, tokens, copy.deepcopy(operation["value"]))
+        elif op == "remove":
+            _remove(document, tokens)
+        elif op == "replace":
+            _get(document, tokens)  # must exist
+            _remove(document, tokens)
+            _add(document, tokens, copy.deepcopy(operation["value"]))
+        elif op == "move":
+            source = _pointer(operation["from"])
+            if tokens[:len(source)] == source and tokens != source:
+                raise PatchError(f"operation {number}: cannot move a value into itself")
+            _add(document, tokens, _remove(document, source))
+        elif op == "copy":
+            _add(document, tokens, copy.deepcopy(_get(document, _pointer(operation["from"]))))
+        elif op == "test":
+            if not _json_equal(_get(document, tokens), operation["value"]):
+                raise PatchTestFailed(f"operation {number}: test of {operation['path']} failed")
+        else:
+            raise PatchError(f"operation {number}: unknown op {op!r}")
+    return document
+
+
+def apply_splices(text: str, splices: Any) -> str:
+    """Apply [start, end, replacement] splices (UTF-16 offsets into `text`) and return the new text."""
+    if not isinstance(splices, list):
+        raise PatchError("content must be a list of [start, end, text] splices")
+    # Offsets count UTF-16 code units; they equal str indexes unless the text has astral characters (emoji)
+    wide = not text.isascii() and any(ord(char) > 0xFFFF for char in text)
+    source = text.encode("utf-16-le", "surrogatepass") if wide else text
+    scale = 2 if wide else 1
+
+    pieces, position = [], 0
+    for number, splice in enumerate(splices):
+        if (not isinstance(splice, list) or len(splice) != 3 or not isinstance(splice[2], str)
+                or not all(isinstance(offset, int) and not isinstance(offset, bool) for offset in splice[:2])):
+            raise PatchError(f"splice {number}: expected [start, end, text]")
+        start, end, replacement = splice
+        if not position <= start * scale <= end * scale <= len(source):
+            raise PatchError(f"splice {number}: [{start}, {end}] is out of range or overlaps the previous splice")
+        pieces.append(source[position:start * scale])
+        pieces.append(replacement.encode("utf-16-le", "surrogatepass") if wide else replacement)
+        position = end * scale
+    pieces.append(source[position:])
+    if not wide:
+        return "".join(pieces)
+    try:
+        return b"".join(pieces).decode("utf-16-le")
+    except UnicodeDecodeError:
+        raise PatchError("a splice splits a character in two") from None
+
+
+def apply_content_diff(document: dict[str, Any], diff: Any) -> dict[str, Any]:
+    """Apply a content diff (see the module docstring) to a copy of `document`."""
+    if not isinstance(diff, dict):
+        raise PatchError("a content diff is a JSON object of fields to set")
+    unknown = set(diff) - set(document)
+    if unknown:
+        raise PatchError(f"unknown field(s): {', '.join(sorted(unknown))}")
+    document = dict(document)
+    for field, value in diff.items():
+        document[field] = apply_splices(document[field], value) if field == "content" else value
+    return document
@@ -0,0 +1,81 @@
+"""
+In-memory token-bucket rate limiting (login attempts per client IP and per username).
+
+Each key gets a bucket of `burst` tokens refilled at `per_minute`; a request
+spends one. Buckets are kept in an LRU bounded by `max_keys`, so a flood of
+distinct keys can't grow memory without limit (an evicted key just starts
+over with a full bucket). Per process, like the response cache.
+"""
+import ipaddress
+import math
+import threading
+import time
+from collections import OrderedDict
+from functools import lru_cache
+
+from fastapi import Request
+
+from app.core.config import settings
+
+
+class TokenBucketLimiter:
+    def __init__(self, burst: int, per_minute: float, max_keys: int = 10_000):
+        self.burst = burst
+        self.rate = per_minute / 60.0
+        self.max_keys = max_keys
+        # key -> (tokens, last refill, monotonic seconds)
+        self._buckets: "OrderedDict[str, tuple[float, float]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def acquire(self, key: str) -> float:
+        """Spend a token for `key`. Returns 0 if allowed, else seconds until one is available."""
+        now = time.monotonic()
+        with self._lock:
+            tokens, last = self._buckets.get(key, (float(self.burst), now))
+            tokens = min(float(self.burst), tokens + (now - last) * self.rate)
+            if tokens >= 1:
+                retry_after = 0.0
+                tokens -= 1
+            else:
+                retry_after = (1 - tokens) / self.rate if self.rate > 0 else math.inf
+            self._buckets[key] = (tokens, now)
+            self._buckets.move_to_end(key)
+            while len(self._buckets) > self.max_keys:
+                self._buckets.popitem(last=False)
+            return retry_after
+
+
+@lru_cache(maxsize=8)
+def _networks(value: str) -> tuple:
+    return tuple(ipaddress.ip_network(item.strip(), strict=False) for item in value.split(",") if item.strip())
+
+
+def _trusted_proxies() -> tuple:
+    return _networks(settings.TRUSTED_PROXY_IPS)
+
+
+def ip_allowed(ip: str, allowed: str) -> bool:
+    """Whether `ip` is in `allowed`, a comma-separated list of IPs/CIDRs (a setting)."""
+    try:
+        address = ipaddress.ip_address(ip)
+    except ValueError:
+        return False
+    return any(address in network for network in _networks(allowed))
+
+
+def client_ip(request: Request) -> str:
+    """Peer address, or X-Real-IP when the peer is a trusted proxy (e.g. the frontend nginx)."""
+    peer = request.client.host if request.client else ""
+    real_ip = request.headers.get("x-real-ip")
+    if real_ip and peer:
+        try:
+            address = ipaddress.ip_address(peer)
+        except ValueError:
+            return peer
+        if any(address in network for network in _trusted_proxies()):
+            return real_ip.strip()
+    return peer
+
+
+login_ip_limiter = TokenBucketLimiter(settings.LOGIN_IP_BURST, settings.LOGIN_IP_PER_MINUTE)
+login_username_limiter = TokenBucketLimiter(settings.LOGIN_USERNAME_BURST, settings.LOGIN_USERNAME_PER_MINUTE)
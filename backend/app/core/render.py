@@ -0,0 +1,60 @@
+import math
+import re
+import threading
+from html import unescape
+from typing import Any, NamedTuple
+
+# Bump when the rendering pipeline changes so `python -m app.cli render-posts` re-renders stale rows
+RENDERER_VERSION = 1
+
+WORDS_PER_MINUTE = 200
+
+_EXTENSIONS = ["fenced_code", "tables", "toc", "codehilite", "sane_lists"]
+_EXTENSION_CONFIGS = {
+    "codehilite": {"guess_lang": False, "css_class": "highlight"},
+    "toc": {"permalink": False},
+}
+
+_TAG_RE = re.compile(r"<[^>]+>")
+# Latin-ish words count once; each CJK character counts as a word
+_WORD_RE = re.compile(r"[぀-ヿ㐀-䶿一-鿿가-힯]|[^\W_]+(?:['’-][^\W_]+)*")
+
+_local = threading.local()
+
+
+class RenderedPost(NamedTuple):
+    html: str
+    toc: list[dict[str, Any]]
+    word_count: int
+    reading_time_minutes: int
+
+
+def _markdown():
+    # Markdown instances keep per-document state; reuse one per thread and reset between documents
+    md = getattr(_local, "md", None)
+    if md is None:
+        # Imported on first render: Markdown + Pygments only matter on writes, not for startup
+        import markdown
+
+        md = _local.md = markdown.Markdown(extensions=_EXTENSIONS, extension_configs=_EXTENSION_CONFIGS)
+    return md.reset()
+
+
+def _toc(tokens: list[dict[str, Any]]) -> list[dict[str, Any]]:
+    return [
+        {"level": t["level"], "id": t["id"], "name": t["name"], "children": _toc(t["children"])}
+        for t in tokens
+    ]
+
+
+def render_markdown(source: str) -> RenderedPost:
+    """Render post Markdown to HTML plus a nested TOC, word count and reading time."""
+    md = _markdown()
+    html = md.convert(source or "")
+    words = len(_WORD_RE.findall(unescape(_TAG_RE.sub(" ", html))))
+    return RenderedPost(
+        html=html,
+        toc=_toc(md.toc_tokens),
+        word_count=words,
+        reading_time_minutes=max(1, math.ceil(words / WORDS_PER_MINUTE)) if words else 0,
+    )
@@ -1,11 +1,27 @@
+import hashlib
+import secrets
+import threading
+import time
+from collections import OrderedDict
 from datetime import datetime, timedelta, timezone
-from jose import jwt
-from passlib.context import CryptContext
+from typing import Any, Optional
+
 from app.core.config import settings
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+# jose (with its crypto backends) and passlib are imported on first use: public reads need neither
+ALGORITHM = settings.JWT_ALGORITHM
+
+_pwd = None
+
+
+def _pwd_context():
+    global _pwd
+    if _pwd is None:
+        from passlib.context import CryptContext
+
+        _pwd = CryptContext(schemes=["bcrypt"], deprecated="auto")
+    return _pwd
 
-ALGORITHM = "HS256"
 
 def create_access_token(data: dict, expires_delta: timedelta | None = None):
     to_encode = data.copy()
@@ -13,13 +29,115 @@ def create_access_token(data: dict, expires_delta: timedelta | None = None):
         expire = datetime.now(timezone.utc) + expires_delta
     else:
         expire = datetime.now(timezone.utc) + timedelta(minutes=15)
-    
-    to_encode.update({"exp": expire})
+
+    # A random id per token: two logins in the same second still differ, and logout revokes just one
+    to_encode.update({"exp": expire, "jti": secrets.token_urlsafe(16)})
+    from jose import jwt
+
     encoded_jwt = jwt.encode(to_encode, settings.JWT_SECRET_KEY, algorithm=ALGORITHM)
     return encoded_jwt
 
 def verify_password(plain_password, hashed_password):
-    return pwd_context.verify(plain_password, hashed_password)
+    return _pwd_context().verify(plain_password, hashed_password)
 
 def get_password_hash(password):
-    return pwd_context.hash(password)
\ No newline at end of file
+    return _pwd_context().hash(password)
+
+
+class TokenCache:
+    """
+    Bounded LRU of verification results, keyed by the token's SHA-256 digest.
+
+    Valid tokens map to their claims until their `exp`; tokens that failed
+    verification are remembered too, so a stale token sent with every public
+    read isn't re-verified each time. Revocations are keyed on the token's
+    `jti` claim (the digest for tokens issued without one) and kept until the
+    token would have expired anyway. Per process, like the response cache: a restart
+    forgets revocations (tokens are short-lived, see ACCESS_TOKEN_EXPIRE_MINUTES).
+    """
+
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        # digest -> (expires_at, claims or None for "invalid")
+        self._verified: "OrderedDict[bytes, tuple[float, Optional[dict]]]" = OrderedDict()
+        # jti (or digest) -> expires_at
+        self._revoked: dict[str | bytes, float] = {}
+        self._lock = threading.Lock()
+
+    def get(self, digest: bytes) -> tuple[bool, Optional[dict]]:
+        """(found, claims); claims is None for a known-bad or revoked token."""
+        now = time.time()
+        with self._lock:
+            entry = self._verified.get(digest)
+            if entry is None:
+                return digest in self._revoked, None
+            if _revocation_key(digest, entry[1]) in self._revoked:
+                return True, None
+            if entry[0] <= now:
+                # Expired since it was verified; jose would reject it now
+                self._verified[digest] = (float("inf"), None)
+                return True, None
+            self._verified.move_to_end(digest)
+            return True, entry[1]
+
+    def set(self, digest: bytes, claims: Optional[dict]) -> None:
+        if self.max_entries <= 0:
+            return
+        expires_at = float(claims["exp"]) if claims and "exp" in claims else float("inf")
+        with self._lock:
+            self._verified[digest] = (expires_at, claims)
+            self._verified.move_to_end(digest)
+            while len(self._verified) > self.max_entries:
+                self._verified.popitem(last=False)
+
+    def is_revoked(self, digest: bytes, claims: dict) -> bool:
+        with self._lock:
+            return _revocation_key(digest, claims) in self._revoked
+
+    def revoke(self, digest: bytes, claims: dict, expires_at: float) -> None:
+        now = time.time()
+        with self._lock:
+            self._verified.pop(digest, None)
+            # Prune entries for tokens that have expired on their own
+            for stale in [key for key, until in self._revoked.items() if until <= now]:
+                del self._revoked[stale]
+            self._revoked[_revocation_key(digest, claims)] = expires_at
+
+
+def _revocation_key(digest: bytes, claims: Optional[dict]) -> str | bytes:
+    jti = claims.get("jti") if claims else None
+    return jti if isinstance(jti, str) and jti else digest
+
+
+token_cache = TokenCache(max_entries=settings.TOKEN_CACHE_MAX_ENTRIES)
+
+
+def _digest(token: str) -> bytes:
+    return hashlib.sha256(token.encode("utf-8")).digest()
+
+
+def decode_access_token(token: str) -> Optional[dict[str, Any]]:
+    """Verified claims for `token`, or None if it is invalid, expired or revoked."""
+    digest = _digest(token)
+    found, claims = token_cache.get(digest)
+    if found:
+        return claims
+    from jose import jwt, JWTError
+
+    try:
+        claims = jwt.decode(token, settings.JWT_SECRET_KEY, algorithms=[ALGORITHM])
+    except JWTError:
+        claims = None
+    if claims is not None and token_cache.is_revoked(digest, claims):
+        # Revoked, then evicted from the LRU: the jti is still on the revocation list
+        claims = None
+    token_cache.set(digest, claims)
+    return claims
+
+
+def revoke_token(token: str) -> None:
+    """Log a token out: it is rejected from now until its own expiry."""
+    claims = decode_access_token(token)
+    if claims is None:
+        return
+    token_cache.revoke(_digest(token), claims, float(claims.get("exp", time.time() + settings.ACCESS_TOKEN_EXPIRE_MINUTES * 60)))
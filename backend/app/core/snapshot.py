@@ -0,0 +1,186 @@
+"""
+Static snapshot of the public (anonymous) API for nginx to serve directly.
+
+Responses are produced by running the real app in-process over ASGI, so the
+files are byte-for-byte what the API would return. Layout under the output
+directory (each file also gets `.gz` and `.br` siblings):
+
+    api/v1/projects/index.json          GET /api/v1/projects/
+    api/v1/projects/categories.json     GET /api/v1/projects/categories
+    api/v1/blog/index.json              GET /api/v1/blog/            (page 1)
+    api/v1/blog/archive.json            GET /api/v1/blog/archive
+    api/v1/blog/page-{n}.json           GET /api/v1/blog/?page={n}
+    api/v1/blog/{id}.json               GET /api/v1/blog/{id}
+
+The files are the responses to exactly those URLs for an anonymous GET, so
+nginx may only serve one when the request matches: no Authorization header,
+and no query string other than `?page={n}` (optionally `&size=12`) on the
+list. Anything else (`fields`, `tag`, `cursor`, writes, admins) goes to the
+API. frontend/nginx.snapshot.conf does this, reading the snapshot from
+/srv/snapshot (uncomment `brotli_static` there with ngx_brotli).
+
+Incremental runs re-export only posts whose `updated_at` moved past the last
+run, or whose previous/next/related links changed or point at such a post
+(plus the cheap list, archive and project documents), and delete files for posts that
+were removed or unpublished. State is kept in `.snapshot-state.json`.
+"""
+import asyncio
+import gzip
+import json
+import os
+import tempfile
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import TYPE_CHECKING
+
+from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from app.core.config import settings
+from app.db import jobs
+from app.db.session import async_engine
+from app.models.blog import Blog, BlogRelated
+
+if TYPE_CHECKING:
+    import httpx
+
+STATE_FILE = ".snapshot-state.json"
+PAGE_SIZE = 12  # matches the frontend's list page size
+
+_lock = asyncio.Lock()
+
+
+def _write_atomic(path: Path, data: bytes) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.")
+    with os.fdopen(fd, "wb") as handle:
+        handle.write(data)
+    os.replace(tmp, path)
+
+
+def _write_document(path: Path, body: bytes) -> None:
+    _write_atomic(path, body)
+    _write_atomic(path.with_name(path.name + ".gz"), gzip.compress(body, compresslevel=9, mtime=0))
+    import brotli
+
+    _write_atomic(path.with_name(path.name + ".br"), brotli.compress(body, quality=11))
+
+
+def _remove_document(path: Path) -> None:
+    for candidate in (path, path.with_name(path.name + ".gz"), path.with_name(path.name + ".br")):
+        candidate.unlink(missing_ok=True)
+
+
+async def _fetch(client: "httpx.AsyncClient", url: str, **params) -> bytes:
+    response = await client.get(url, params=params)
+    response.raise_for_status()
+    return response.content
+
+
+def _post_links(ordered_ids: list[int], related_rows, published: set[int]) -> dict[int, list[int]]:
+    """Ids each published post's document links to: previous, next, then its related posts (as read_post does)."""
+    related: dict[int, list[int]] = {}
+    for blog_id, related_id in related_rows:
+        if related_id in published:
+            related.setdefault(blog_id, []).append(related_id)
+    return {
+        blog_id: [
+            ordered_ids[index - 1] if index > 0 else None,
+            ordered_ids[index + 1] if index + 1 < len(ordered_ids) else None,
+            *related.get(blog_id, ()),
+        ]
+        for index, blog_id in enumerate(ordered_ids)
+    }
+
+
+async def export_snapshot(out_dir: str | os.PathLike, *, full: bool = False) -> dict[str, int]:
+    """Write the public API snapshot into `out_dir`. Returns counts of written/removed documents."""
+    # Imported here: app.main imports the routers, which import this module (and httpx isn't needed at startup)
+    import httpx
+    from app.main import app
+
+    root = Path(out_dir)
+    api = root / "api" / "v1"
+    state_path = root / STATE_FILE
+
+    async with _lock:
+        state = json.loads(state_path.read_text()) if state_path.exists() else {}
+        # A full run still uses the previous post ids, so removed posts get cleaned up
+        since = datetime.fromisoformat(state["exported_at"]) if "exported_at" in state and not full else None
+        previous_ids = set(state.get("post_ids", []))
+        started_at = datetime.now(timezone.utc)
+
+        async with AsyncSession(async_engine) as session:
+            rows = (await session.exec(
+                select(Blog.id, Blog.updated_at).where(Blog.is_published == True).order_by(Blog.created_at, Blog.id)
+            )).all()
+            related_rows = (await session.exec(
+                select(BlogRelated.blog_id, BlogRelated.related_id)
+                .order_by(BlogRelated.blog_id, BlogRelated.score.desc(), BlogRelated.related_id.desc())
+            )).all()
+        post_ids = {blog_id for blog_id, _ in rows}
+        links = _post_links([blog_id for blog_id, _ in rows], related_rows, post_ids)
+        updated = {
+            blog_id for blog_id, updated_at in rows
+            if since is None or blog_id not in previous_ids
+            or updated_at.replace(tzinfo=updated_at.tzinfo or timezone.utc) > since
+        }
+        # Post documents also embed their neighbours and related posts (titles included)
+        previous_links = state.get("links", {})
+        changed = [
+            blog_id for blog_id in sorted(post_ids)
+            if blog_id in updated or previous_links.get(str(blog_id)) != links[blog_id]
+            or not updated.isdisjoint(links[blog_id])
+        ]
+
+        written = removed = 0
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://snapshot") as client:
+            _write_document(api / "projects" / "index.json", await _fetch(client, "/api/v1/projects/"))
+            _write_document(api / "projects" / "categories.json", await _fetch(client, "/api/v1/projects/categories"))
+            _write_document(api / "blog" / "archive.json", await _fetch(client, "/api/v1/blog/archive"))
+            written += 3
+
+            page = 1
+            while True:
+                body = await _fetch(client, "/api/v1/blog/", page=page, size=PAGE_SIZE)
+                _write_document(api / "blog" / f"page-{page}.json", body)
+                if page == 1:
+                    _write_document(api / "blog" / "index.json", body)
+                written += 1
+                if json.loads(body).get("next_cursor") is None:
+                    break
+                page += 1
+            for stale in range(page + 1, state.get("pages", 0) + 1):
+                _remove_document(api / "blog" / f"page-{stale}.json")
+                removed += 1
+
+            for blog_id in changed:
+                _write_document(api / "blog" / f"{blog_id}.json", await _fetch(client, f"/api/v1/blog/{blog_id}"))
+                written += 1
+
+        for blog_id in previous_ids - post_ids:
+            _remove_document(api / "blog" / f"{blog_id}.json")
+            removed += 1
+
+        _write_atomic(state_path, json.dumps({
+            "exported_at": started_at.isoformat(),
+            "post_ids": sorted(post_ids),
+            "links": {str(blog_id): ids for blog_id, ids in links.items()},
+            "pages": page,
+        }).encode("utf-8"))
+
+    return {"written": written, "removed": removed, "posts": len(changed)}
+
+
+async def schedule_export(session: AsyncSession) -> None:
+    """Queue an incremental export in an admin write's transaction, when STATIC_EXPORT_DIR is set."""
+    if settings.STATIC_EXPORT_DIR:
+        # One key for every write: a burst of edits coalesces into a single export
+        await jobs.enqueue(session, "export_snapshot")
+
+
+async def export_snapshot_job(payload: dict) -> None:
+    """Job handler (app/db/jobs.py) for `schedule_export`."""
+    if settings.STATIC_EXPORT_DIR:
+        await export_snapshot(settings.STATIC_EXPORT_DIR)
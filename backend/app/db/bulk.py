@@ -0,0 +1,179 @@
+"""
+Bulk NDJSON import/export of posts and projects.
+
+Import validates each line against the table model and inserts valid rows in
+batches (one executemany per batch via SQLAlchemy's insertmanyvalues, which
+returns the new ids), all in the caller's single transaction. Each batch runs
+in a SAVEPOINT; if the database rejects it (e.g. a duplicate id), its rows are
+retried one by one so only the offending lines are reported. Invalid lines
+never abort the import; they come back as {"line": n, "error": "..."}.
+
+Search, tag and rendered-HTML rows for imported posts are written per batch
+with the same executemany approach instead of one statement per post; related
+post lists are rebuilt once, by a job queued in the same transaction. The
+archive months and project categories the import touched are recounted once,
+at the end.
+
+Export streams rows with a server-side cursor (`yield_per`) over plain column
+tuples, so memory stays flat regardless of table size.
+"""
+from typing import Any, AsyncIterable, AsyncIterator, Literal
+
+import orjson
+from pydantic import ValidationError
+from sqlalchemy import insert, select, text
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.ext.asyncio import AsyncEngine
+from sqlmodel import SQLModel
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from app.core.responses import dump_json
+from app.db import jobs, rendering, rollups, search, versions
+from app.db.tags import insert_tags
+from app.models.blog import Blog
+from app.models.project import Project
+
+BulkKind = Literal["blog", "projects"]
+
+MODELS: dict[str, type[SQLModel]] = {"blog": Blog, "projects": Project}
+
+IMPORT_BATCH_SIZE = 500
+EXPORT_BATCH_SIZE = 1000
+
+# Keep the report bounded when a whole file is malformed; error_count still counts them all
+MAX_REPORTED_ERRORS = 1000
+
+
+class ImportReport:
+    def __init__(self):
+        self.inserted = 0
+        self.error_count = 0
+        self.errors: list[dict[str, Any]] = []
+        self.explicit_ids = False
+
+    def error(self, line: int, message: str) -> None:
+        self.error_count += 1
+        if len(self.errors) < MAX_REPORTED_ERRORS:
+            self.errors.append({"line": line, "error": message})
+
+    def as_dict(self) -> dict[str, Any]:
+        return {"inserted": self.inserted, "failed": self.error_count, "errors": self.errors}
+
+
+def _parse_line(model: type[SQLModel], raw: bytes) -> dict[str, Any]:
+    data = orjson.loads(raw)
+    if not isinstance(data, dict):
+        raise ValueError("expected a JSON object")
+    # Table models only validate through model_validate (defaults such as created_at are filled in here)
+    values = model.model_validate(data).model_dump()
+    if values.get("id") is None:
+        values.pop("id", None)
+    return values
+
+
+async def _insert_rows(session: AsyncSession, model: type[SQLModel], rows: list[dict[str, Any]]) -> None:
+    """Insert rows sharing one key set, then their derived search/tag/render rows."""
+    ids = (await session.execute(insert(model).returning(model.id, sort_by_parameter_order=True), rows)).scalars().all()
+    await insert_tags(session, model, zip(ids, (row.get("tags") for row in rows)))
+    if model is Blog:
+        await search.index_new_posts(session, list(ids))
+        await rendering.render_new_posts(session, list(zip(ids, (row["content"] for row in rows))))
+
+
+async def _flush_batch(session: AsyncSession, model: type[SQLModel], batch: list[tuple[int, dict]], report: ImportReport) -> None:
+    # Rows with and without an explicit id can't share one executemany
+    groups = [[item for item in batch if "id" in item[1]], [item for item in batch if "id" not in item[1]]]
+    for group in filter(None, groups):
+        try:
+            async with session.begin_nested():
+                await _insert_rows(session, model, [values for _, values in group])
+            report.inserted += len(group)
+            continue
+        except DBAPIError:
+            pass
+        # Something in the batch was rejected: retry row by row to report exactly which
+        for line, values in group:
+            try:
+                async with session.begin_nested():
+                    await _insert_rows(session, model, [values])
+                report.inserted += 1
+            except DBAPIError as exc:
+                report.error(line, str(exc.orig).splitlines()[0] if exc.orig else str(exc))
+    report.explicit_ids |= bool(groups[0])
+
+
+async def _iter_lines(chunks: AsyncIterable[bytes]) -> AsyncIterator[tuple[int, bytes]]:
+    """Split a byte stream into numbered, non-blank lines without holding more than one partial line."""
+    pending = b""
+    number = 0
+    async for chunk in chunks:
+        pending += chunk
+        *lines, pending = pending.split(b"\n")
+        for line in lines:
+            number += 1
+            if line.strip():
+                yield number, line
+    if pending.strip():
+        yield number + 1, pending
+
+
+async def import_ndjson(
+    session: AsyncSession,
+    kind: BulkKind,
+    chunks: AsyncIterable[bytes],
+    *,
+    batch_size: int = IMPORT_BATCH_SIZE,
+) -> dict[str, Any]:
+    """Import NDJSON from `chunks` in the session's transaction; the caller commits."""
+    model = MODELS[kind]
+    report = ImportReport()
+    batch: list[tuple[int, dict]] = []
+    # Rollup groups of every valid line (recounting one whose rows were then rejected is harmless)
+    groups: set = set()
+    async for line, raw in _iter_lines(chunks):
+        try:
+            values = _parse_line(model, raw)
+            batch.append((line, values))
+            if model is Blog:
+                groups.add(rollups.month_of(values["created_at"]) if values["is_published"] else None)
+            else:
+                groups.add(values["category"])
+        except orjson.JSONDecodeError as exc:
+            report.error(line, f"invalid JSON: {exc}")
+        except ValidationError as exc:
+            report.error(line, "; ".join(f"{'.'.join(map(str, e['loc']))}: {e['msg']}" for e in exc.errors()))
+        except ValueError as exc:
+            report.error(line, str(exc))
+        if len(batch) >= batch_size:
+            await _flush_batch(session, model, batch, report)
+            batch = []
+    if batch:
+        await _flush_batch(session, model, batch, report)
+
+    if report.inserted:
+        if model is Blog:
+            await rollups.refresh_archive(session, groups)
+            await jobs.enqueue(session, "related_posts", "related_posts:rebuild", {"rebuild": True})
+        else:
+            await rollups.refresh_categories(session, groups)
+        await versions.bump(session, "blog" if model is Blog else "projects")
+
+    # Explicit ids bypass the Postgres sequence; move it past them so later inserts don't collide
+    if report.explicit_ids and session.bind.dialect.name == "postgresql":
+        table = model.__tablename__
+        await session.execute(text(
+            f"SELECT setval(pg_get_serial_sequence('{table}', 'id'), (SELECT coalesce(max(id), 1) FROM {table}))"
+        ))
+    return report.as_dict()
+
+
+async def export_ndjson(engine: AsyncEngine, kind: BulkKind) -> AsyncIterator[bytes]:
+    """Yield the table as NDJSON, one chunk per fetched partition, in id order."""
+    model = MODELS[kind]
+    columns = [getattr(model, name) for name in model.model_fields]
+    statement = select(*columns).order_by(model.id).execution_options(yield_per=EXPORT_BATCH_SIZE)
+    # Own session: a streaming response outlives the request's dependencies
+    async with AsyncSession(engine) as session:
+        result = await session.stream(statement)
+        async for partition in result.partitions():
+            yield b"".join(dump_json(dict(row._mapping)) + b"\n" for row in partition)
@@ -0,0 +1,164 @@
+"""
+RSS 2.0, Atom and sitemap documents, streamed straight from the database.
+
+Each generator runs its query with a server-side cursor (`yield_per`) and
+yields one encoded chunk per fetched partition, so a large archive is never
+held in memory as rows or as a document. Feeds carry the newest
+FEED_MAX_ITEMS published posts with their pre-rendered HTML (readers don't
+need to fetch each post); the sitemap lists every published post, capped at
+the protocol's 50,000 URLs.
+"""
+from datetime import datetime, timezone
+from email.utils import format_datetime
+from typing import AsyncIterator, Literal, Optional
+from xml.sax.saxutils import escape, quoteattr
+
+from sqlalchemy import func, select
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from app.core.config import settings
+from app.db.session import read_session
+from app.models.blog import Blog, BlogRender
+from app.models.project import Project
+
+FeedKind = Literal["rss", "atom", "sitemap"]
+
+MEDIA_TYPES: dict[str, str] = {
+    "rss": "application/rss+xml; charset=utf-8",
+    "atom": "application/atom+xml; charset=utf-8",
+    "sitemap": "application/xml; charset=utf-8",
+}
+
+FETCH_SIZE = 500
+SITEMAP_MAX_URLS = 50_000
+
+
+def _utc(value: datetime) -> datetime:
+    # Naive timestamps (SQLite, timestamp without time zone) are stored as UTC
+    return value.replace(tzinfo=timezone.utc) if value.tzinfo is None else value.astimezone(timezone.utc)
+
+
+def _post_url(site_url: str, blog_id: int) -> str:
+    return f"{site_url}/blog/post/{blog_id}"
+
+
+def _feed_statement():
+    statement = (
+        select(Blog.id, Blog.title, Blog.excerpt, Blog.tags, Blog.created_at, Blog.updated_at, BlogRender.content_html)
+        .outerjoin(BlogRender, BlogRender.blog_id == Blog.id)
+        .where(Blog.is_published == True)
+        .order_by(Blog.created_at.desc(), Blog.id.desc())
+    )
+    if settings.FEED_MAX_ITEMS > 0:
+        statement = statement.limit(settings.FEED_MAX_ITEMS)
+    return statement.execution_options(yield_per=FETCH_SIZE)
+
+
+async def feed_state(session: AsyncSession, kind: FeedKind) -> tuple[int, Optional[datetime]]:
+    """(row count, newest updated_at) over everything the document lists: the conditional GET source."""
+    posts = select(func.count(), func.max(Blog.updated_at)).where(Blog.is_published == True)
+    count, last_modified = (await session.exec(posts)).one()
+    if kind != "sitemap":
+        # Feeds embed the HTML, which the render_post job stores after the edit that moved updated_at
+        rendered = await session.scalar(select(func.max(BlogRender.rendered_at)))
+        if rendered is not None and (last_modified is None or _utc(rendered) > _utc(last_modified)):
+            last_modified = rendered
+    if kind == "sitemap":
+        # The home page lists projects, so they move its <lastmod> too
+        project_count, projects_modified = (await session.exec(select(func.count(), func.max(Project.updated_at)))).one()
+        count += project_count
+        if projects_modified is not None and (last_modified is None or _utc(projects_modified) > _utc(last_modified)):
+            last_modified = projects_modified
+    return count, last_modified
+
+
+def _rss_item(site_url: str, row) -> str:
+    url = _post_url(site_url, row.id)
+    categories = "".join(f"<category>{escape(tag)}</category>" for tag in row.tags or ())
+    content = f"<content:encoded>{escape(row.content_html)}</content:encoded>" if row.content_html else ""
+    return (
+        f"<item><title>{escape(row.title)}</title><link>{url}</link>"
+        f'<guid isPermaLink="true">{url}</guid>'
+        f"<pubDate>{format_datetime(_utc(row.created_at))}</pubDate>"
+        f"<description>{escape(row.excerpt or '')}</description>{categories}{content}</item>"
+    )
+
+
+def _atom_entry(site_url: str, row) -> str:
+    url = _post_url(site_url, row.id)
+    categories = "".join(f"<category term={quoteattr(tag)}/>" for tag in row.tags or ())
+    content = f'<content type="html">{escape(row.content_html)}</content>' if row.content_html else ""
+    return (
+        f"<entry><id>{url}</id><title>{escape(row.title)}</title>"
+        f'<link rel="alternate" href="{url}"/>'
+        f"<published>{_utc(row.created_at).isoformat()}</published>"
+        f"<updated>{_utc(row.updated_at).isoformat()}</updated>"
+        f"<summary>{escape(row.excerpt or '')}</summary>{categories}{content}</entry>"
+    )
+
+
+def _header(kind: FeedKind, site_url: str, last_modified: Optional[datetime]) -> str:
+    title = escape(settings.PROJECT_NAME)
+    updated = _utc(last_modified) if last_modified is not None else datetime.now(timezone.utc)
+    if kind == "rss":
+        return (
+            '<?xml version="1.0" encoding="UTF-8"?>\n'
+            '<rss version="2.0" xmlns:atom="http://www.w3.org/2005/Atom" '
+            'xmlns:content="http://purl.org/rss/1.0/modules/content/"><channel>'
+            f"<title>{title}</title><link>{site_url}/blog</link><description>{title} blog</description>"
+            f'<atom:link href="{site_url}/feed.xml" rel="self" type="application/rss+xml"/>'
+            f"<lastBuildDate>{format_datetime(updated)}</lastBuildDate>"
+        )
+    if kind == "atom":
+        return (
+            '<?xml version="1.0" encoding="UTF-8"?>\n'
+            '<feed xmlns="http://www.w3.org/2005/Atom">'
+            f"<id>{site_url}/blog</id><title>{title}</title><author><name>{title}</name></author>"
+            f"<updated>{updated.isoformat()}</updated>"
+            f'<link rel="self" href="{site_url}/atom.xml"/><link rel="alternate" href="{site_url}/blog"/>'
+        )
+    return (
+        '<?xml version="1.0" encoding="UTF-8"?>\n'
+        '<urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">'
+    )
+
+
+_FOOTERS = {"rss": "</channel></rss>\n", "atom": "</feed>\n", "sitemap": "</urlset>\n"}
+
+
+def _sitemap_url(loc: str, lastmod: Optional[datetime]) -> str:
+    return f"<url><loc>{loc}</loc>" + (f"<lastmod>{_utc(lastmod).date().isoformat()}</lastmod>" if lastmod else "") + "</url>"
+
+
+async def _sitemap_body(session: AsyncSession, site_url: str) -> AsyncIterator[str]:
+    projects_modified = await session.scalar(select(func.max(Project.updated_at)))
+    posts_modified = await session.scalar(select(func.max(Blog.updated_at)).where(Blog.is_published == True))
+    yield _sitemap_url(f"{site_url}/", projects_modified) + _sitemap_url(f"{site_url}/blog", posts_modified)
+
+    statement = (
+        select(Blog.id, Blog.updated_at)
+        .where(Blog.is_published == True)
+        .order_by(Blog.id)
+        .limit(SITEMAP_MAX_URLS - 2)
+        .execution_options(yield_per=FETCH_SIZE)
+    )
+    result = await session.stream(statement)
+    async for partition in result.partitions():
+        yield "".join(_sitemap_url(_post_url(site_url, row.id), row.updated_at) for row in partition)
+
+
+async def stream_feed(kind: FeedKind, site_url: str, last_modified: Optional[datetime]) -> AsyncIterator[bytes]:
+    """Yield the document in chunks. Opens its own session: a streaming body outlives the request's dependencies."""
+    # The base URL may come from the Host header; escaped once, it is safe in text and attributes alike
+    site_url = escape(site_url, {'"': "&quot;"})
+    yield _header(kind, site_url, last_modified).encode("utf-8")
+    async with read_session(use_replica=True) as session:
+        if kind == "sitemap":
+            async for chunk in _sitemap_body(session, site_url):
+                yield chunk.encode("utf-8")
+        else:
+            render = _rss_item if kind == "rss" else _atom_entry
+            result = await session.stream(_feed_statement())
+            async for partition in result.partitions():
+                yield "".join(render(site_url, row) for row in partition).encode("utf-8")
+    yield _FOOTERS[kind].encode("utf-8")
@@ -0,0 +1,212 @@
+"""
+Uploaded images: content-addressed storage, variant processing, project links.
+
+Layout under MEDIA_DIR (served at MEDIA_URL with immutable cache headers;
+every path changes when its bytes would):
+
+    originals/<sha256>.<ext>                       the upload, as sent
+    images/<sha256>/<pipeline key>/<width>.<fmt>   resized AVIF/WebP variants
+
+Uploading first checks every file of the request (size, format) into a temp
+file, so a bad one rejects the request before anything is stored; then it
+stores each original and an `ImageAsset` row ("pending"). The variants are produced afterwards in the process pool (app/core/images.py),
+then copied onto every project whose `image` is that original's URL, so the
+project list stays a single-table query. Re-uploading identical bytes is a
+no-op.
+"""
+import asyncio
+import hashlib
+import logging
+import os
+import tempfile
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Iterable, NamedTuple, Optional
+
+from fastapi import UploadFile
+from sqlalchemy import update
+from sqlalchemy.ext.asyncio import AsyncEngine
+from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from app.core.config import settings
+from app.core.images import ACCEPTED_FORMATS, generate_variants, get_pool, pipeline_key, probe_image
+from app.models.image import ImageAsset
+from app.models.project import Project
+
+logger = logging.getLogger("app.images")
+
+CHUNK_SIZE = 1 << 16
+
+
+class UploadTooLarge(ValueError):
+    pass
+
+
+def media_root() -> Path:
+    return Path(settings.MEDIA_DIR).resolve()
+
+
+def original_url(asset: ImageAsset) -> str:
+    return f"{settings.MEDIA_URL}/originals/{asset.filename}"
+
+
+def variants_dir(asset_id: str, key: str) -> Path:
+    return media_root() / "images" / asset_id / key
+
+
+def _variant_urls(asset_id: str, key: str, meta: dict) -> dict[str, Any]:
+    base = f"{settings.MEDIA_URL}/images/{asset_id}/{key}"
+    srcset = {
+        f"image/{fmt}": ", ".join(f"{base}/{width}.{fmt} {width}w" for width in meta["widths"])
+        for fmt in meta["formats"]
+    }
+    # <img src> fallback: the WebP closest to a typical card width
+    fallback = min(meta["widths"], key=lambda width: abs(width - 640))
+    return {
+        "width": meta["width"],
+        "height": meta["height"],
+        "placeholder": meta["placeholder"],
+        "src": f"{base}/{fallback}.webp",
+        "srcset": srcset,
+    }
+
+
+def as_dict(asset: ImageAsset) -> dict[str, Any]:
+    return {
+        "id": asset.id,
+        "url": original_url(asset),
+        "status": asset.status,
+        "width": asset.width,
+        "height": asset.height,
+        "variants": asset.variants,
+        "error": asset.error,
+    }
+
+
+async def _spool(upload: UploadFile, directory: Path) -> tuple[Path, str, int]:
+    """Copy the upload to a temp file next to its final home, hashing as it goes."""
+    digest = hashlib.sha256()
+    size = 0
+    fd, tmp = tempfile.mkstemp(dir=directory, prefix=".upload-")
+    try:
+        with os.fdopen(fd, "wb") as handle:
+            while chunk := await upload.read(CHUNK_SIZE):
+                size += len(chunk)
+                if size > settings.IMAGE_MAX_BYTES:
+                    raise UploadTooLarge(f"{upload.filename}: larger than {settings.IMAGE_MAX_BYTES} bytes")
+                digest.update(chunk)
+                handle.write(chunk)
+    except BaseException:
+        os.unlink(tmp)
+        raise
+    return Path(tmp), digest.hexdigest(), size
+
+
+class CheckedUpload(NamedTuple):
+    """An upload spooled to a temp file and probed, not stored yet."""
+    tmp: Path
+    asset_id: str  # sha256 of the bytes
+    size: int
+    fmt: str
+    width: int
+    height: int
+
+
+async def check_upload(upload: UploadFile) -> CheckedUpload:
+    """
+    Spool and probe one upload, leaving it in a temp file for `store_upload` (or `discard`).
+    Raises UploadTooLarge or app.core.images.UnsupportedImage, with nothing left behind.
+    """
+    originals = media_root() / "originals"
+    originals.mkdir(parents=True, exist_ok=True)
+    tmp, asset_id, size = await _spool(upload, originals)
+    try:
+        fmt, width, height = await asyncio.get_running_loop().run_in_executor(get_pool(), probe_image, str(tmp))
+    except BaseException:
+        tmp.unlink(missing_ok=True)
+        raise
+    return CheckedUpload(tmp, asset_id, size, fmt, width, height)
+
+
+def discard(checked: CheckedUpload) -> None:
+    checked.tmp.unlink(missing_ok=True)
+
+
+async def store_upload(session: AsyncSession, checked: CheckedUpload) -> tuple[ImageAsset, bool]:
+    """Move a checked upload into place; returns (asset, needs_processing). The caller commits."""
+    extension, content_type = ACCEPTED_FORMATS[checked.fmt]
+    path = media_root() / "originals" / f"{checked.asset_id}{extension}"
+    if path.exists():
+        discard(checked)
+    else:
+        os.replace(checked.tmp, path)
+
+    asset = await session.get(ImageAsset, checked.asset_id)
+    if asset is None:
+        asset = ImageAsset(
+            id=checked.asset_id, filename=path.name, content_type=content_type, size_bytes=checked.size,
+            width=checked.width, height=checked.height,
+        )
+        session.add(asset)
+    elif asset.status == "ready" and asset.variants and f"/{pipeline_key()}/" in asset.variants["src"]:
+        return asset, False
+    asset.status, asset.error = "pending", None
+    asset.updated_at = datetime.now(timezone.utc)
+    return asset, True
+
+
+async def process_images(engine: AsyncEngine, asset_ids: Iterable[str]) -> dict[str, int]:
+    """Generate variants for the given assets in the process pool, then publish them to their projects."""
+    loop = asyncio.get_running_loop()
+    key = pipeline_key()
+    async with AsyncSession(engine, expire_on_commit=False) as session:
+        assets = (await session.exec(select(ImageAsset).where(ImageAsset.id.in_(list(asset_ids))))).all()
+    jobs = [
+        loop.run_in_executor(get_pool(), generate_variants, str(media_root() / "originals" / asset.filename),
+                             str(variants_dir(asset.id, key)))
+        for asset in assets
+    ]
+    results = await asyncio.gather(*jobs, return_exceptions=True)
+
+    counts = {"ready": 0, "failed": 0}
+    async with AsyncSession(engine, expire_on_commit=False) as session:
+        for asset, result in zip(assets, results):
+            asset = await session.merge(asset)
+            if isinstance(result, BaseException):
+                logger.warning("Image %s failed: %s", asset.id, result)
+                asset.status, asset.error, asset.variants = "failed", str(result)[:500], None
+                counts["failed"] += 1
+            else:
+                asset.status, asset.error = "ready", None
+                asset.variants = _variant_urls(asset.id, key, result)
+                counts["ready"] += 1
+            asset.updated_at = datetime.now(timezone.utc)
+            # updated_at moves too, so the project list's ETag changes with the variants
+            await session.execute(
+                update(Project)
+                .where(Project.image == original_url(asset))
+                .values(image_variants=asset.variants, updated_at=asset.updated_at)
+            )
+        await session.commit()
+    return counts
+
+
+async def variants_for_image(session: AsyncSession, image: Optional[str]) -> Optional[dict]:
+    """Variants to store on a project whose image is `image` (None unless it is a processed upload)."""
+    prefix = f"{settings.MEDIA_URL}/originals/"
+    if not image or not image.startswith(prefix):
+        return None
+    asset_id = image[len(prefix):].split(".", 1)[0]
+    asset = await session.get(ImageAsset, asset_id)
+    return asset.variants if asset is not None and asset.status == "ready" else None
+
+
+async def stale_asset_ids(session: AsyncSession, *, force: bool = False) -> list[str]:
+    """Assets that are pending, failed or processed under an older pipeline key (every asset with force)."""
+    assets = (await session.exec(select(ImageAsset.id, ImageAsset.status, ImageAsset.variants))).all()
+    key = f"/{pipeline_key()}/"
+    return [
+        asset_id for asset_id, status, variants in assets
+        if force or status != "ready" or not variants or key not in variants["src"]
+    ]
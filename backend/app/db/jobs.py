@@ -0,0 +1,354 @@
+"""
+Persistent job queue for the side effects of admin writes, run in-process.
+
+Write handlers call `enqueue` inside their own transaction, so a job exists
+exactly when its write committed, and survives a restart. Each API process
+runs JOB_WORKERS asyncio workers (started from the lifespan in app/main.py)
+that claim due jobs with one atomic UPDATE ... RETURNING (FOR UPDATE SKIP
+LOCKED on Postgres), so several processes can share the queue.
+
+Coalescing: a job becomes due JOB_COALESCE_SECONDS after it is first queued,
+and enqueueing a key that already has a queued job merges into that job (the
+newest payload wins). Ten quick edits to one post therefore render it once.
+A write that lands while its job is running queues a fresh one, because the
+running job may have read the old row.
+
+A failed job is retried with exponential backoff (JOB_RETRY_BASE_SECONDS,
+doubling, capped at JOB_RETRY_MAX_SECONDS) until JOB_MAX_ATTEMPTS, then kept
+as "failed". If a worker dies mid-job, the job is reclaimed once its
+JOB_LEASE_SECONDS lease runs out. Finished jobs are kept for
+JOB_RETENTION_HOURS, which is the window `queue_stats` reports on
+(GET /api/v1/admin/jobs).
+"""
+import asyncio
+import importlib
+import logging
+import random
+import statistics
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Any, Awaitable, Callable, Optional
+
+from sqlalchemy import and_, case, delete, event, func, or_, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncEngine
+from sqlalchemy.orm import Session
+from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from app.core.config import settings
+from app.models.job import Job
+
+logger = logging.getLogger("app.jobs")
+
+# kind -> "module:coroutine function"; each handler is called with the job's payload.
+# Resolved on first use: handlers pull in the renderer, the image pool and the snapshot exporter.
+HANDLERS: dict[str, str] = {
+    "render_post": "app.api.v1.endpoints.blog:render_post_job",
+    "related_posts": "app.api.v1.endpoints.blog:related_posts_job",
+    "process_image": "app.api.v1.endpoints.images:process_image_job",
+    "export_snapshot": "app.core.snapshot:export_snapshot_job",
+}
+
+Handler = Callable[[dict[str, Any]], Awaitable[None]]
+
+PRUNE_INTERVAL_SECONDS = 600
+SHUTDOWN_GRACE_SECONDS = 10.0
+LAST_ERROR_LENGTH = 1000
+
+# Set on a session by `enqueue`; its commit wakes this process's workers
+_WAKE_FLAG = "jobs_enqueued"
+
+
+def _now() -> datetime:
+    return datetime.now(timezone.utc)
+
+
+def _utc(value: datetime) -> datetime:
+    # Naive timestamps (SQLite, timestamp without time zone) are stored as UTC
+    return value.replace(tzinfo=timezone.utc) if value.tzinfo is None else value.astimezone(timezone.utc)
+
+
+def _resolve(kind: str) -> Handler:
+    module, name = HANDLERS[kind].split(":")
+    return getattr(importlib.import_module(module), name)
+
+
+async def enqueue(
+    session: AsyncSession,
+    kind: str,
+    key: Optional[str] = None,
+    payload: Optional[dict[str, Any]] = None,
+    *,
+    delay: Optional[float] = None,
+) -> None:
+    """
+    Queue a `kind` job in the caller's transaction (the caller commits). `key`
+    (default: the kind) is what coalesces: while a job with that key is still
+    queued, this only replaces its payload and, if sooner, its due time.
+    """
+    if kind not in HANDLERS:
+        raise ValueError(f"unknown job kind {kind!r}")
+    now = _now()
+    delay = settings.JOB_COALESCE_SECONDS if delay is None else delay
+    # INSERT ... ON CONFLICT lives in the dialect packages (postgresql and sqlite alike); only load the one in use
+    dialect_insert = importlib.import_module(f"sqlalchemy.dialects.{session.bind.dialect.name}").insert
+    statement = dialect_insert(Job).values(
+        kind=kind, key=key or kind, payload=payload, status="queued", attempts=0, coalesced=0,
+        run_after=now + timedelta(seconds=delay), created_at=now,
+    )
+    statement = statement.on_conflict_do_update(
+        index_elements=[Job.key],
+        index_where=Job.status == "queued",
+        set_={
+            "payload": statement.excluded.payload,
+            "coalesced": Job.coalesced + 1,
+            # Keep the first enqueue's deadline, so a stream of edits can't postpone the job forever
+            "run_after": case((statement.excluded.run_after < Job.run_after, statement.excluded.run_after),
+                              else_=Job.run_after),
+        },
+    )
+    await session.execute(statement)
+    session.info[_WAKE_FLAG] = True
+
+
+@event.listens_for(Session, "after_commit")
+def _wake_after_commit(session: Session) -> None:
+    if session.info.pop(_WAKE_FLAG, False) and _workers is not None:
+        _workers.wake()
+
+
+@event.listens_for(Session, "after_rollback")
+def _forget_after_rollback(session: Session) -> None:
+    session.info.pop(_WAKE_FLAG, None)
+
+
+async def _claim(engine: AsyncEngine) -> Optional[Job]:
+    """Mark the next due job running (or one whose lease expired) and return it; None if nothing is due."""
+    now = _now()
+    due = (
+        select(Job.id)
+        .where(or_(
+            and_(Job.status == "queued", Job.run_after <= now),
+            and_(Job.status == "running", Job.started_at < now - timedelta(seconds=settings.JOB_LEASE_SECONDS)),
+        ))
+        .order_by(Job.run_after, Job.id)
+        .limit(1)
+        .with_for_update(skip_locked=True)
+        .scalar_subquery()
+    )
+    statement = (
+        update(Job)
+        .where(Job.id == due)
+        .values(status="running", started_at=now, attempts=Job.attempts + 1)
+        .returning(Job.id, Job.kind, Job.key, Job.payload, Job.attempts)
+    )
+    async with AsyncSession(engine) as session:
+        row = (await session.execute(statement)).first()
+        await session.commit()
+    return Job(id=row.id, kind=row.kind, key=row.key, payload=row.payload, attempts=row.attempts) if row else None
+
+
+def _retry_delay(attempts: int) -> float:
+    delay = min(settings.JOB_RETRY_MAX_SECONDS, settings.JOB_RETRY_BASE_SECONDS * 2 ** (attempts - 1))
+    # Jitter, so jobs that failed together (e.g. the database was down) don't retry in lockstep
+    return delay * random.uniform(0.75, 1.0)
+
+
+async def _finish(engine: AsyncEngine, job: Job, error: Optional[BaseException]) -> None:
+    now = _now()
+    values: dict[str, Any] = {"status": "done", "finished_at": now, "last_error": None}
+    if error is not None:
+        values["last_error"] = f"{type(error).__name__}: {error}"[:LAST_ERROR_LENGTH]
+        if job.attempts < settings.JOB_MAX_ATTEMPTS:
+            values.update(status="queued", run_after=now + timedelta(seconds=_retry_delay(job.attempts)),
+                          finished_at=None)
+        else:
+            values["status"] = "failed"
+    async with AsyncSession(engine) as session:
+        try:
+            await session.execute(update(Job).where(Job.id == job.id).values(**values))
+            await session.commit()
+        except IntegrityError:
+            # A newer job with this key is already queued and will redo the work
+            await session.rollback()
+            values.update(status="failed", finished_at=now)
+            await session.execute(update(Job).where(Job.id == job.id).values(**values))
+            await session.commit()
+
+
+async def _release(engine: AsyncEngine, job: Job) -> None:
+    """Hand an interrupted job back to the queue (shutdown), without counting the attempt."""
+    async with AsyncSession(engine) as session:
+        try:
+            await session.execute(
+                update(Job).where(Job.id == job.id, Job.status == "running")
+                .values(status="queued", attempts=Job.attempts - 1, started_at=None)
+            )
+            await session.commit()
+        except IntegrityError:
+            pass  # superseded by a newer queued job; its lease lets it be reclaimed otherwise
+
+
+async def _next_due_in(engine: AsyncEngine) -> Optional[float]:
+    """Seconds until the earliest queued job is due (0 if overdue); None if the queue is empty."""
+    async with AsyncSession(engine) as session:
+        run_after = await session.scalar(select(func.min(Job.run_after)).where(Job.status == "queued"))
+    return None if run_after is None else max(0.0, (_utc(run_after) - _now()).total_seconds())
+
+
+async def prune_jobs(engine: AsyncEngine) -> int:
+    """Delete done and failed jobs that finished more than JOB_RETENTION_HOURS ago."""
+    cutoff = _now() - timedelta(hours=settings.JOB_RETENTION_HOURS)
+    async with AsyncSession(engine) as session:
+        result = await session.execute(
+            delete(Job).where(Job.status.in_(("done", "failed")), Job.finished_at < cutoff)
+        )
+        await session.commit()
+    return result.rowcount
+
+
+class JobWorkers:
+    """`concurrency` worker tasks on the running event loop, pulling from the job table."""
+
+    def __init__(self, engine: AsyncEngine, concurrency: int):
+        self.engine = engine
+        self.concurrency = concurrency
+        self._tasks: list[asyncio.Task] = []
+        self._wake = asyncio.Event()
+        self._stopping = False
+        self._last_prune = 0.0
+
+    def start(self) -> None:
+        self._tasks = [asyncio.create_task(self._run(), name=f"job-worker-{n}") for n in range(self.concurrency)]
+
+    def wake(self) -> None:
+        self._wake.set()
+
+    async def stop(self, grace: float = SHUTDOWN_GRACE_SECONDS) -> None:
+        """Let running jobs finish for up to `grace` seconds, then cancel them (they are requeued)."""
+        self._stopping = True
+        self._wake.set()
+        _, pending = await asyncio.wait(self._tasks, timeout=grace) if self._tasks else (set(), set())
+        for task in pending:
+            task.cancel()
+        await asyncio.gather(*pending, return_exceptions=True)
+
+    async def _run(self) -> None:
+        while not self._stopping:
+            try:
+                job = await _claim(self.engine)
+                if job is None:
+                    await self._idle()
+                else:
+                    await self._execute(job)
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                # The queue itself is unreachable (database down); back off and try again
+                logger.exception("Job worker error")
+                await asyncio.sleep(settings.JOB_POLL_SECONDS)
+
+    async def _execute(self, job: Job) -> None:
+        t0 = time.perf_counter()
+        try:
+            await _resolve(job.kind)(job.payload or {})
+        except asyncio.CancelledError:
+            await _release(self.engine, job)
+            raise
+        except Exception as exc:
+            logger.warning("Job %s (%s, attempt %d) failed: %s", job.id, job.key, job.attempts, exc)
+            await _finish(self.engine, job, exc)
+        else:
+            logger.debug("Job %s (%s) done in %.3fs", job.id, job.key, time.perf_counter() - t0)
+            await _finish(self.engine, job, None)
+
+    async def _idle(self) -> None:
+        if time.monotonic() - self._last_prune > PRUNE_INTERVAL_SECONDS:
+            self._last_prune = time.monotonic()
+            await prune_jobs(self.engine)
+        # Sleep until the next job is due, a local enqueue commits, or the poll interval
+        # passes (jobs queued by other processes are only seen by polling)
+        self._wake.clear()
+        due_in = await _next_due_in(self.engine)
+        timeout = settings.JOB_POLL_SECONDS if due_in is None else min(due_in, settings.JOB_POLL_SECONDS)
+        try:
+            await asyncio.wait_for(self._wake.wait(), timeout=timeout)
+        except asyncio.TimeoutError:
+            pass
+
+
+_workers: Optional[JobWorkers] = None
+
+
+def start_workers(engine: AsyncEngine) -> None:
+    global _workers
+    if settings.JOB_WORKERS > 0 and _workers is None:
+        _workers = JobWorkers(engine, settings.JOB_WORKERS)
+        _workers.start()
+
+
+async def stop_workers() -> None:
+    global _workers
+    if _workers is not None:
+        workers, _workers = _workers, None
+        await workers.stop()
+
+
+def _latency(samples: list[float]) -> Optional[dict[str, float]]:
+    if not samples:
+        return None
+    ordered = sorted(samples)
+    return {
+        "p50_ms": round(statistics.median(ordered) * 1000, 1),
+        "p95_ms": round(ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))] * 1000, 1),
+        "max_ms": round(ordered[-1] * 1000, 1),
+    }
+
+
+async def queue_stats(session: AsyncSession, *, recent: int = 1000, failures: int = 10) -> dict[str, Any]:
+    """Queue depth per status and kind, and latency over the `recent` most recently finished jobs."""
+    now = _now()
+    depth: dict[str, int] = {"queued": 0, "running": 0, "done": 0, "failed": 0}
+    by_kind: dict[str, dict[str, int]] = {}
+    counts = await session.exec(select(Job.kind, Job.status, func.count()).group_by(Job.kind, Job.status))
+    for kind, status, count in counts.all():
+        depth[status] = depth.get(status, 0) + count
+        by_kind.setdefault(kind, {})[status] = count
+
+    due, oldest = (await session.exec(
+        select(func.count(Job.id).filter(Job.run_after <= now), func.min(Job.created_at)).where(Job.status == "queued")
+    )).one()
+
+    finished = (await session.exec(
+        select(Job.created_at, Job.started_at, Job.finished_at, Job.coalesced)
+        .where(Job.status == "done")
+        .order_by(Job.finished_at.desc())
+        .limit(recent)
+    )).all()
+    # wait includes the coalescing delay and any retry backoff; run is the last attempt alone
+    wait = [(_utc(started) - _utc(created)).total_seconds() for created, started, _, _ in finished]
+    run = [(_utc(done) - _utc(started)).total_seconds() for _, started, done, _ in finished]
+    total = [(_utc(done) - _utc(created)).total_seconds() for created, _, done, _ in finished]
+
+    failed = (await session.exec(
+        select(Job).where(Job.status == "failed").order_by(Job.finished_at.desc()).limit(failures)
+    )).all()
+    return {
+        "workers": _workers.concurrency if _workers is not None else 0,
+        "depth": {**depth, "due": due},
+        "by_kind": by_kind,
+        "oldest_queued_seconds": round((now - _utc(oldest)).total_seconds(), 1) if oldest is not None else None,
+        "latency": {
+            "jobs": len(finished),
+            "coalesced_writes": sum(coalesced for *_, coalesced in finished),
+            "wait": _latency(wait),
+            "run": _latency(run),
+            "total": _latency(total),
+        },
+        "recent_failures": [
+            {"id": job.id, "kind": job.kind, "key": job.key, "attempts": job.attempts,
+             "error": job.last_error, "finished_at": job.finished_at}
+            for job in failed
+        ],
+    }
@@ -0,0 +1,462 @@
+"""
+Related posts and previous/next links for a post page.
+
+Each post's RELATED_POSTS best related published posts are precomputed into
+`blog_related`. Only posts sharing a tag are related, and a pair's score is
+symmetric and doesn't drift as time passes:
+
+    jaccard(tags_a, tags_b) + RELATED_RECENCY_WEIGHT * 0.5 ** (days apart / RELATED_RECENCY_HALF_LIFE_DAYS)
+
+So a write to post P can only change P's own list, the lists P is in, and
+lists of posts sharing a tag with P. The related_posts job (queued by blog
+writes, coalesced per post) updates those with `update_related`:
+
+- P's list is recomputed;
+- a list P is in keeps it at its new score if that didn't drop, and is
+  recomputed otherwise (P lost tags, was unpublished or deleted);
+- other lists take P in where it now beats their lowest entry.
+
+None of this scans the posts sharing a tag (a quarter of the corpus, for a
+common tag). Posts with the same tag set form a group in `blog_tag_set`,
+ordered by date, and within a group the score only falls with distance in
+time: a list is built from the nearest posts of each group, best groups
+first, stopping once no further group could place. And a post with at least
+RELATED_POSTS published peers in its own group has a list entirely above 1,
+so P can only enter it if they are close: in P's own group, with fewer than
+RELATED_POSTS published posts between them; in a group with overlap above
+1 - RELATED_RECENCY_WEIGHT, within the days that make up the difference.
+Small groups are checked in full. Nor does a job read every group: the ones
+sharing a tag with a post are a seek per tag on `blog_tag_group`, and a
+group's published count is only taken as far as RELATED_POSTS + 2.
+
+`rebuild_related` recomputes everything in memory (backfill, bulk import,
+changed settings): `python -m app.cli related-posts`. Previous/next links
+aren't stored; they are two seeks on ix_blog_published_created_at_id at read
+time (`post_links`).
+"""
+import asyncio
+import heapq
+import json
+import math
+from bisect import bisect_left
+from collections import defaultdict
+from datetime import datetime, timedelta, timezone
+from typing import Any, Iterable, NamedTuple, Optional
+
+from sqlalchemy import delete, func, insert, text, tuple_, update
+from sqlalchemy.engine import Engine
+from sqlmodel import Session, select
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from app.core.config import settings
+from app.db.versions import bump_sync
+from app.models.blog import Blog, BlogRelated, BlogTagGroup, BlogTagSet
+
+SECONDS_PER_DAY = 86400.0
+REBUILD_BATCH_SIZE = 5000
+# Arbitrary constant shared by every API process: related_posts jobs read lists, then rewrite them
+RELATED_LOCK_KEY = 0x2E1A7ED
+
+_POST_COLUMNS = (Blog.id, Blog.tags, Blog.created_at, Blog.is_published)
+_SET_COLUMNS = (BlogTagSet.blog_id, BlogTagSet.tag_key, BlogTagSet.created_at, BlogTagSet.is_published)
+_LINK_COLUMNS = (Blog.id, Blog.title, Blog.excerpt, Blog.created_at, Blog.updated_at)
+
+# A list entry; lists are ordered by (score, id) descending
+Entry = tuple[float, int]
+
+_lock = asyncio.Lock()
+
+
+class Post(NamedTuple):
+    id: int
+    tags: frozenset[str]
+    created: float  # epoch seconds
+    is_published: bool
+    created_at: datetime  # as stored, for seeks
+
+
+def _epoch(created_at: datetime) -> float:
+    # SQLite hands back naive UTC
+    return (created_at if created_at.tzinfo else created_at.replace(tzinfo=timezone.utc)).timestamp()
+
+
+def _post(row: Any) -> Post:
+    tags = frozenset(tag for tag in row.tags or () if tag)
+    return Post(row.id, tags, _epoch(row.created_at), bool(row.is_published), row.created_at)
+
+
+def _tag_key(tags: frozenset[str]) -> str:
+    return json.dumps(sorted(tags), ensure_ascii=False, separators=(",", ":"))
+
+
+def _jaccard(a: frozenset[str], b: frozenset[str]) -> float:
+    shared = len(a & b)
+    return shared / (len(a) + len(b) - shared) if shared else 0.0
+
+
+def related_score(a: Post, b: Post) -> float:
+    """Score of the pair (symmetric); 0 when they share no tag."""
+    jaccard = _jaccard(a.tags, b.tags)
+    if not jaccard:
+        return 0.0
+    days = abs(a.created - b.created) / SECONDS_PER_DAY
+    return jaccard + settings.RELATED_RECENCY_WEIGHT * 0.5 ** (days / settings.RELATED_RECENCY_HALF_LIFE_DAYS)
+
+
+def _push(best: list[Entry], entry: Entry, limit: int) -> None:
+    """Keep the `limit` best entries in the min-heap `best`."""
+    if len(best) < limit:
+        heapq.heappush(best, entry)
+    elif entry > best[0]:
+        heapq.heapreplace(best, entry)
+
+
+def _can_place(best: list[Entry], overlap: float, limit: int) -> bool:
+    """Whether a group with this tag overlap could still improve the list."""
+    return len(best) < limit or overlap + settings.RELATED_RECENCY_WEIGHT >= best[0][0]
+
+
+class _Candidates:
+    """Every published post grouped by tag set, in memory, for `rebuild_related`."""
+
+    def __init__(self, posts: Iterable[Post]):
+        grouped: dict[frozenset[str], list[Post]] = defaultdict(list)
+        for post in posts:
+            if post.is_published and post.tags:
+                grouped[post.tags].append(post)
+        self._groups: dict[frozenset[str], tuple[list[float], list[Post]]] = {}
+        self._by_tag: dict[str, list[frozenset[str]]] = defaultdict(list)
+        for tags, members in grouped.items():
+            members.sort(key=lambda post: (post.created, post.id))
+            self._groups[tags] = ([post.created for post in members], members)
+            for tag in tags:
+                self._by_tag[tag].append(tags)
+
+    def top(self, post: Post, limit: int) -> list[Entry]:
+        """The `limit` best (score, id) entries for `post`, best first."""
+        tag_sets = {tags for tag in post.tags for tags in self._by_tag.get(tag, ())}
+        best: list[Entry] = []
+        for overlap, tags in sorted(((_jaccard(post.tags, tags), tags) for tags in tag_sets), reverse=True):
+            if not _can_place(best, overlap, limit):
+                break
+            times, members = self._groups[tags]
+            # The group's best are among the `limit` nearest on each side (plus whatever ties the farthest)
+            low = max(0, bisect_left(times, post.created) - limit)
+            high = min(len(members), bisect_left(times, post.created) + limit + 1)
+            while low > 0 and times[low - 1] == times[low]:
+                low -= 1
+            while high < len(members) and times[high] == times[high - 1]:
+                high += 1
+            for other in members[low:high]:
+                if other.id != post.id:
+                    _push(best, (related_score(post, other), other.id), limit)
+        return sorted(best, reverse=True)
+
+
+class _TagSets:
+    """The groups of `blog_tag_set` that one related_posts job meets, looked up as needed."""
+
+    def __init__(self, session: AsyncSession, limit: int):
+        self.session = session
+        self.limit = limit
+        self._tags: dict[str, frozenset[str]] = {}
+        self._by_tag: dict[str, list[str]] = {}
+        self._published: dict[str, int] = {}
+
+    async def sharing(self, tags: frozenset[str]) -> list[tuple[float, str]]:
+        """(overlap, key) of the groups sharing a tag with `tags`, highest overlap first."""
+        missing = sorted(tags - self._by_tag.keys())
+        if missing:
+            # A seek per tag on blog_tag_group's primary key: one row per group carrying it
+            rows = (await self.session.exec(
+                select(BlogTagGroup.tag, BlogTagGroup.tag_key).where(BlogTagGroup.tag.in_(missing))
+            )).all()
+            for tag in missing:
+                self._by_tag[tag] = []
+            for tag, key in rows:
+                self._by_tag[tag].append(key)
+                if key not in self._tags:
+                    self._tags[key] = frozenset(json.loads(key))
+        keys = {key for tag in tags for key in self._by_tag[tag]}
+        return sorted(((_jaccard(tags, self._tags[key]), key) for key in keys), reverse=True)
+
+    async def published(self, key: str) -> int:
+        """
+        The group's published members, counted up to limit + 2 (past that, `reachable` treats
+        every group alike). A group with no members left has its blog_tag_group rows dropped.
+        """
+        if key not in self._published:
+            members = select(BlogTagSet.blog_id).where(BlogTagSet.tag_key == key)
+            count = await self.session.scalar(select(func.count()).select_from(
+                members.where(BlogTagSet.is_published == True).limit(self.limit + 2).subquery()))
+            if not count and (await self.session.exec(members.limit(1))).first() is None:
+                await self.session.execute(delete(BlogTagGroup).where(BlogTagGroup.tag_key == key))
+            self._published[key] = count
+        return self._published[key]
+
+    def post(self, row: Any) -> Post:
+        tags = self._tags.get(row.tag_key) or frozenset(json.loads(row.tag_key))
+        return Post(row.blog_id, tags, _epoch(row.created_at), bool(row.is_published), row.created_at)
+
+    async def fetch(self, statement) -> list[Post]:
+        return [self.post(row) for row in (await self.session.exec(statement)).all()]
+
+    async def nearest(self, key: str, post: Post, limit: int) -> tuple[list[Post], list[Post]]:
+        """
+        The `limit` published members of the group nearest `post` on each side in time
+        (older, newer), nearest first; the newer side also gets the members tying its farthest,
+        which a score tie would rank above it (higher id).
+        """
+        published = select(*_SET_COLUMNS).where(BlogTagSet.tag_key == key, BlogTagSet.is_published == True)
+        position = tuple_(BlogTagSet.created_at, BlogTagSet.blog_id)
+        older = await self.fetch(published.where(position < (post.created_at, post.id))
+                                  .order_by(BlogTagSet.created_at.desc(), BlogTagSet.blog_id.desc()).limit(limit))
+        newer = await self.fetch(published.where(position > (post.created_at, post.id))
+                                  .order_by(BlogTagSet.created_at, BlogTagSet.blog_id).limit(limit))
+        if len(newer) == limit:
+            newer += await self.fetch(published.where(
+                BlogTagSet.created_at == newer[-1].created_at, BlogTagSet.blog_id > newer[-1].id))
+        return older, newer
+
+    async def between(self, key: str, start: Optional[datetime], end: Optional[datetime]) -> list[Post]:
+        """Every member of the group (drafts too) created in [start, end]; None is unbounded."""
+        # Both values spelled out, so each is a range seek on the index
+        statement = select(*_SET_COLUMNS).where(BlogTagSet.tag_key == key, BlogTagSet.is_published.in_([True, False]))
+        if start is not None:
+            statement = statement.where(BlogTagSet.created_at >= start)
+        if end is not None:
+            statement = statement.where(BlogTagSet.created_at <= end)
+        return await self.fetch(statement)
+
+    async def top(self, post: Post, limit: int) -> list[Entry]:
+        """The `limit` best (score, id) entries for `post`, best first."""
+        best: list[Entry] = []
+        for overlap, key in await self.sharing(post.tags):
+            if not _can_place(best, overlap, limit):
+                break
+            if not await self.published(key):
+                continue
+            for side in await self.nearest(key, post, limit):
+                for other in side:
+                    _push(best, (related_score(post, other), other.id), limit)
+        return sorted(best, reverse=True)
+
+    async def reachable(self, post: Post, limit: int) -> list[Post]:
+        """Posts whose lists `post` could enter (a superset; see the module docstring)."""
+        weight, found = settings.RELATED_RECENCY_WEIGHT, []
+        for overlap, key in await self.sharing(post.tags):
+            # Peers other than the list's own post and `post`
+            if await self.published(key) - 2 < limit or weight <= 0:
+                found += await self.between(key, None, None)
+            elif overlap == 1:
+                older, newer = await self.nearest(key, post, limit)
+                start = older[limit - 1].created_at if len(older) >= limit else None
+                end = newer[limit - 1].created_at if len(newer) >= limit else None
+                found += await self.between(key, start, end)
+            elif overlap > 1 - weight:
+                reach = timedelta(days=settings.RELATED_RECENCY_HALF_LIFE_DAYS * math.log2(weight / (1 - overlap)))
+                found += await self.between(key, post.created_at - reach, post.created_at + reach)
+        return [other for other in found if other.id != post.id]
+
+
+async def _replace_list(session: AsyncSession, blog_id: int, entries: list[Entry]) -> bool:
+    """Store `entries` as the post's list unless it already is; True if it changed."""
+    current = (await session.exec(
+        select(BlogRelated.score, BlogRelated.related_id).where(BlogRelated.blog_id == blog_id)
+    )).all()
+    if sorted(map(tuple, current), reverse=True) == entries:
+        return False
+    await session.execute(delete(BlogRelated).where(BlogRelated.blog_id == blog_id))
+    if entries:
+        await session.execute(insert(BlogRelated), [
+            {"blog_id": blog_id, "related_id": related_id, "score": score} for score, related_id in entries
+        ])
+    return True
+
+
+async def _offer(session: AsyncSession, post: Post, scores: dict[int, float], limit: int) -> int:
+    """Put `post` into the lists (of the posts in `scores`) where it beats the lowest entry. Returns how many."""
+    lists: dict[int, list[Entry]] = defaultdict(list)
+    ids = sorted(scores)
+    for start in range(0, len(ids), REBUILD_BATCH_SIZE):
+        rows = (await session.exec(
+            select(BlogRelated.blog_id, BlogRelated.score, BlogRelated.related_id)
+            .where(BlogRelated.blog_id.in_(ids[start:start + REBUILD_BATCH_SIZE]))
+        )).all()
+        for blog_id, score, related_id in rows:
+            lists[blog_id].append((score, related_id))
+
+    entered = 0
+    for blog_id in ids:
+        entry = (scores[blog_id], post.id)
+        kept = sorted([*lists[blog_id], entry], reverse=True)[:limit]
+        if entry not in kept:
+            continue
+        dropped = [related_id for score, related_id in lists[blog_id] if (score, related_id) not in kept]
+        if dropped:
+            await session.execute(delete(BlogRelated).where(
+                BlogRelated.blog_id == blog_id, BlogRelated.related_id.in_(dropped)))
+        await session.execute(insert(BlogRelated), [{"blog_id": blog_id, "related_id": post.id, "score": entry[0]}])
+        entered += 1
+    return entered
+
+
+async def _sync_tag_set(session: AsyncSession, blog_id: int, post: Optional[Post]) -> None:
+    await session.execute(delete(BlogTagSet).where(BlogTagSet.blog_id == blog_id))
+    if post is not None and post.tags:
+        key = _tag_key(post.tags)
+        await session.execute(insert(BlogTagSet), [{
+            "blog_id": post.id, "tag_key": key, "is_published": post.is_published, "created_at": post.created_at,
+        }])
+        known = set((await session.exec(select(BlogTagGroup.tag).where(BlogTagGroup.tag_key == key))).all())
+        if known != post.tags:
+            await session.execute(insert(BlogTagGroup), [
+                {"tag": tag, "tag_key": key} for tag in sorted(post.tags - known)
+            ])
+
+
+async def update_related(session: AsyncSession, blog_id: int) -> int:
+    """
+    Bring every list a write to post `blog_id` can affect in line with the post as committed
+    (it may be gone), in the caller's transaction. Jobs must not overlap: use `run_update`.
+    Returns how many lists changed.
+    """
+    limit = settings.RELATED_POSTS
+    if session.bind.dialect.name == "postgresql":
+        # Released at commit; jobs in other processes wait here
+        await session.execute(text("SELECT pg_advisory_xact_lock(:key)"), {"key": RELATED_LOCK_KEY})
+
+    row = (await session.exec(select(*_POST_COLUMNS).where(Blog.id == blog_id))).first()
+    post = _post(row) if row is not None else None
+    await _sync_tag_set(session, blog_id, post)
+    tag_sets = _TagSets(session, limit)
+    # The lists the post is in, with its score there
+    holders = dict((await session.exec(
+        select(BlogRelated.blog_id, BlogRelated.score).where(BlogRelated.related_id == blog_id)
+    )).all())
+    holder_posts = await tag_sets.fetch(
+        select(*_SET_COLUMNS).where(BlogTagSet.blog_id.in_(sorted(holders)))
+    ) if holders else []
+
+    changed = 0
+    refill: list[Post] = []
+    if post is None:
+        await session.execute(delete(BlogRelated).where(BlogRelated.blog_id == blog_id))
+        refill = holder_posts
+    else:
+        changed += await _replace_list(session, blog_id, await tag_sets.top(post, limit))
+        for holder in holder_posts:
+            # Drafts get lists too (for preview), but only published posts are listed
+            new = related_score(post, holder) if post.is_published else 0.0
+            if new < holders[holder.id]:
+                refill.append(holder)  # it may no longer make the cut
+            elif new > holders[holder.id]:
+                await session.execute(update(BlogRelated).where(
+                    BlogRelated.blog_id == holder.id, BlogRelated.related_id == blog_id).values(score=new))
+                changed += 1
+        if post.is_published:
+            scores = {
+                other.id: related_score(post, other)
+                for other in await tag_sets.reachable(post, limit) if other.id not in holders
+            }
+            changed += await _offer(session, post, scores, limit)
+
+    for holder in refill:
+        changed += await _replace_list(session, holder.id, await tag_sets.top(holder, limit))
+    return changed
+
+
+async def run_update(session: AsyncSession, blog_id: int) -> int:
+    """`update_related` and commit, one job at a time in this process (and across processes on Postgres)."""
+    async with _lock:
+        changed = await update_related(session, blog_id)
+        await session.commit()
+    return changed
+
+
+async def run_rebuild(engine: Engine) -> int:
+    """`rebuild_related` from a job, off the event loop and never alongside an update in this process."""
+    async with _lock:
+        return await asyncio.to_thread(rebuild_related, engine)
+
+
+def rebuild_related(engine: Engine, *, if_empty: bool = False) -> int:
+    """
+    Recompute every post's list and tag-set row from scratch; returns the number of posts.
+    With if_empty, only when there are no tag-set rows yet (seeding an upgraded database).
+    """
+    limit = settings.RELATED_POSTS
+    with Session(engine) as session:
+        if engine.dialect.name == "postgresql":
+            session.execute(text("SELECT pg_advisory_xact_lock(:key)"), {"key": RELATED_LOCK_KEY})
+        if if_empty and session.exec(select(BlogTagSet.blog_id).limit(1)).first() is not None:
+            return 0
+        posts = [_post(row) for row in session.exec(select(*_POST_COLUMNS)).all()]
+        candidates = _Candidates(posts)
+        related_rows = [
+            {"blog_id": post.id, "related_id": related_id, "score": score}
+            for post in posts
+            for score, related_id in candidates.top(post, limit)
+        ]
+        set_rows = [
+            {"blog_id": post.id, "tag_key": _tag_key(post.tags), "is_published": post.is_published,
+             "created_at": post.created_at}
+            for post in posts if post.tags
+        ]
+        group_rows = [
+            {"tag": tag, "tag_key": _tag_key(tags)}
+            for tags in sorted({post.tags for post in posts if post.tags}, key=_tag_key) for tag in sorted(tags)
+        ]
+        session.execute(delete(BlogRelated))
+        session.execute(delete(BlogTagSet))
+        session.execute(delete(BlogTagGroup))
+        for model, rows in ((BlogRelated, related_rows), (BlogTagSet, set_rows), (BlogTagGroup, group_rows)):
+            for start in range(0, len(rows), REBUILD_BATCH_SIZE):
+                session.execute(insert(model), rows[start:start + REBUILD_BATCH_SIZE])
+        # Post pages embed the lists; their Last-Modified follows the blog's write version
+        bump_sync(session, "blog")
+        session.commit()
+    return len(posts)
+
+
+async def clear_related(session: AsyncSession, blog_id: int) -> None:
+    """Drop a deleted post's own list; the lists it is in are refilled by its related_posts job."""
+    await session.execute(delete(BlogRelated).where(BlogRelated.blog_id == blog_id))
+
+
+def _link(row: Any) -> dict[str, Any]:
+    return {"id": row.id, "title": row.title, "excerpt": row.excerpt, "created_at": row.created_at}
+
+
+async def post_links(
+    session: AsyncSession, blog_id: int, created_at: datetime
+) -> tuple[dict[str, Any], tuple[tuple[int, datetime], ...]]:
+    """
+    The post page's {"related": [...], "adjacent": {"previous", "next"}} (published posts only;
+    previous is the next older post, next the next newer one), and the (id, updated_at) of
+    every linked post, which the page's validator has to cover.
+    """
+    related = (await session.exec(
+        select(*_LINK_COLUMNS)
+        .join(BlogRelated, BlogRelated.related_id == Blog.id)
+        .where(BlogRelated.blog_id == blog_id, Blog.is_published == True)
+        .order_by(BlogRelated.score.desc(), BlogRelated.related_id.desc())
+    )).all()
+    published = select(*_LINK_COLUMNS).where(Blog.is_published == True).limit(1)
+    position = tuple_(Blog.created_at, Blog.id)
+    previous = (await session.exec(
+        published.where(position < (created_at, blog_id)).order_by(Blog.created_at.desc(), Blog.id.desc())
+    )).first()
+    following = (await session.exec(
+        published.where(position > (created_at, blog_id)).order_by(Blog.created_at, Blog.id)
+    )).first()
+
+    linked = [*related, *(row for row in (previous, following) if row is not None)]
+    links = {
+        "related": [_link(row) for row in related],
+        "adjacent": {
+            "previous": _link(previous) if previous is not None else None,
+            "next": _link(following) if following is not None else None,
+        },
+    }
+    return links, tuple((row.id, row.updated_at) for row in linked)
@@ -0,0 +1,75 @@
+"""
+Write-time Markdown rendering for blog posts.
+
+Blog writes queue a coalesced "render_post" job (app/db/jobs.py) that calls
+`render_committed_post`, so a burst of edits renders once and the write
+itself never waits on Markdown. Until the job has run, readers render the
+post on the fly. `render_stale_posts` backfills rows that were never rendered
+or were rendered by an older RENDERER_VERSION (run via
+`python -m app.cli render-posts`).
+"""
+import asyncio
+from datetime import datetime, timezone
+
+from sqlalchemy import delete, insert, or_
+from sqlalchemy.engine import Engine
+from sqlalchemy.ext.asyncio import AsyncEngine
+from sqlmodel import Session, select
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from app.core.render import RENDERER_VERSION, render_markdown
+from app.models.blog import Blog, BlogRender
+
+
+def _render_row(blog_id: int, content: str) -> BlogRender:
+    rendered = render_markdown(content)
+    return BlogRender(
+        blog_id=blog_id,
+        content_html=rendered.html,
+        toc=rendered.toc,
+        word_count=rendered.word_count,
+        reading_time_minutes=rendered.reading_time_minutes,
+        renderer_version=RENDERER_VERSION,
+        rendered_at=datetime.now(timezone.utc),
+    )
+
+
+async def render_committed_post(engine: AsyncEngine, blog_id: int) -> bool:
+    """Render a post as currently committed and upsert its BlogRender row. False if the post is gone."""
+    async with AsyncSession(engine) as session:
+        content = await session.scalar(select(Blog.content).where(Blog.id == blog_id))
+        if content is None:
+            return False
+        # Markdown + Pygments is CPU work; keep it off the event loop
+        await session.merge(await asyncio.to_thread(_render_row, blog_id, content))
+        await session.commit()
+    return True
+
+
+async def render_new_posts(session: AsyncSession, posts: list[tuple[int, str]]) -> None:
+    """Render freshly inserted (id, content) pairs and insert their rows in one executemany (bulk import)."""
+    if not posts:
+        return
+    rows = await asyncio.to_thread(lambda: [_render_row(blog_id, content).model_dump() for blog_id, content in posts])
+    await session.execute(insert(BlogRender), rows)
+
+
+async def clear_render(session: AsyncSession, blog_id: int) -> None:
+    await session.execute(delete(BlogRender).where(BlogRender.blog_id == blog_id))
+
+
+def render_stale_posts(engine: Engine, *, force: bool = False, batch_size: int = 200) -> int:
+    """Render every post that is missing or out of date (all posts with force=True). Returns the count."""
+    statement = select(Blog.id).outerjoin(BlogRender, BlogRender.blog_id == Blog.id).order_by(Blog.id)
+    if not force:
+        statement = statement.where(or_(BlogRender.blog_id == None, BlogRender.renderer_version < RENDERER_VERSION))
+
+    with Session(engine) as session:
+        ids = session.exec(statement).all()
+        # Only one batch of Markdown sources is held in memory at a time
+        for start in range(0, len(ids), batch_size):
+            batch = ids[start:start + batch_size]
+            for blog_id, content in session.exec(select(Blog.id, Blog.content).where(Blog.id.in_(batch))).all():
+                session.merge(_render_row(blog_id, content))
+            session.commit()
+    return len(ids)
@@ -0,0 +1,65 @@
+"""
+Read-replica routing for anonymous reads (see `get_read_session` in app/api/deps.py).
+
+A read goes to the replica only when all of these hold:
+- DATABASE_READ_URL is set;
+- the request is anonymous (the admin, the only writer, always reads its own writes from the primary);
+- nothing was committed on the primary in the last REPLICA_WRITE_GRACE_SECONDS, so
+  a lagging replica can't refill the response cache with what a write just invalidated;
+- the replica is healthy: it's pinged at most every REPLICA_CHECK_SECONDS, and a
+  failed ping or query sends reads to the primary until the next successful ping.
+
+State is per process, which matches the single-worker deployment.
+"""
+import asyncio
+import logging
+import time
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+logger = logging.getLogger("app.db.replica")
+
+# Give up on a ping quickly; the primary is always there to fall back to
+PING_TIMEOUT_SECONDS = 1.0
+
+
+class ReplicaRouter:
+    def __init__(self, engine: AsyncEngine, *, grace_seconds: float, check_seconds: float):
+        self.engine = engine
+        self.grace_seconds = grace_seconds
+        self.check_seconds = check_seconds
+        self.healthy = True
+        self._last_write = float("-inf")
+        self._next_check = 0.0
+
+    def note_write(self) -> None:
+        self._last_write = time.monotonic()
+
+    def mark_down(self, reason: object) -> None:
+        if self.healthy:
+            logger.warning("read replica unavailable, reading from the primary: %s", reason)
+        self.healthy = False
+        self._next_check = time.monotonic() + self.check_seconds
+
+    async def use_replica(self) -> bool:
+        now = time.monotonic()
+        if now - self._last_write < self.grace_seconds:
+            return False
+        if now >= self._next_check:
+            # Claim the check before awaiting so concurrent requests don't all ping
+            self._next_check = now + self.check_seconds
+            await self._ping()
+        return self.healthy
+
+    async def _ping(self) -> None:
+        try:
+            async with asyncio.timeout(PING_TIMEOUT_SECONDS):
+                async with self.engine.connect() as connection:
+                    await connection.execute(text("SELECT 1"))
+        except Exception as exc:  # any failure (DNS, refused, timeout, auth) means "don't route here"
+            self.mark_down(exc)
+            return
+        if not self.healthy:
+            logger.info("read replica is back")
+        self.healthy = True
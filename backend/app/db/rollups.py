@@ -0,0 +1,170 @@
+"""
+Rollup tables behind the archive and category endpoints.
+
+`blog_archive` holds one row per calendar month (UTC) with the ids of its
+published posts, newest first; `project_category` one row per project
+category with its count. Reads are a scan of the rollup (one row per month
+or category), never of the posts or projects.
+
+Write handlers call `refresh_archive` / `refresh_categories` with the groups
+a write touched (e.g. both the old and the new month of a post whose date
+changed), in their transaction. A group is recounted from the source table
+through an index, not adjusted by a delta, so a refresh is always exact. On
+Postgres each group is refreshed under a transaction advisory lock, so two
+writes to one month take turns and the second sees the first committed.
+
+`rebuild_rollups` recomputes both tables from scratch and rewrites the rows
+that differ: `python -m app.cli rollups [--check]`, and `seed` on every deploy.
+"""
+import zlib
+from collections import defaultdict
+from datetime import datetime, timezone
+from typing import Any, Iterable, Optional
+
+from sqlalchemy import delete, func, insert, select, text
+from sqlalchemy.engine import Connection
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from app.models.blog import Blog, BlogArchive
+from app.models.project import Project, ProjectCategory
+
+# Arbitrary constants; with a group number as second key they lock one month / one category
+ARCHIVE_LOCK_KEY = 0xA4C
+CATEGORY_LOCK_KEY = 0xCA7
+
+Month = tuple[int, int]
+
+
+def month_of(created_at: datetime) -> Month:
+    # Timestamps are written as UTC; naive values are UTC too
+    if created_at.tzinfo is not None:
+        created_at = created_at.astimezone(timezone.utc)
+    return created_at.year, created_at.month
+
+
+def archive_month(blog: Blog) -> Optional[Month]:
+    """The archive month a post is counted in; None for drafts."""
+    return month_of(blog.created_at) if blog.is_published else None
+
+
+async def locked_archive_month(session: AsyncSession, blog_id: int) -> Optional[Month]:
+    """
+    The archive month of the post as stored, locking its row until the transaction ends (so no
+    concurrent edit moves it in between); None for drafts and missing posts.
+    """
+    row = (await session.execute(
+        select(Blog.is_published, Blog.created_at).where(Blog.id == blog_id).with_for_update()
+    )).first()
+    return month_of(row.created_at) if row is not None and row.is_published else None
+
+
+def _month_bounds(year: int, month: int) -> tuple[datetime, datetime]:
+    end = datetime(year + 1, 1, 1, tzinfo=timezone.utc) if month == 12 else datetime(year, month + 1, 1, tzinfo=timezone.utc)
+    return datetime(year, month, 1, tzinfo=timezone.utc), end
+
+
+async def _lock(session: AsyncSession, key: int, group: int) -> None:
+    if session.bind.dialect.name == "postgresql":
+        # Released at commit
+        await session.execute(text("SELECT pg_advisory_xact_lock(:key, :group)"), {"key": key, "group": group})
+
+
+async def refresh_archive(session: AsyncSession, months: Iterable[Optional[Month]]) -> None:
+    """Recount the given archive months (None entries are skipped) in the caller's transaction."""
+    await session.flush()
+    for year, month in sorted({month for month in months if month is not None}):
+        await _lock(session, ARCHIVE_LOCK_KEY, year * 100 + month)
+        start, end = _month_bounds(year, month)
+        # ix_blog_published_created_at_id, read backwards
+        ids = list((await session.execute(
+            select(Blog.id)
+            .where(Blog.is_published == True, Blog.created_at >= start, Blog.created_at < end)
+            .order_by(Blog.created_at.desc(), Blog.id.desc())
+        )).scalars())
+        await session.execute(delete(BlogArchive).where(BlogArchive.year == year, BlogArchive.month == month))
+        if ids:
+            await session.execute(insert(BlogArchive).values(
+                year=year, month=month, count=len(ids), ids=ids, updated_at=datetime.now(timezone.utc)))
+
+
+async def refresh_categories(session: AsyncSession, categories: Iterable[Optional[str]]) -> None:
+    """Recount the given project categories (None entries are skipped) in the caller's transaction."""
+    await session.flush()
+    for category in sorted({category for category in categories if category is not None}):
+        # Shifted into int4, the range of pg_advisory_xact_lock's two-key form
+        await _lock(session, CATEGORY_LOCK_KEY, zlib.crc32(category.encode("utf-8")) - (1 << 31))
+        count = await session.scalar(select(func.count()).select_from(Project).where(Project.category == category))
+        await session.execute(delete(ProjectCategory).where(ProjectCategory.category == category))
+        if count:
+            await session.execute(insert(ProjectCategory).values(
+                category=category, count=count, updated_at=datetime.now(timezone.utc)))
+
+
+async def read_archive(session: AsyncSession) -> tuple[list[dict[str, Any]], Optional[datetime]]:
+    """[{year, month, count, ids}], newest month first, and when the rollup last changed."""
+    rows = (await session.execute(
+        select(BlogArchive.year, BlogArchive.month, BlogArchive.count, BlogArchive.ids, BlogArchive.updated_at)
+        .order_by(BlogArchive.year.desc(), BlogArchive.month.desc())
+    )).all()
+    months = [{"year": year, "month": month, "count": count, "ids": ids} for year, month, count, ids, _ in rows]
+    return months, max((row.updated_at for row in rows), default=None)
+
+
+async def read_categories(session: AsyncSession) -> tuple[list[dict[str, Any]], Optional[datetime]]:
+    """[{category, count}] ordered by count desc, then category, and when the rollup last changed."""
+    rows = (await session.execute(
+        select(ProjectCategory.category, ProjectCategory.count, ProjectCategory.updated_at)
+        .order_by(ProjectCategory.count.desc(), ProjectCategory.category)
+    )).all()
+    categories = [{"category": category, "count": count} for category, count, _ in rows]
+    return categories, max((row.updated_at for row in rows), default=None)
+
+
+def _rewrite(connection: Connection, model, keys: tuple[str, ...], stored: dict, expected: dict, check: bool) -> int:
+    """Replace the rows whose values differ from `expected` (or only count them, with `check`)."""
+    stale = [key for key in stored.keys() | expected.keys() if stored.get(key) != expected.get(key)]
+    if check or not stale:
+        return len(stale)
+    now = datetime.now(timezone.utc)
+    for key in stale:
+        connection.execute(delete(model).where(*(getattr(model, name) == value for name, value in zip(keys, key))))
+    rows = [{**dict(zip(keys, key)), **expected[key], "updated_at": now} for key in stale if key in expected]
+    if rows:
+        connection.execute(insert(model), rows)
+    return len(stale)
+
+
+def rebuild_rollups(connection: Connection, *, check: bool = False) -> dict[str, int]:
+    """
+    Recompute both rollups from the source tables and fix the rows that differ, in the
+    connection's transaction (only count them with `check`). Returns the stale rows per rollup.
+    """
+    if connection.dialect.name == "postgresql" and not check:
+        # Writes in flight finish first; later ones wait and then refresh their groups over this
+        connection.execute(text("LOCK TABLE blog_archive, project_category IN SHARE ROW EXCLUSIVE MODE"))
+
+    months: dict[Month, list[int]] = defaultdict(list)
+    for blog_id, created_at in connection.execute(
+        select(Blog.id, Blog.created_at).where(Blog.is_published == True).order_by(Blog.created_at.desc(), Blog.id.desc())
+    ):
+        months[month_of(created_at)].append(blog_id)
+    expected_archive = {key: {"count": len(ids), "ids": ids} for key, ids in months.items()}
+    stored_archive = {
+        (year, month): {"count": count, "ids": ids}
+        for year, month, count, ids in connection.execute(
+            select(BlogArchive.year, BlogArchive.month, BlogArchive.count, BlogArchive.ids))
+    }
+
+    expected_categories = {
+        (category,): {"count": count}
+        for category, count in connection.execute(select(Project.category, func.count()).group_by(Project.category))
+    }
+    stored_categories = {
+        (category,): {"count": count}
+        for category, count in connection.execute(select(ProjectCategory.category, ProjectCategory.count))
+    }
+
+    return {
+        "archive": _rewrite(connection, BlogArchive, ("year", "month"), stored_archive, expected_archive, check),
+        "categories": _rewrite(connection, ProjectCategory, ("category",), stored_categories, expected_categories, check),
+    }
@@ -0,0 +1,77 @@
+"""
+Startup schema check: is the database at the Alembic head revision?
+
+Alembic owns the schema (`alembic upgrade head`); the app only verifies it on
+startup and refuses to start on a stale database instead of patching it up
+with create_all. The head is read straight from the migration files' source
+(`revision` / `down_revision`), because importing alembic.script costs about
+a quarter of a second of startup for the same answer.
+"""
+import ast
+from pathlib import Path
+from typing import Optional
+
+from sqlalchemy import inspect, text
+from sqlalchemy.engine import Connection
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+BACKEND_DIR = Path(__file__).resolve().parents[2]
+VERSIONS_DIR = BACKEND_DIR / "migrations" / "versions"
+
+
+class SchemaOutOfDate(RuntimeError):
+    pass
+
+
+def _literal(node: ast.AST) -> set[str]:
+    value = ast.literal_eval(node)
+    if value is None:
+        return set()
+    return {value} if isinstance(value, str) else set(value)
+
+
+def expected_heads(versions_dir: Path = VERSIONS_DIR) -> set[str]:
+    """Revisions no other migration builds on."""
+    revisions: set[str] = set()
+    parents: set[str] = set()
+    for path in versions_dir.glob("*.py"):
+        for node in ast.parse(path.read_text(encoding="utf-8")).body:
+            if isinstance(node, ast.AnnAssign) and isinstance(node.target, ast.Name) and node.value is not None:
+                name, value = node.target.id, node.value
+            elif isinstance(node, ast.Assign) and len(node.targets) == 1 and isinstance(node.targets[0], ast.Name):
+                name, value = node.targets[0].id, node.value
+            else:
+                continue
+            if name == "revision":
+                revisions |= _literal(value)
+            elif name == "down_revision":
+                parents |= _literal(value)
+    return revisions - parents
+
+
+def current_heads(connection: Connection) -> Optional[set[str]]:
+    """Revisions recorded in alembic_version, or None for a database Alembic never ran on."""
+    if not inspect(connection).has_table("alembic_version"):
+        return None
+    return {row[0] for row in connection.execute(text("SELECT version_num FROM alembic_version"))}
+
+
+async def check_schema(engine: AsyncEngine) -> None:
+    expected = expected_heads()
+    async with engine.connect() as connection:
+        current = await connection.run_sync(current_heads)
+    if current != expected:
+        raise SchemaOutOfDate(
+            f"Database schema is at {sorted(current) if current else 'no revision'}, expected {sorted(expected)}. "
+            "Run `alembic upgrade head` (and `python -m app.cli seed` for a new database) before starting the API."
+        )
+
+
+def upgrade_to_head() -> None:
+    """Programmatic `alembic upgrade head` (CLI and benchmarks); alembic is only imported here."""
+    from alembic import command
+    from alembic.config import Config
+
+    config = Config(str(BACKEND_DIR / "alembic.ini"))
+    config.attributes["configure_logger"] = False
+    command.upgrade(config, "head")
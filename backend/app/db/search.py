@@ -0,0 +1,170 @@
+"""
+Full-text search over blog posts.
+
+Postgres keeps a weighted `blog.search_vector` tsvector (GIN-indexed); SQLite
+keeps a standalone FTS5 table `blog_fts` keyed by the post id. Neither lives
+on the SQLModel, so the blog router calls `index_post` / `unindex_post` inside
+its write transactions to keep them in step, and Alembic's autogenerate skips
+them (`is_search_structure`, used by migrations/env.py).
+"""
+from typing import Any
+
+from sqlalchemy import Float, String, bindparam, column, text
+from sqlalchemy.engine import Connection
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from app.core.config import settings
+from app.models.blog import Blog
+
+SNIPPET_START = "<mark>"
+SNIPPET_STOP = "</mark>"
+
+_PG_VECTOR = """
+    setweight(to_tsvector(CAST(:config AS regconfig), coalesce(title, '')), 'A') ||
+    setweight(to_tsvector(CAST(:config AS regconfig), coalesce(excerpt, '')), 'B') ||
+    setweight(to_tsvector(CAST(:config AS regconfig), coalesce(content, '')), 'C')
+"""
+
+# Rank and page on the index first; ts_headline only runs for the rows returned
+_PG_SEARCH = f"""
+    SELECT b.id, b.title, b.excerpt, b.tags, b.is_published, b.created_at, b.updated_at,
+           hits.rank,
+           ts_headline(CAST(:config AS regconfig), b.content, hits.query,
+                       'StartSel={SNIPPET_START}, StopSel={SNIPPET_STOP}, MaxFragments=2, MaxWords=30, MinWords=10') AS snippet
+    FROM (
+        SELECT blog.id, ts_rank_cd(blog.search_vector, query) AS rank, query
+        FROM blog, websearch_to_tsquery(CAST(:config AS regconfig), :q) AS query
+        WHERE blog.search_vector @@ query {{visibility}}
+        ORDER BY rank DESC, blog.created_at DESC
+        LIMIT :limit OFFSET :offset
+    ) AS hits
+    JOIN blog b ON b.id = hits.id
+    ORDER BY hits.rank DESC, b.created_at DESC
+"""
+
+# bm25() is "lower is better"; negate it so both backends return higher-is-better ranks
+_SQLITE_SEARCH = f"""
+    SELECT b.id, b.title, b.excerpt, b.tags, b.is_published, b.created_at, b.updated_at,
+           -bm25(blog_fts, 10.0, 5.0, 1.0) AS rank,
+           snippet(blog_fts, 2, '{SNIPPET_START}', '{SNIPPET_STOP}', '…', 24) AS snippet
+    FROM blog_fts
+    JOIN blog b ON b.id = blog_fts.rowid
+    WHERE blog_fts MATCH :q {{visibility}}
+    ORDER BY bm25(blog_fts, 10.0, 5.0, 1.0), b.created_at DESC
+    LIMIT :limit OFFSET :offset
+"""
+
+
+# Created by migration 0002 in raw DDL, outside the metadata
+FTS_TABLE = "blog_fts"
+PG_SEARCH_COLUMN = "search_vector"
+PG_SEARCH_INDEX = "ix_blog_search_vector"
+
+
+def is_search_structure(name: str, type_: str) -> bool:
+    """Whether a reflected table/column/index is one of the search structures (FTS5 keeps shadow tables blog_fts_*)."""
+    if type_ == "table":
+        return name == FTS_TABLE or name.startswith(FTS_TABLE + "_")
+    if type_ == "column":
+        return name == PG_SEARCH_COLUMN
+    if type_ == "index":
+        return name == PG_SEARCH_INDEX
+    return False
+
+
+def _fts5_query(q: str) -> str:
+    """Quote every term so user input can't hit FTS5 query syntax; terms are ANDed."""
+    return " ".join('"' + term.replace('"', '""') + '"' for term in q.split())
+
+
+def ensure_search_index(connection: Connection) -> None:
+    """Idempotently create the search structures for databases built by create_all."""
+    if connection.dialect.name == "postgresql":
+        connection.execute(text("ALTER TABLE blog ADD COLUMN IF NOT EXISTS search_vector tsvector"))
+        connection.execute(text("CREATE INDEX IF NOT EXISTS ix_blog_search_vector ON blog USING GIN (search_vector)"))
+        connection.execute(
+            text(f"UPDATE blog SET search_vector = {_PG_VECTOR} WHERE search_vector IS NULL"),
+            {"config": settings.SEARCH_TEXT_CONFIG},
+        )
+    elif connection.dialect.name == "sqlite":
+        connection.execute(text(
+            "CREATE VIRTUAL TABLE IF NOT EXISTS blog_fts "
+            "USING fts5(title, excerpt, content, tokenize='porter unicode61')"
+        ))
+        connection.execute(text(
+            "INSERT INTO blog_fts (rowid, title, excerpt, content) "
+            "SELECT id, title, coalesce(excerpt, ''), content FROM blog "
+            "WHERE id NOT IN (SELECT rowid FROM blog_fts)"
+        ))
+
+
+async def index_post(session: AsyncSession, blog: Blog) -> None:
+    """(Re)index a flushed post in the current transaction."""
+    dialect = session.bind.dialect.name
+    if dialect == "postgresql":
+        await session.execute(
+            text(f"UPDATE blog SET search_vector = {_PG_VECTOR} WHERE id = :id"),
+            {"config": settings.SEARCH_TEXT_CONFIG, "id": blog.id},
+        )
+    elif dialect == "sqlite":
+        await unindex_post(session, blog.id)
+        await session.execute(
+            text("INSERT INTO blog_fts (rowid, title, excerpt, content) VALUES (:id, :title, :excerpt, :content)"),
+            {"id": blog.id, "title": blog.title, "excerpt": blog.excerpt or "", "content": blog.content},
+        )
+
+
+async def index_new_posts(session: AsyncSession, blog_ids: list[int]) -> None:
+    """Index freshly inserted posts in one statement (bulk import)."""
+    if not blog_ids:
+        return
+    dialect = session.bind.dialect.name
+    ids = bindparam("ids", expanding=True)
+    if dialect == "postgresql":
+        await session.execute(
+            text(f"UPDATE blog SET search_vector = {_PG_VECTOR} WHERE id IN :ids").bindparams(ids),
+            {"config": settings.SEARCH_TEXT_CONFIG, "ids": blog_ids},
+        )
+    elif dialect == "sqlite":
+        await session.execute(
+            text(
+                "INSERT INTO blog_fts (rowid, title, excerpt, content) "
+                "SELECT id, title, coalesce(excerpt, ''), content FROM blog WHERE id IN :ids"
+            ).bindparams(ids),
+            {"ids": blog_ids},
+        )
+
+
+async def unindex_post(session: AsyncSession, blog_id: int) -> None:
+    # The Postgres vector is a column on the row and goes away with it
+    if session.bind.dialect.name == "sqlite":
+        await session.execute(text("DELETE FROM blog_fts WHERE rowid = :id"), {"id": blog_id})
+
+
+async def search_posts(
+    session: AsyncSession,
+    q: str,
+    *,
+    published_only: bool,
+    limit: int,
+    offset: int,
+) -> list[dict[str, Any]]:
+    """Ranked matches for `q` with a highlighted content snippet, best first."""
+    dialect = session.bind.dialect.name
+    if dialect == "postgresql":
+        statement = _PG_SEARCH.format(visibility="AND blog.is_published" if published_only else "")
+        params = {"config": settings.SEARCH_TEXT_CONFIG, "q": q}
+    elif dialect == "sqlite":
+        statement = _SQLITE_SEARCH.format(visibility="AND b.is_published = 1" if published_only else "")
+        params = {"q": _fts5_query(q)}
+    else:
+        raise NotImplementedError(f"Full-text search is not supported on {dialect}")
+
+    # Raw SQL skips the ORM's JSON/DateTime result processing, so cast through the column types
+    blog = Blog.__table__.c
+    typed = text(statement).columns(
+        blog.id, blog.title, blog.excerpt, blog.tags, blog.is_published, blog.created_at, blog.updated_at,
+        column("rank", Float), column("snippet", String),
+    )
+    result = await session.execute(typed, {**params, "limit": limit, "offset": offset})
+    return [dict(row._mapping) for row in result.all()]
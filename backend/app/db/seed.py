@@ -0,0 +1,119 @@
+"""
+One-shot seeding of a fresh database: `python -m app.cli seed`.
+
+Runs after `alembic upgrade head` (not on every API start), inserts the
+welcome post and sample projects only into empty tables, then backfills the
+derived search/tag/render rows, fixes any stale archive/category rollup rows,
+and fills the related-post lists if there are none. On Postgres the whole run holds a transaction advisory lock, so
+concurrent invocations (e.g. several containers starting at once) seed
+exactly once; SQLite deployments are single-host and skip the lock.
+"""
+from sqlalchemy import text
+from sqlalchemy.engine import Engine
+from sqlmodel import Session, select
+
+from app.db.related import rebuild_related
+from app.db.rendering import render_stale_posts
+from app.db.rollups import rebuild_rollups
+from app.db.versions import bump_sync
+from app.db.search import ensure_search_index
+from app.db.tags import ensure_tag_index
+from app.models.blog import Blog
+from app.models.project import Project
+
+# Arbitrary constant shared by every seeding process
+SEED_LOCK_KEY = 0x5EED
+
+WELCOME_POST = dict(
+    title="Welcome to My Personal Website!",
+    excerpt="This is your first blog post generated automatically.",
+    content="""## Hello World
+
+Successfully connected **FastAPI** and **Vue 3**! This is your first blog post.
+
+### What's included
+
+- **Backend**: FastAPI with SQLModel
+- **Frontend**: Vue 3 with TypeScript, Tailwind CSS, shadcn/vue, GSAP, etc.
+- **Database**: PostgreSQL
+
+### Quick start
+
+```bash
+# Backend
+cd backend && uvicorn app.main:app --reload
+
+# Frontend
+cd frontend && npm run dev
+```
+
+### Next steps
+
+1. Edit this post in the admin panel
+2. Add your own projects and blog posts
+3. Customise the theme and content
+
+*Happy coding!*""",
+    is_published=True,
+    tags=["General", "Tech"],
+)
+
+SEED_PROJECTS = [
+    dict(
+        title="Personal Website",
+        description="Personal portfolio website built with FastAPI and Vue 3.",
+        category="Web",
+        tags=["FastAPI", "Vue", "TypeScript"],
+        github_url="https://github.com",
+        live_url="https://example.com",
+        order=1,
+    ),
+    dict(
+        title="AI Chatbot Platform",
+        description="A simple AI chatbot platform with OpenAI API.",
+        category="Web",
+        tags=["Python", "SQLModel", "REST API"],
+        order=2,
+    ),
+    dict(
+        title="Side Project",
+        description="A simple side project to showcase your skills.",
+        category="Other",
+        tags=["Demo", "Full-stack"],
+        order=3,
+    ),
+]
+
+
+def seed_database(engine: Engine) -> dict[str, int]:
+    """Seed empty tables; safe to run on every deploy. Returns what was inserted."""
+    inserted = {"posts": 0, "projects": 0}
+    with Session(engine) as session:
+        if engine.dialect.name == "postgresql":
+            # Released at commit; a second seeder waits here, then finds the rows
+            session.execute(text("SELECT pg_advisory_xact_lock(:key)"), {"key": SEED_LOCK_KEY})
+
+        # Check if there is any data, if not, insert one (Seed Data)
+        if not session.exec(select(Blog.id).limit(1)).first():
+            session.add(Blog(**WELCOME_POST))
+            bump_sync(session, "blog")
+            inserted["posts"] = 1
+
+        # Check if there is any Project data, if not, insert three (Seed Data)
+        if not session.exec(select(Project.id).limit(1)).first():
+            for values in SEED_PROJECTS:
+                session.add(Project(**values))
+            bump_sync(session, "projects")
+            inserted["projects"] = len(SEED_PROJECTS)
+
+        # Search and tag structures index anything not indexed yet (incl. the seed rows)
+        session.flush()
+        connection = session.connection()
+        ensure_search_index(connection)
+        ensure_tag_index(connection)
+        rebuild_rollups(connection)
+        session.commit()
+
+    render_stale_posts(engine)
+    rebuild_related(engine, if_empty=True)
+    return inserted
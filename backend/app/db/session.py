@@ -1,94 +1,78 @@
-from sqlmodel import Session, create_engine, SQLModel, select
-from app.core.config import settings
+from contextlib import asynccontextmanager
 
-from app.models.blog import Blog
-from app.models.project import Project
+from sqlalchemy import event
+from sqlalchemy.engine import URL, make_url
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.ext.asyncio import create_async_engine
+from sqlmodel import create_engine
+from sqlmodel.ext.asyncio.session import AsyncSession
+from app.core.config import settings
+from app.core.metrics import instrument_engine
 
-# Create a SQLModel engine from the database URL
-engine = create_engine(settings.DATABASE_URL, echo=True)
+from app.db.replica import ReplicaRouter
 
-def init_db():
-    SQLModel.metadata.create_all(engine)
+# Async drivers used by the request path, keyed by the sync driver in DATABASE_URL
+ASYNC_DRIVERS = {
+    "postgresql": "postgresql+asyncpg",
+    "postgresql+psycopg2": "postgresql+asyncpg",
+    "sqlite": "sqlite+aiosqlite",
+    "sqlite+pysqlite": "sqlite+aiosqlite",
+}
 
-def get_session():
-    with Session(engine) as session:
-        yield session
-        
-def create_db_and_tables():
-    # Automatically create tables
-    SQLModel.metadata.create_all(engine)
-    
-    # Check if there is any data, if not, insert one (Seed Data)
-    with Session(engine) as session:
-        statement = select(Blog)
-        result = session.exec(statement).first()
-        if not result:
-            welcome_post = Blog(
-                title="Welcome to My Personal Website!",
-                excerpt="This is your first blog post generated automatically.",
-                content="""## Hello World
 
-Successfully connected **FastAPI** and **Vue 3**! This is your first blog post.
+def async_database_url(url: str) -> URL:
+    """Swap the sync driver in DATABASE_URL for its async counterpart."""
+    parsed = make_url(url)
+    return parsed.set(drivername=ASYNC_DRIVERS.get(parsed.drivername, parsed.drivername))
 
-### What's included
 
-- **Backend**: FastAPI with SQLModel
-- **Frontend**: Vue 3 with TypeScript, Tailwind CSS, shadcn/vue, GSAP, etc.
-- **Database**: PostgreSQL
+# Sync engine: maintenance commands (seeding, render backfill); Alembic builds its own
+engine = create_engine(settings.DATABASE_URL, echo=settings.DB_ECHO)
 
-### Quick start
+# Async engine: every request goes through this one
+async_engine = create_async_engine(async_database_url(settings.DATABASE_URL), echo=settings.DB_ECHO)
 
-```bash
-# Backend
-cd backend && uvicorn app.main:app --reload
+# Optional read replica with its own pool, for anonymous reads (see app/db/replica.py)
+read_engine = (
+    create_async_engine(async_database_url(settings.DATABASE_READ_URL), echo=settings.DB_ECHO)
+    if settings.DATABASE_READ_URL else None
+)
+replica_router = (
+    ReplicaRouter(
+        read_engine,
+        grace_seconds=settings.REPLICA_WRITE_GRACE_SECONDS,
+        check_seconds=settings.REPLICA_CHECK_SECONDS,
+    )
+    if read_engine is not None else None
+)
 
-# Frontend
-cd frontend && npm run dev
-```
+# Per-request query counts/timings, pool stats and the slow-query log (see app/core/metrics.py)
+instrument_engine(engine, "sync")
+instrument_engine(async_engine.sync_engine, "async")
+if read_engine is not None:
+    instrument_engine(read_engine.sync_engine, "replica")
 
-### Next steps
+    # Any commit on the primary starts the replica grace window; read-only sessions never commit
+    @event.listens_for(async_engine.sync_engine, "commit")
+    def _note_write(connection):
+        replica_router.note_write()
 
-1. Edit this post in the admin panel
-2. Add your own projects and blog posts
-3. Customise the theme and content
-
-*Happy coding!*""",
-                is_published=True,
-                tags=["General", "Tech"]
-            )
-            session.add(welcome_post)
-            session.commit()
+async def get_session():
+    # expire_on_commit=False: attribute access after commit must not trigger lazy IO
+    async with AsyncSession(async_engine, expire_on_commit=False) as session:
+        yield session
 
-    # Check if there is any Project data, if not, insert three (Seed Data)
-    with Session(engine) as session:
-        statement = select(Project)
-        result = session.exec(statement).first()
-        if not result:
-            seed_projects = [
-                Project(
-                    title="Personal Website",
-                    description="Personal portfolio website built with FastAPI and Vue 3.",
-                    category="Web",
-                    tags=["FastAPI", "Vue", "TypeScript"],
-                    github_url="https://github.com",
-                    live_url="https://example.com",
-                    order="1",
-                ),
-                Project(
-                    title="AI Chatbot Platform",
-                    description="A simple AI chatbot platform with OpenAI API.",
-                    category="Web",
-                    tags=["Python", "SQLModel", "REST API"],
-                    order="2",
-                ),
-                Project(
-                    title="Side Project",
-                    description="A simple side project to showcase your skills.",
-                    category="Other",
-                    tags=["Demo", "Full-stack"],
-                    order="3",
-                ),
-            ]
-            for p in seed_projects:
-                session.add(p)
-            session.commit()
\ No newline at end of file
+@asynccontextmanager
+async def read_session(use_replica: bool):
+    """Session for a read-only request: the replica when routed there, else the primary."""
+    if not use_replica or replica_router is None or not await replica_router.use_replica():
+        async with AsyncSession(async_engine, expire_on_commit=False) as session:
+            yield session
+        return
+    async with AsyncSession(read_engine, expire_on_commit=False) as session:
+        try:
+            yield session
+        except DBAPIError as exc:
+            # This request still fails, but the following ones go to the primary
+            replica_router.mark_down(exc)
+            raise
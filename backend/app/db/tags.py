@@ -0,0 +1,106 @@
+"""
+Indexed tag lookups for Blog and Project.
+
+`tags` stays a JSON list on each row (that's what the API returns); the
+`blog_tag` / `project_tag` link tables mirror it so tag filters and counts hit
+a B-tree index instead of parsing JSON row by row. Write handlers call
+`sync_tags` / `clear_tags` inside their transactions.
+"""
+from typing import Any, Iterable, NamedTuple, Optional
+
+from sqlalchemy import delete, func, insert, select, text
+from sqlalchemy.engine import Connection
+from sqlmodel import SQLModel
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from app.models.blog import Blog, BlogTag
+from app.models.project import Project, ProjectTag
+
+
+class TagFilter(NamedTuple):
+    any: tuple[str, ...] = ()
+    all: tuple[str, ...] = ()
+
+
+# model -> (link model, link column pointing at model.id)
+_LINKS: dict[type[SQLModel], tuple[type[SQLModel], Any]] = {
+    Blog: (BlogTag, BlogTag.blog_id),
+    Project: (ProjectTag, ProjectTag.project_id),
+}
+
+# Backfill links for rows that have tags but no link rows yet (used by startup and migration 0003)
+_BACKFILL = {
+    "postgresql": """
+        INSERT INTO {link} ({fk}, tag)
+        SELECT DISTINCT t.id, j.value FROM {table} AS t
+        CROSS JOIN LATERAL json_array_elements_text(CAST(t.tags AS json)) AS j(value)
+        WHERE NOT EXISTS (SELECT 1 FROM {link} WHERE {link}.{fk} = t.id)
+        ON CONFLICT DO NOTHING
+    """,
+    "sqlite": """
+        INSERT OR IGNORE INTO {link} ({fk}, tag)
+        SELECT t.id, j.value FROM {table} AS t, json_each(t.tags) AS j
+        WHERE t.tags IS NOT NULL AND t.id NOT IN (SELECT {fk} FROM {link})
+    """,
+}
+
+
+def ensure_tag_index(connection: Connection) -> None:
+    statement = _BACKFILL.get(connection.dialect.name)
+    if statement is None:
+        return
+    for table, link, fk in (("blog", "blog_tag", "blog_id"), ("project", "project_tag", "project_id")):
+        connection.execute(text(statement.format(table=table, link=link, fk=fk)))
+
+
+def apply_tag_filter(statement, model: type[SQLModel], tag_filter: TagFilter):
+    """Restrict a select over `model` to rows matching any/all of the given tags."""
+    link, fk = _LINKS[model]
+    if tag_filter.any:
+        statement = statement.where(model.id.in_(select(fk).where(link.tag.in_(tag_filter.any))))
+    if tag_filter.all:
+        matching = (
+            select(fk)
+            .where(link.tag.in_(tag_filter.all))
+            .group_by(fk)
+            .having(func.count() == len(tag_filter.all))
+        )
+        statement = statement.where(model.id.in_(matching))
+    return statement
+
+
+async def sync_tags(session: AsyncSession, model: type[SQLModel], item_id: int, tags: Optional[Iterable[str]]) -> None:
+    """Replace the link rows of one item with its current tag list (in the caller's transaction)."""
+    link, fk = _LINKS[model]
+    await session.execute(delete(link).where(fk == item_id))
+    unique = sorted({tag for tag in tags or () if tag})
+    if unique:
+        await session.execute(insert(link), [{fk.key: item_id, "tag": tag} for tag in unique])
+
+
+async def insert_tags(session: AsyncSession, model: type[SQLModel], items: Iterable[tuple[int, Optional[Iterable[str]]]]) -> None:
+    """Link rows for freshly inserted items, as one executemany (bulk import)."""
+    link, fk = _LINKS[model]
+    rows = [
+        {fk.key: item_id, "tag": tag}
+        for item_id, tags in items
+        for tag in sorted({tag for tag in tags or () if tag})
+    ]
+    if rows:
+        await session.execute(insert(link), rows)
+
+
+async def clear_tags(session: AsyncSession, model: type[SQLModel], item_id: int) -> None:
+    link, fk = _LINKS[model]
+    await session.execute(delete(link).where(fk == item_id))
+
+
+async def tag_counts(session: AsyncSession, model: type[SQLModel], *, published_only: bool = False) -> list[dict[str, Any]]:
+    """[{tag, count}] ordered by count desc, then tag."""
+    link, fk = _LINKS[model]
+    count = func.count().label("count")
+    statement = select(link.tag, count).group_by(link.tag).order_by(count.desc(), link.tag)
+    if published_only and model is Blog:
+        statement = statement.join(Blog, Blog.id == fk).where(Blog.is_published == True)
+    result = await session.execute(statement)
+    return [{"tag": tag, "count": n} for tag, n in result.all()]
@@ -0,0 +1,57 @@
+"""
+Write-version counters behind the collection validators.
+
+A list's ETag used to come from count() and max(updated_at) over the rows it
+filters, which is a full count on every request (and max(updated_at) alone
+misses deletes). Instead every write to posts or projects calls `bump` in its
+transaction, and reads build their validators from `current`, a primary-key
+lookup: the version for the ETag, `changed_at` (which deletes move too) for
+Last-Modified. The row lives in the database, so every worker sees every
+write; Postgres serializes writers on it, which suits admin-only writes.
+"""
+from datetime import datetime, timezone
+from typing import Literal, NamedTuple, Optional
+
+from sqlalchemy import insert, select, update
+from sqlalchemy.orm import Session
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from app.models.version import ContentVersion
+
+Scope = Literal["blog", "projects"]
+
+
+class Version(NamedTuple):
+    version: int
+    changed_at: Optional[datetime]
+
+
+def _bump_statements(scope: Scope):
+    now = datetime.now(timezone.utc)
+    return (
+        update(ContentVersion).where(ContentVersion.scope == scope)
+        .values(version=ContentVersion.version + 1, changed_at=now),
+        # Migration 0011 inserts the rows; this only covers a table emptied by hand
+        insert(ContentVersion).values(scope=scope, version=1, changed_at=now),
+    )
+
+
+async def bump(session: AsyncSession, scope: Scope) -> None:
+    """Mark the collection changed, in the caller's transaction."""
+    increment, create = _bump_statements(scope)
+    if (await session.execute(increment)).rowcount == 0:
+        await session.execute(create)
+
+
+def bump_sync(session: Session, scope: Scope) -> None:
+    """`bump` for the synchronous maintenance code (seed)."""
+    increment, create = _bump_statements(scope)
+    if session.execute(increment).rowcount == 0:
+        session.execute(create)
+
+
+async def current(session: AsyncSession, scope: Scope) -> Version:
+    row = (await session.execute(
+        select(ContentVersion.version, ContentVersion.changed_at).where(ContentVersion.scope == scope)
+    )).first()
+    return Version(*row) if row is not None else Version(0, None)
@@ -1,23 +1,40 @@
-from fastapi import FastAPI
+from fastapi import Depends, FastAPI
+from fastapi.responses import PlainTextResponse
 from fastapi.middleware.cors import CORSMiddleware
 
 from contextlib import asynccontextmanager
+from app.core.compression import CompressionMiddleware
 from app.core.config import settings
+from app.core.images import shutdown_pool
+from app.core.metrics import MetricsMiddleware, render_metrics
+from app.core.responses import ImmutableStaticFiles
+from app.core import turnstile
 
+from app.api import feeds
+from app.api.deps import require_metrics_access
 from app.api.v1.api import api_router
-from app.db.session import get_session
-from app.db.session import init_db, create_db_and_tables, engine
+from app.db import jobs
+from app.db.schema import check_schema
+from app.db.session import async_engine, read_engine
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
-    # When the server starts
-    print("🚀 Initializing database...")
-    # init_db() 
-    create_db_and_tables() # It already contains the init_db() function
+    # When the server starts: only verify the schema. Migrations (`alembic upgrade head`) and
+    # seeding (`python -m app.cli seed`) are one-shot deploy steps, not per-worker startup work.
+    print("🚀 Checking database schema...")
+    await check_schema(async_engine)
+    # Workers for side effects queued by admin writes (app/db/jobs.py)
+    jobs.start_workers(async_engine)
     yield
     
     # When the server stops
     print("👋 Stopping API...")
+    await jobs.stop_workers()
+    await turnstile.aclose()
+    shutdown_pool()
+    await async_engine.dispose()
+    if read_engine is not None:
+        await read_engine.dispose()
     
 
 app = FastAPI(
@@ -31,6 +48,19 @@ app = FastAPI(
 )
 
 app.include_router(api_router, prefix="/api/v1")
+app.include_router(feeds.router)
+# Uploaded originals and their variants (app/db/images.py); the directory appears with the first upload
+app.mount(settings.MEDIA_URL, ImmutableStaticFiles(directory=settings.MEDIA_DIR, check_dir=False), name="media")
+
+app.add_middleware(
+    CompressionMiddleware,
+    minimum_size=settings.COMPRESSION_MINIMUM_SIZE,
+    gzip_level=settings.COMPRESSION_GZIP_LEVEL,
+    brotli_quality=settings.COMPRESSION_BROTLI_QUALITY,
+)
+
+# Outermost but for CORS, so Server-Timing and the latency histogram include compression
+app.add_middleware(MetricsMiddleware)
 
 app.add_middleware(
     CORSMiddleware,
@@ -40,6 +70,13 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+if settings.METRICS_ENABLED:
+    @app.get("/metrics", include_in_schema=False, dependencies=[Depends(require_metrics_access)])
+    def read_metrics():
+        # Prometheus text exposition format
+        return PlainTextResponse(render_metrics(), media_type="text/plain; version=0.0.4")
+
+
 @app.get("/")
 def read_root():
     return {"message": "Hello, this is the root of the API"}
\ No newline at end of file
@@ -1,14 +1,22 @@
-from sqlmodel import SQLModel, Field, Column, JSON
+from sqlmodel import SQLModel, Field, Column, Index, JSON, Text
 from typing import Optional, List
 from datetime import datetime, timezone
 
 class Blog(SQLModel, table=True):
+    # Listing is ORDER BY created_at DESC, id DESC, optionally WHERE is_published; both are read backwards
+    __table_args__ = (
+        Index("ix_blog_published_created_at_id", "is_published", "created_at", "id"),
+        Index("ix_blog_created_at_id", "created_at", "id"),
+    )
+
     id: Optional[int] = Field(default=None, primary_key=True)
     title: str
     excerpt: Optional[str] = None
     content: str
     tags: List[str] = Field(default=[], sa_column=Column(JSON))
     is_published: bool = Field(default=False)
+    # Bumped by every update; PATCH requests may name the version they edited (If-Match) and get 409 if it moved
+    version: int = Field(default=1, sa_column_kwargs={"server_default": "1"})
     created_at: datetime = Field(
         default_factory=lambda: datetime.now(timezone.utc),
         sa_column_kwargs={"server_default": "now()"}
@@ -16,4 +24,75 @@ class Blog(SQLModel, table=True):
     updated_at: datetime = Field(
         default_factory=lambda: datetime.now(timezone.utc),
         sa_column_kwargs={"server_default": "now()"}
-        )
\ No newline at end of file
+        )
+
+class BlogTag(SQLModel, table=True):
+    """One row per (post, tag); an indexed mirror of Blog.tags for filtering and counts."""
+    __tablename__ = "blog_tag"
+    __table_args__ = (Index("ix_blog_tag_tag_blog_id", "tag", "blog_id"),)
+
+    blog_id: int = Field(foreign_key="blog.id", primary_key=True, ondelete="CASCADE")
+    tag: str = Field(primary_key=True)
+
+
+class BlogRender(SQLModel, table=True):
+    """Markdown rendered at write time, one row per post (see app/core/render.py)."""
+    __tablename__ = "blog_render"
+
+    blog_id: int = Field(foreign_key="blog.id", primary_key=True, ondelete="CASCADE")
+    content_html: str = Field(sa_column=Column(Text, nullable=False))
+    toc: List[dict] = Field(default=[], sa_column=Column(JSON))
+    word_count: int = 0
+    reading_time_minutes: int = 0
+    renderer_version: int = 0
+    rendered_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
+
+
+class BlogRelated(SQLModel, table=True):
+    """A post's top related posts, kept up to date per write (see app/db/related.py)."""
+    __tablename__ = "blog_related"
+    # Reverse lookup: the lists a post appears in, which are what a write to it can change
+    __table_args__ = (Index("ix_blog_related_related_id", "related_id"),)
+
+    blog_id: int = Field(foreign_key="blog.id", primary_key=True, ondelete="CASCADE")
+    # No foreign key: rows naming a deleted post are how its related_posts job finds the lists to refill
+    related_id: int = Field(primary_key=True)
+    score: float
+
+
+class BlogTagSet(SQLModel, table=True):
+    """
+    Each post's whole tag set as one key, with the columns related-post updates seek on: posts
+    with the same tag set are equally related to any other post but for their dates. Written
+    by the related_posts job, not by the write itself (see app/db/related.py).
+    """
+    __tablename__ = "blog_tag_set"
+    __table_args__ = (Index("ix_blog_tag_set_key_published_created_at", "tag_key", "is_published", "created_at", "blog_id"),)
+
+    blog_id: int = Field(foreign_key="blog.id", primary_key=True, ondelete="CASCADE")
+    tag_key: str
+    is_published: bool
+    created_at: datetime
+
+
+class BlogTagGroup(SQLModel, table=True):
+    """
+    One row per (tag, tag set in use): a related_posts job seeks here for the groups sharing a tag
+    with a post, rather than reading every group. Rows may outlive their group until the next job
+    that meets it (or a rebuild) drops them.
+    """
+    __tablename__ = "blog_tag_group"
+
+    tag: str = Field(primary_key=True)
+    tag_key: str = Field(primary_key=True)
+
+
+class BlogArchive(SQLModel, table=True):
+    """Published posts per calendar month (UTC), newest first; a rollup kept current by post writes (see app/db/rollups.py)."""
+    __tablename__ = "blog_archive"
+
+    year: int = Field(primary_key=True)
+    month: int = Field(primary_key=True)
+    count: int
+    ids: List[int] = Field(default=[], sa_column=Column(JSON))
+    updated_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
@@ -0,0 +1,21 @@
+from sqlmodel import SQLModel, Field, Column, JSON
+from typing import Optional
+from datetime import datetime, timezone
+
+
+class ImageAsset(SQLModel, table=True):
+    """An uploaded original, stored content-addressed under MEDIA_DIR (see app/db/images.py)."""
+    __tablename__ = "image_asset"
+
+    id: str = Field(primary_key=True, max_length=64)  # sha256 of the original's bytes
+    filename: str  # stored name under MEDIA_DIR/originals, e.g. "<id>.jpg"
+    content_type: str
+    size_bytes: int
+    width: Optional[int] = None
+    height: Optional[int] = None
+    status: str = "pending"  # pending | ready | failed
+    # URL-ready variants once processed: {width, height, placeholder, src, srcset: {mime: "url 320w, ..."}}
+    variants: Optional[dict] = Field(default=None, sa_column=Column(JSON))
+    error: Optional[str] = None
+    created_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
+    updated_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
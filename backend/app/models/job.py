@@ -0,0 +1,29 @@
+from sqlalchemy import text
+from sqlmodel import SQLModel, Field, Column, Index, JSON
+from typing import Optional
+from datetime import datetime, timezone
+
+
+class Job(SQLModel, table=True):
+    """A queued side effect of a write, run by the in-process workers (see app/db/jobs.py)."""
+    __tablename__ = "job"
+    __table_args__ = (
+        # Workers claim WHERE status = 'queued' AND run_after <= now ORDER BY run_after
+        Index("ix_job_status_run_after", "status", "run_after"),
+        # At most one queued job per key: what enqueue's ON CONFLICT coalesces into (migration 0007)
+        Index("uq_job_queued_key", "key", unique=True,
+              sqlite_where=text("status = 'queued'"), postgresql_where=text("status = 'queued'")),
+    )
+
+    id: Optional[int] = Field(default=None, primary_key=True)
+    kind: str  # handler name, e.g. "render_post"
+    key: str  # coalescing key, e.g. "render_post:12"
+    payload: Optional[dict] = Field(default=None, sa_column=Column(JSON))
+    status: str = "queued"  # queued | running | done | failed
+    attempts: int = 0
+    coalesced: int = 0  # enqueues merged into this job after the first
+    run_after: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
+    created_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+    last_error: Optional[str] = None
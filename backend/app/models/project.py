@@ -1,20 +1,58 @@
-from sqlmodel import SQLModel, Field, Column, JSON
+from pydantic import field_validator
+from sqlmodel import SQLModel, Field, Column, Index, JSON
 from typing import Optional, List
 from datetime import datetime, timezone
 
+def parse_order(value) -> int:
+    """Sort key from API input; older clients send it as a string ("3"), blank means unset."""
+    if isinstance(value, str):
+        value = value.strip()
+        return int(value) if value else 0
+    if isinstance(value, bool) or not isinstance(value, int):
+        raise ValueError("order must be an integer")
+    return value
+
 class Project(SQLModel, table=True):
     id: Optional[int] = Field(default=None, primary_key=True)
     title: str
     description: str
     category: str = "Web"
     image: Optional[str] = None
+    # Copied from the ImageAsset when `image` is an uploaded original, so the list query stays one table
+    image_variants: Optional[dict] = Field(default=None, sa_column=Column(JSON))
     tags: List[str] = Field(default=[], sa_column=Column(JSON))
     github_url: Optional[str] = None
     live_url: Optional[str] = None
-    order: str = "0"
+    order: int = 0  # Sort key, ascending; numeric so 10 sorts after 2
     created_at: datetime = Field(
         default_factory=lambda: datetime.now(timezone.utc),
         sa_column_kwargs={"server_default": "now()"})
     updated_at: datetime = Field(
         default_factory=lambda: datetime.now(timezone.utc),
-        sa_column_kwargs={"server_default": "now()"})
\ No newline at end of file
+        sa_column_kwargs={"server_default": "now()"})
+
+    @field_validator("order", mode="before")
+    @classmethod
+    def order_from_string(cls, value):
+        return parse_order(value)
+
+# Matches the list query: ORDER BY "order", updated_at DESC
+Index("ix_project_order_updated_at", Project.order, Project.updated_at.desc())
+# Recounting one category after a write (app/db/rollups.py)
+Index("ix_project_category", Project.category)
+
+class ProjectTag(SQLModel, table=True):
+    """One row per (project, tag); an indexed mirror of Project.tags for filtering and counts."""
+    __tablename__ = "project_tag"
+    __table_args__ = (Index("ix_project_tag_tag_project_id", "tag", "project_id"),)
+
+    project_id: int = Field(foreign_key="project.id", primary_key=True, ondelete="CASCADE")
+    tag: str = Field(primary_key=True)
+
+class ProjectCategory(SQLModel, table=True):
+    """Projects per category; a rollup kept current by project writes (see app/db/rollups.py)."""
+    __tablename__ = "project_category"
+
+    category: str = Field(primary_key=True)
+    count: int
+    updated_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
@@ -0,0 +1,15 @@
+from sqlmodel import SQLModel, Field
+from datetime import datetime, timezone
+
+
+class ContentVersion(SQLModel, table=True):
+    """
+    A counter per collection ("blog", "projects"), bumped by every write to it in the write's
+    transaction. List validators read this one row instead of aggregating the table (see app/db/versions.py).
+    """
+    __tablename__ = "content_version"
+
+    scope: str = Field(primary_key=True)
+    version: int = 0
+    # When the collection last changed, deletes included: the Last-Modified of its documents
+    changed_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
@@ -0,0 +1,88 @@
+from pydantic import BaseModel, ConfigDict, Field
+from typing import Any, Dict, List, Optional
+from datetime import datetime
+
+class BlogSummary(BaseModel):
+    """List-view projection of Blog: everything the cards need, without `content`."""
+    id: int
+    title: str
+    excerpt: Optional[str] = None
+    tags: List[str]
+    is_published: bool
+    created_at: datetime
+    updated_at: datetime
+
+    model_config = ConfigDict(from_attributes=True)
+
+
+class PostLink(BaseModel):
+    """Another post, as linked from a post page."""
+    id: int
+    title: str
+    excerpt: Optional[str] = None
+    created_at: datetime
+
+
+class AdjacentPosts(BaseModel):
+    """The published posts just before (older) and after (newer) a post."""
+    previous: Optional[PostLink] = None
+    next: Optional[PostLink] = None
+
+
+class BlogDetail(BaseModel):
+    """read_post: the post with its related posts (precomputed, see app/db/related.py) and neighbours."""
+    id: int
+    title: str
+    excerpt: Optional[str] = None
+    content: str
+    tags: List[str]
+    is_published: bool
+    version: int
+    created_at: datetime
+    updated_at: datetime
+    related: List[PostLink] = []
+    adjacent: AdjacentPosts = AdjacentPosts()
+
+
+class BlogHTML(BaseModel):
+    """read_post?format=html: the write-time rendering instead of the Markdown source."""
+    id: int
+    title: str
+    excerpt: Optional[str] = None
+    tags: List[str]
+    is_published: bool
+    created_at: datetime
+    updated_at: datetime
+    content_html: str
+    toc: List[Dict[str, Any]]
+    word_count: int
+    reading_time_minutes: int
+    related: List[PostLink] = []
+    adjacent: AdjacentPosts = AdjacentPosts()
+
+
+class BlogEditable(BaseModel):
+    """The fields a partial edit (PATCH /blog/{id}/delta) may change; validated after the patch is applied."""
+    title: str = Field(min_length=1)
+    excerpt: Optional[str] = None
+    content: str
+    tags: List[str]
+    is_published: bool
+
+    model_config = ConfigDict(extra="forbid", strict=True)
+
+
+class BlogVersion(BaseModel):
+    """Response to a partial edit: the new version to send in the next If-Match, without the content."""
+    id: int
+    version: int
+    updated_at: datetime
+    changed: List[str]
+
+
+class ArchiveMonth(BaseModel):
+    """Published posts of one calendar month (UTC), newest first."""
+    year: int
+    month: int
+    count: int
+    ids: List[int]
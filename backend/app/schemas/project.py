@@ -1,6 +1,14 @@
 from pydantic import BaseModel, ConfigDict
-from typing import List, Optional
-from datetime import datetime, timezone
+from typing import Dict, List, Optional
+from datetime import datetime
+
+class ImageVariants(BaseModel):
+    """Resized WebP/AVIF copies of an uploaded image, ready for <picture>/<img srcset>."""
+    width: int
+    height: int
+    placeholder: str  # tiny blurred WebP as a data: URI
+    src: str  # fallback URL for <img src>
+    srcset: Dict[str, str]  # MIME type -> "url 320w, url 640w, ..."
 
 class ProjectRead(BaseModel):
     id: int
@@ -8,16 +16,15 @@ class ProjectRead(BaseModel):
     description: str
     category: str
     image: Optional[str] = None
+    image_variants: Optional[ImageVariants] = None
     tags: List[str]
     github_url: Optional[str] = None
     live_url: Optional[str] = None
     created_at: datetime
     updated_at: datetime
-    order: str
+    order: int
 
-    model_config = ConfigDict(
-        from_attributes=True,
-        json_encoders={
-            datetime: lambda v: v.astimezone(timezone.utc).isoformat()
-        }
-    )
\ No newline at end of file
+    model_config = ConfigDict(from_attributes=True)
+class CategoryCount(BaseModel):
+    category: str
+    count: int
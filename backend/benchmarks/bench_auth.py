@@ -0,0 +1,79 @@
+"""
+Measure auth overhead per request, with and without the verified-token cache.
+
+    cd backend && python -m benchmarks.bench_auth --calls 100000 --requests 2000
+
+Part 1 times the dependency work alone (jose verification vs. a cache hit),
+for a valid admin token and for a stale (expired) token sent with a public
+read. Part 2 times whole requests through the app: anonymous, valid token and
+stale token on GET /api/v1/blog/, with the cache on and off. Requires httpx
+for TestClient.
+"""
+import argparse
+import json
+import time
+from datetime import timedelta
+
+from benchmarks.common import configure_env, prepare_database, quiet_engines, timed
+
+
+def per_call_us(fn, calls: int) -> float:
+    t0 = time.perf_counter()
+    for _ in range(calls):
+        fn()
+    return round((time.perf_counter() - t0) / calls * 1e6, 3)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--calls", type=int, default=100_000)
+    parser.add_argument("--requests", type=int, default=2_000)
+    args = parser.parse_args()
+
+    configure_env()
+    from fastapi.testclient import TestClient
+    from jose import jwt
+    from app.core import security
+    from app.core.config import settings
+    from app.main import app
+
+    quiet_engines()
+    prepare_database()
+    valid = security.create_access_token({"sub": settings.API_ADMIN_USERNAME}, timedelta(hours=1))
+    stale = security.create_access_token({"sub": settings.API_ADMIN_USERNAME}, timedelta(seconds=-1))
+
+    def jose_decode(token):
+        try:
+            return jwt.decode(token, settings.JWT_SECRET_KEY, algorithms=[security.ALGORITHM])
+        except jwt.JWTError:
+            return None
+
+    results = {"per_call_us": {
+        "valid_uncached": per_call_us(lambda: jose_decode(valid), args.calls),
+        "valid_cached": per_call_us(lambda: security.decode_access_token(valid), args.calls),
+        "stale_uncached": per_call_us(lambda: jose_decode(stale), args.calls),
+        "stale_cached": per_call_us(lambda: security.decode_access_token(stale), args.calls),
+    }}
+
+    # The anonymous list response is cached, so these requests are mostly auth + routing
+    cases = {
+        "anonymous": {},
+        "valid_token": {"Authorization": f"Bearer {valid}"},
+        "stale_token": {"Authorization": f"Bearer {stale}"},
+    }
+    requests = {}
+    with TestClient(app) as client:
+        for enabled in (True, False):
+            security.token_cache.max_entries = settings.TOKEN_CACHE_MAX_ENTRIES if enabled else 0
+            security.token_cache._verified.clear()
+            for name, headers in cases.items():
+                client.get("/api/v1/blog/", headers=headers)
+                stats = timed(lambda: client.get("/api/v1/blog/", headers=headers), args.requests)
+                stats["req_per_s"] = round(1000 / stats["p50_ms"], 1)
+                requests[f"{name}{'' if enabled else '_no_cache'}"] = stats
+    results["requests"] = requests
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
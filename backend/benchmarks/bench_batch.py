@@ -0,0 +1,125 @@
+"""
+N single reads vs one batch read: GET /blog/{id} per post against GET /blog/batch?ids=.
+
+    cd backend && python -m benchmarks.bench_batch --posts 10000 --sizes 5 10 25 50 [--rtt-ms 20]
+
+For each N, fetches N random published posts (anonymously, response cache
+off) three ways and reports the wall time per set of N and the bytes received:
+
+- sequential: N GET /api/v1/blog/{id}, one after another
+- concurrent: the same N requests in flight at once (what a page firing them in parallel does)
+- batch:      one GET /api/v1/blog/batch?ids=..., a single IN query
+
+plus the projects batch (GET /api/v1/projects/batch) against fetching the whole
+list (GET /api/v1/projects/) to pick N projects out of it. --rtt-ms adds a
+simulated network round trip before every request; over ASGI there is none.
+Requires httpx.
+"""
+import argparse
+import asyncio
+import json
+import random
+import sys
+import time
+
+from benchmarks.common import configure_env, prepare_database, quiet_engines, seed_posts, seed_projects
+from benchmarks.suite import percentiles
+
+
+async def timed_sets(send, ids_sets: list[list[int]]) -> tuple[dict, int]:
+    samples, received = [], 0
+    for ids in ids_sets:
+        t0 = time.perf_counter()
+        received = await send(ids)
+        samples.append((time.perf_counter() - t0) * 1000)
+    return percentiles(samples), received
+
+
+async def run(args) -> dict:
+    import httpx
+    from sqlmodel import select
+    from sqlmodel.ext.asyncio.session import AsyncSession
+    from app.core.cache import response_cache
+    from app.db.session import async_engine
+    from app.main import app
+    from app.models.blog import Blog
+    from app.models.project import Project
+
+    rng = random.Random(5)
+    rtt = args.rtt_ms / 1000
+
+    async with AsyncSession(async_engine) as session:
+        post_ids = list((await session.exec(select(Blog.id).where(Blog.is_published == True))).all())
+        project_ids = list((await session.exec(select(Project.id))).all())
+
+    results = {}
+    async with app.router.lifespan_context(app):
+        # Measure the database and serialization path, not cache hits
+        response_cache.enabled = False
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+            async def get(url: str, **params) -> int:
+                if rtt:
+                    await asyncio.sleep(rtt)
+                response = await client.get(url, params=params)
+                response.raise_for_status()
+                return len(response.content)
+
+            async def sequential(ids):
+                return sum([await get(f"/api/v1/blog/{blog_id}") for blog_id in ids])
+
+            async def concurrent(ids):
+                return sum(await asyncio.gather(*(get(f"/api/v1/blog/{blog_id}") for blog_id in ids)))
+
+            async def batch(ids):
+                return await get("/api/v1/blog/batch", ids=",".join(map(str, ids)))
+
+            async def projects_list(ids):
+                return await get("/api/v1/projects/")
+
+            async def projects_batch(ids):
+                return await get("/api/v1/projects/batch", ids=",".join(map(str, ids)))
+
+            for n in args.sizes:
+                post_sets = [rng.sample(post_ids, n) for _ in range(args.repeat)]
+                project_sets = [rng.sample(project_ids, min(n, len(project_ids))) for _ in range(args.repeat)]
+                entry = {}
+                for name, send, sets in (
+                    ("sequential", sequential, post_sets), ("concurrent", concurrent, post_sets), ("batch", batch, post_sets),
+                    ("projects_list", projects_list, project_sets), ("projects_batch", projects_batch, project_sets),
+                ):
+                    stats, received = await timed_sets(send, sets)
+                    entry[name] = {"bytes": received, **stats}
+                    print(f"  N={n:<4} {name:<15} p50 {stats['p50_ms']:>9.2f} ms  p95 {stats['p95_ms']:>9.2f} ms  "
+                          f"{received:>9} B", file=sys.stderr)
+                results[str(n)] = entry
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--posts", type=int, default=10_000)
+    parser.add_argument("--projects", type=int, default=200)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[5, 10, 25, 50], help="ids per set (N)")
+    parser.add_argument("--repeat", type=int, default=30, help="sets of N per size and mode")
+    parser.add_argument("--rtt-ms", type=float, default=0.0, help="simulated network round trip per request")
+    parser.add_argument("--database-url", default=None)
+    args = parser.parse_args()
+
+    configure_env(args.database_url)
+    quiet_engines()
+    prepare_database()
+
+    from app.db.related import rebuild_related
+    from app.db.session import engine
+
+    print(f"Seeding {args.posts} posts and {args.projects} projects...", file=sys.stderr)
+    seed_posts(engine, args.posts)
+    seed_projects(engine, args.projects)
+    # Single reads include related posts; give them lists to read
+    rebuild_related(engine)
+    print(json.dumps({"posts": args.posts, "rtt_ms": args.rtt_ms, "sizes": asyncio.run(run(args))}, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,68 @@
+"""
+Compare OFFSET paging with keyset (cursor) paging on GET /api/v1/blog/.
+
+    cd backend && python -m benchmarks.bench_blog_pagination --posts 100000
+
+Pass --database-url to run against Postgres instead of a temporary SQLite
+file (the target database must be empty). The response cache is off, so
+every request pays for its query. Requires httpx for TestClient.
+"""
+import argparse
+import json
+
+from benchmarks.common import configure_env, prepare_database, quiet_engines, seed_posts, timed
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--posts", type=int, default=100_000)
+    parser.add_argument("--size", type=int, default=12)
+    parser.add_argument("--pages", type=int, nargs="+", default=[1, 10, 100, 1000])
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--database-url", default=None)
+    args = parser.parse_args()
+
+    configure_env(args.database_url)
+    from fastapi.testclient import TestClient
+    from app.core.cache import response_cache
+    from app.db.session import engine
+    from app.main import app
+
+    quiet_engines()
+    prepare_database()
+    with TestClient(app) as client:
+        # Repeats of one page would otherwise be cache hits after the first
+        response_cache.enabled = False
+        seed_posts(engine, args.posts)
+
+        # Walk the cursor chain once so each deep page has its cursor ready.
+        cursors = {1: None}
+        cursor = None
+        for page in range(1, max(args.pages)):
+            params = {"size": args.size, "include_total": False}
+            if cursor is not None:
+                params["cursor"] = cursor
+            cursor = client.get("/api/v1/blog/", params=params).json()["next_cursor"]
+            if page + 1 in args.pages:
+                cursors[page + 1] = cursor
+
+        results = []
+        for page in args.pages:
+            offset_stats = timed(
+                lambda: client.get("/api/v1/blog/", params={"page": page, "size": args.size}),
+                args.repeat,
+            )
+            keyset_params = {"size": args.size}
+            if cursors.get(page):
+                keyset_params["cursor"] = cursors[page]
+            else:
+                keyset_params["include_total"] = False
+            keyset_stats = timed(lambda: client.get("/api/v1/blog/", params=keyset_params), args.repeat)
+            results.append({"page": page, "offset": offset_stats, "cursor": keyset_stats})
+            print(f"page {page:>5}  offset p50 {offset_stats['p50_ms']:>8} ms   cursor p50 {keyset_stats['p50_ms']:>8} ms")
+
+    print(json.dumps({"posts": args.posts, "size": args.size, "results": results}, indent=2))
+
+
+if __name__ == "__main__":
+    main()
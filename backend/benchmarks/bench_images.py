@@ -0,0 +1,104 @@
+"""
+Measure image variant throughput: batches of uploads through the process pool.
+
+    cd backend && python -m benchmarks.bench_images --images 24 --workers 1 2 4
+
+Generates synthetic photo-like JPEGs (gradient + noise, so encoders do real
+work), then runs app.core.images.generate_variants over the batch with a
+spawned process pool of each size, as the upload endpoint does. Reports
+images/s, per-image latency and the bytes written per format. Requires Pillow.
+"""
+import argparse
+import json
+import multiprocessing
+import os
+import statistics
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from benchmarks.common import configure_env
+
+
+def make_images(directory: str, count: int, width: int, height: int) -> list[str]:
+    from PIL import Image
+
+    paths = []
+    for i in range(count):
+        base = Image.linear_gradient("L").resize((width, height)).convert("RGB")
+        noise = Image.effect_noise((width, height), 40 + i).convert("RGB")
+        image = Image.blend(base, noise, 0.35)
+        path = os.path.join(directory, f"photo-{i}.jpg")
+        image.save(path, "JPEG", quality=90)
+        paths.append(path)
+    return paths
+
+
+def timed_variants(source: str, out_dir: str) -> tuple[float, dict]:
+    from app.core.images import generate_variants
+
+    t0 = time.perf_counter()
+    meta = generate_variants(source, out_dir)
+    return time.perf_counter() - t0, meta
+
+
+def run_batch(paths: list[str], out_root: str, workers: int) -> dict:
+    context = multiprocessing.get_context("spawn")
+    with ProcessPoolExecutor(max_workers=workers, mp_context=context) as pool:
+        # Start the workers (and their imports) before the clock, as a long-running API would have
+        list(pool.map(int, range(workers)))
+        t0 = time.perf_counter()
+        futures = [pool.submit(timed_variants, path, os.path.join(out_root, f"w{workers}", str(i)))
+                   for i, path in enumerate(paths)]
+        per_image = [future.result()[0] for future in as_completed(futures)]
+        elapsed = time.perf_counter() - t0
+    return {
+        "workers": workers,
+        "images_per_s": round(len(paths) / elapsed, 2),
+        "batch_s": round(elapsed, 2),
+        "per_image_p50_ms": round(statistics.median(per_image) * 1000, 1),
+        "per_image_max_ms": round(max(per_image) * 1000, 1),
+    }
+
+
+def output_bytes(out_dir: str) -> dict:
+    totals: dict[str, int] = {}
+    for root, _, files in os.walk(out_dir):
+        for name in files:
+            ext = name.rsplit(".", 1)[-1]
+            totals[ext] = totals.get(ext, 0) + os.path.getsize(os.path.join(root, name))
+    return totals
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--images", type=int, default=24)
+    parser.add_argument("--width", type=int, default=3000)
+    parser.add_argument("--height", type=int, default=2000)
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, os.cpu_count() or 1])
+    args = parser.parse_args()
+
+    configure_env()
+    from app.core.config import settings
+    from app.core.images import pipeline_key
+
+    work = tempfile.mkdtemp(prefix="portfolio-bench-images-")
+    paths = make_images(work, args.images, args.width, args.height)
+    source_bytes = sum(os.path.getsize(path) for path in paths)
+
+    out_root = os.path.join(work, "variants")
+    batches = [run_batch(paths, out_root, workers) for workers in sorted(set(args.workers))]
+    written = output_bytes(os.path.join(out_root, f"w{batches[0]['workers']}"))
+    print(json.dumps({
+        "images": args.images,
+        "source": f"{args.width}x{args.height} JPEG",
+        "widths": list(settings.image_widths),
+        "pipeline_key": pipeline_key(),
+        "source_kib_per_image": round(source_bytes / args.images / 1024, 1),
+        "variant_kib_per_image": {ext: round(size / args.images / 1024, 1) for ext, size in written.items()},
+        "batches": batches,
+    }, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,66 @@
+"""
+Render-on-read vs render-on-write for GET /api/v1/blog/{id}.
+
+    cd backend && python -m benchmarks.bench_markdown_render --posts 200
+
+"on read" fetches the Markdown and renders it per request, the cost the
+browser (or a server-side renderer) pays today; "on write" fetches the stored
+rendering with ?format=html. Requires httpx for TestClient.
+"""
+import argparse
+import json
+
+from benchmarks.common import configure_env, prepare_database, quiet_engines, seed_posts, timed
+
+LONG_POST = "\n\n".join(
+    f"## Section {i}\n\n" + "Some *emphasis*, a [link](https://example.com) and `code`. " * 30
+    + "\n\n```python\n" + "def handler(request):\n    return {'ok': True}\n" * 10 + "```\n\n| a | b |\n|---|---|\n| 1 | 2 |"
+    for i in range(12)
+)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--posts", type=int, default=200)
+    parser.add_argument("--repeat", type=int, default=200)
+    args = parser.parse_args()
+
+    configure_env()
+    from fastapi.testclient import TestClient
+    from sqlalchemy import update
+    from app.core.cache import response_cache
+    from app.core.render import render_markdown
+    from app.db.rendering import render_stale_posts
+    from app.db.session import engine
+    from app.main import app
+    from app.models.blog import Blog
+
+    quiet_engines()
+    prepare_database()
+    response_cache.enabled = False  # measure the database + render path, not the cache
+    with TestClient(app) as client:
+        seed_posts(engine, args.posts, published_ratio=1.0)
+        with engine.begin() as conn:
+            conn.execute(update(Blog).values(content=LONG_POST))
+        render_stale_posts(engine, force=True)
+        post_id = args.posts // 2
+
+        def on_read():
+            post = client.get(f"/api/v1/blog/{post_id}").json()
+            render_markdown(post["content"])
+
+        def on_write():
+            client.get(f"/api/v1/blog/{post_id}", params={"format": "html"}).json()
+
+        render_only = timed(lambda: render_markdown(LONG_POST), args.repeat)
+        results = {
+            "markdown_bytes": len(LONG_POST),
+            "render_only": render_only,
+            "render_on_read": timed(on_read, args.repeat),
+            "render_on_write": timed(on_write, args.repeat),
+        }
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
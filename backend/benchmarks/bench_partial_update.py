@@ -0,0 +1,154 @@
+"""
+Autosave cost of a long post: full-body PATCH vs JSON Patch vs content diff.
+
+    cd backend && python -m benchmarks.bench_partial_update --sizes 10 100 1000 --saves 50
+
+For each post size (KiB of Markdown) an editor-like session inserts a sentence
+at a random position and saves, `--saves` times, through each mode:
+
+- full:       PATCH /api/v1/blog/{id} with every field (what the editor used to send)
+- json_patch: PATCH /blog/{id}/delta, RFC 6902 `replace` of /content (still the whole text)
+- diff:       PATCH /blog/{id}/delta, one [start, end, text] content splice
+
+and reports request/response body bytes and write latency per save. Against
+Postgres (--database-url) it also reports WAL bytes per save, from
+pg_current_wal_lsn(). Job workers are off, so rendering, which is queued and
+coalesced the same way for every mode, stays out of the timings. Requires httpx.
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import sys
+import time
+
+from benchmarks.common import configure_env, prepare_database, quiet_engines
+from benchmarks.suite import percentiles
+
+MODES = ("full", "json_patch", "diff")
+
+SENTENCES = (
+    "The cache is keyed by the query parameters. ",
+    "Every write bumps the version counter. ",
+    "Keyset pagination keeps deep pages cheap. ",
+    "Rendering happens after the response, in a job. ",
+)
+
+
+def make_content(kib: int, rng: random.Random) -> str:
+    paragraphs, size = [], 0
+    while size < kib * 1024:
+        paragraph = "".join(rng.choice(SENTENCES) for _ in range(8)).strip()
+        if len(paragraphs) % 6 == 0:
+            paragraph = f"## Section {len(paragraphs) // 6 + 1}\n\n{paragraph}"
+        paragraphs.append(paragraph)
+        size += len(paragraph) + 2
+    return "\n\n".join(paragraphs)
+
+
+async def wal_position(engine):
+    """Current WAL LSN on Postgres; None elsewhere."""
+    if engine.dialect.name != "postgresql":
+        return None
+    from sqlalchemy import text
+
+    async with engine.connect() as conn:
+        return (await conn.execute(text("SELECT pg_current_wal_lsn()::text"))).scalar()
+
+
+async def wal_bytes_since(engine, start) -> int | None:
+    if start is None:
+        return None
+    from sqlalchemy import text
+
+    async with engine.connect() as conn:
+        return (await conn.execute(text("SELECT pg_wal_lsn_diff(pg_current_wal_lsn(), CAST(:start AS pg_lsn))"),
+                                   {"start": start})).scalar()
+
+
+async def run_mode(client, engine, headers: dict, mode: str, kib: int, saves: int, seed: int) -> dict:
+    rng = random.Random(seed)
+    post = {"title": f"Long post ({kib} KiB)", "excerpt": "Autosave benchmark", "tags": ["Bench"], "is_published": False,
+            "content": make_content(kib, rng)}
+    created = (await client.post("/api/v1/blog/", headers=headers, json=post)).json()
+    blog_id, version = created["id"], created["version"]
+
+    samples, sent, received = [], [], []
+    wal_start = await wal_position(engine)
+    for _ in range(saves):
+        at = rng.randrange(len(post["content"]))
+        sentence = rng.choice(SENTENCES)
+        post["content"] = post["content"][:at] + sentence + post["content"][at:]
+
+        if mode == "full":
+            url, content_type = f"/api/v1/blog/{blog_id}", "application/json"
+            body = json.dumps(post).encode("utf-8")
+        else:
+            url = f"/api/v1/blog/{blog_id}/delta"
+            if mode == "json_patch":
+                content_type = "application/json-patch+json"
+                body = json.dumps([{"op": "replace", "path": "/content", "value": post["content"]}]).encode("utf-8")
+            else:
+                # The post is ASCII, so str offsets are the UTF-16 offsets the endpoint expects
+                content_type = "application/x-content-diff+json"
+                body = json.dumps({"content": [[at, at, sentence]]}).encode("utf-8")
+
+        t0 = time.perf_counter()
+        response = await client.patch(url, content=body, headers={
+            **headers, "Content-Type": content_type, "If-Match": f'"{version}"'})
+        samples.append((time.perf_counter() - t0) * 1000)
+        response.raise_for_status()
+        version = response.json()["version"]
+        sent.append(len(body))
+        received.append(len(response.content))
+
+    wal = await wal_bytes_since(engine, wal_start)
+    await client.delete(f"/api/v1/blog/{blog_id}", headers=headers)
+    return {
+        "request_bytes": round(sum(sent) / saves),
+        "response_bytes": round(sum(received) / saves),
+        "wal_bytes": round(wal / saves) if wal is not None else None,
+        **percentiles(samples),
+    }
+
+
+async def run(args) -> dict:
+    import httpx
+    from app.core.security import create_access_token
+    from app.db.session import async_engine
+    from app.main import app
+
+    headers = {"Authorization": f"Bearer {create_access_token({'sub': os.environ['API_ADMIN_USERNAME']})}"}
+    results = {}
+    async with app.router.lifespan_context(app):
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+            for kib in args.sizes:
+                results[f"{kib}KiB"] = {}
+                for mode in MODES:
+                    # Same edits for every mode
+                    entry = await run_mode(client, async_engine, headers, mode, kib, args.saves, seed=kib)
+                    results[f"{kib}KiB"][mode] = entry
+                    print(f"  {kib:>5} KiB {mode:<10} sent {entry['request_bytes']:>9} B  "
+                          f"received {entry['response_bytes']:>9} B  p50 {entry['p50_ms']:>8.2f} ms  "
+                          f"p95 {entry['p95_ms']:>8.2f} ms", file=sys.stderr)
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10, 100, 1000], help="post sizes in KiB")
+    parser.add_argument("--saves", type=int, default=50, help="autosaves per size and mode")
+    parser.add_argument("--database-url", default=None)
+    args = parser.parse_args()
+
+    os.environ["JOB_WORKERS"] = "0"
+    configure_env(args.database_url)
+    quiet_engines()
+    prepare_database()
+    print(json.dumps(asyncio.run(run(args)), indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,173 @@
+"""
+Cost of keeping related-post lists current on a large corpus.
+
+    cd backend && python -m benchmarks.bench_related --posts 50000 --ops 30 [--verify]
+
+Seeds `--posts` synthetic posts, builds every list once (`rebuild_related`,
+what `python -m app.cli related-posts` runs), then for each kind of write
+makes `--ops` writes through the API and times the related_posts job's work
+for each one (`run_update`: `update_related` plus its commit), with the number of lists
+it changed:
+
+- create:          a new published post, dated now
+- create_backdated: a new published post dated inside the corpus, among posts
+                   whose lists it competes for
+- retag:           new tags on an existing post
+- unpublish / publish: is_published toggled (the post leaves / joins lists)
+- delete:          an existing post removed
+- edit_title:      queues no related_posts job at all (reported as such)
+
+The seeded corpus draws 2 of 8 tags per post, so every tag is shared by about
+a quarter of all posts: a pessimistic case for the per-write candidate scan.
+--verify compares the incrementally maintained table with a full rebuild.
+Job workers are off, so the job runs only where it is timed. Requires httpx.
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import sys
+import time
+from datetime import datetime, timedelta, timezone
+
+from benchmarks.common import configure_env, prepare_database, quiet_engines, seed_posts
+from benchmarks.suite import percentiles
+
+SCENARIOS = ("create", "create_backdated", "retag", "unpublish", "publish", "delete", "edit_title")
+TAGS = ["Python", "Vue", "FastAPI", "SQL", "DevOps", "Design", "Career", "Tech"]
+
+
+def snapshot_table(engine) -> list[tuple]:
+    from sqlmodel import Session, select
+    from app.models.blog import BlogRelated
+
+    with Session(engine) as session:
+        rows = session.exec(select(BlogRelated.blog_id, BlogRelated.related_id, BlogRelated.score)).all()
+    return sorted((blog_id, related_id, round(score, 9)) for blog_id, related_id, score in rows)
+
+
+async def take_related_job(session_factory, blog_id: int) -> bool:
+    """Remove the post's queued related_posts job (the benchmark runs it by hand); False if none was queued."""
+    from sqlalchemy import delete
+    from app.models.job import Job
+
+    async with session_factory() as session:
+        result = await session.execute(delete(Job).where(Job.key == f"related_posts:{blog_id}", Job.status == "queued"))
+        await session.commit()
+    return result.rowcount > 0
+
+
+async def run(args) -> dict:
+    import httpx
+    from sqlmodel import select
+    from sqlmodel.ext.asyncio.session import AsyncSession
+    from app.core.security import create_access_token
+    from app.db.related import run_update
+    from app.db.session import async_engine
+    from app.main import app
+    from app.models.blog import Blog
+
+    def session_factory():
+        return AsyncSession(async_engine)
+
+    headers = {"Authorization": f"Bearer {create_access_token({'sub': os.environ['API_ADMIN_USERNAME']})}"}
+    rng = random.Random(7)
+    corpus_start = datetime(2015, 1, 1, tzinfo=timezone.utc)
+    results = {}
+    async with app.router.lifespan_context(app):
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+            async with session_factory() as session:
+                published = list((await session.exec(select(Blog.id).where(Blog.is_published == True))).all())
+                drafts = list((await session.exec(select(Blog.id).where(Blog.is_published == False))).all())
+            rng.shuffle(published)
+            rng.shuffle(drafts)
+
+            for scenario in SCENARIOS:
+                samples, changed, queued = [], [], 0
+                for _ in range(args.ops):
+                    if scenario.startswith("create"):
+                        created_at = datetime.now(timezone.utc) if scenario == "create" else \
+                            corpus_start + timedelta(minutes=rng.randrange(args.posts))
+                        response = await client.post("/api/v1/blog/", headers=headers, json={
+                            "title": "Bench post", "content": "Body", "tags": rng.sample(TAGS, 2),
+                            "is_published": True, "created_at": created_at.isoformat(),
+                        })
+                        blog_id = response.json()["id"]
+                    elif scenario == "delete":
+                        blog_id = published.pop()
+                        response = await client.delete(f"/api/v1/blog/{blog_id}", headers=headers)
+                    else:
+                        if scenario == "publish":
+                            blog_id, body = drafts.pop(), {"is_published": True}
+                        elif scenario == "unpublish":
+                            blog_id, body = published.pop(), {"is_published": False}
+                        elif scenario == "retag":
+                            blog_id, body = published[-1], {"tags": rng.sample(TAGS, rng.randint(1, 3))}
+                            rng.shuffle(published)
+                        else:
+                            blog_id, body = published[-1], {"title": f"Renamed {rng.random()}"}
+                        response = await client.patch(f"/api/v1/blog/{blog_id}", headers=headers, json=body)
+                    response.raise_for_status()
+
+                    if not await take_related_job(session_factory, blog_id):
+                        continue
+                    queued += 1
+                    # What the related_posts job does for this write
+                    t0 = time.perf_counter()
+                    async with session_factory() as session:
+                        changed.append(await run_update(session, blog_id))
+                    samples.append((time.perf_counter() - t0) * 1000)
+
+                entry = {"jobs": queued}
+                if samples:
+                    entry.update(lists_changed_mean=round(sum(changed) / len(changed), 1),
+                                 lists_changed_max=max(changed), **percentiles(samples))
+                results[scenario] = entry
+                if samples:
+                    print(f"  {scenario:<17} p50 {entry['p50_ms']:>8.2f} ms  p95 {entry['p95_ms']:>8.2f} ms  "
+                          f"lists changed {entry['lists_changed_mean']:>6.1f} (max {entry['lists_changed_max']})",
+                          file=sys.stderr)
+                else:
+                    print(f"  {scenario:<17} no related_posts job queued", file=sys.stderr)
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--posts", type=int, default=50_000)
+    parser.add_argument("--ops", type=int, default=30, help="writes per scenario")
+    parser.add_argument("--verify", action="store_true", help="compare the maintained lists with a full rebuild")
+    parser.add_argument("--database-url", default=None)
+    args = parser.parse_args()
+
+    os.environ["JOB_WORKERS"] = "0"
+    configure_env(args.database_url)
+    quiet_engines()
+    prepare_database()
+
+    from app.db.related import rebuild_related
+    from app.db.session import engine
+    from app.db.tags import ensure_tag_index
+
+    print(f"Seeding {args.posts} posts...", file=sys.stderr)
+    seed_posts(engine, args.posts)
+    with engine.begin() as conn:
+        ensure_tag_index(conn)
+    t0 = time.perf_counter()
+    rebuild_related(engine)
+    rebuild_ms = (time.perf_counter() - t0) * 1000
+    print(f"  full rebuild      {rebuild_ms:>8.0f} ms", file=sys.stderr)
+
+    results = {"posts": args.posts, "full_rebuild_ms": round(rebuild_ms, 1), "updates": asyncio.run(run(args))}
+    if args.verify:
+        maintained = snapshot_table(engine)
+        rebuild_related(engine)
+        results["verified"] = maintained == snapshot_table(engine)
+        print(f"  incremental == rebuild: {results['verified']}", file=sys.stderr)
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+"""
+JSON encoding time and bytes on the wire for /api/v1/blog/?size=100 and /api/v1/projects/.
+
+    cd backend && python -m benchmarks.bench_serialization
+
+"before" is the stock path: jsonable_encoder + json.dumps (JSONResponse), no
+compression. "after" is what the app does now: orjson, with the encoded body
+reused from the response cache, and brotli/gzip negotiated per request.
+Requires httpx for TestClient.
+"""
+import argparse
+import json
+
+from benchmarks.common import configure_env, prepare_database, quiet_engines, seed_posts, seed_projects, timed
+
+ENDPOINTS = {
+    "blog_size_100": ("/api/v1/blog/", {"size": 100}),
+    "projects": ("/api/v1/projects/", {}),
+}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--posts", type=int, default=1000)
+    parser.add_argument("--projects", type=int, default=100)
+    parser.add_argument("--repeat", type=int, default=200)
+    args = parser.parse_args()
+
+    configure_env()
+    from fastapi.encoders import jsonable_encoder
+    from fastapi.testclient import TestClient
+    from app.core.cache import response_cache
+    from app.core.responses import dump_json
+    from app.db.session import engine
+    from app.main import app
+
+    quiet_engines()
+    prepare_database()
+    results = {}
+    with TestClient(app) as client:
+        seed_posts(engine, args.posts, published_ratio=1.0)
+        seed_projects(engine, args.projects)
+
+        for name, (url, params) in ENDPOINTS.items():
+            payload = client.get(url, params=params, headers={"Accept-Encoding": "identity"}).json()
+            # httpx decodes bodies transparently; num_bytes_downloaded is the compressed size
+            sizes = {
+                encoding: client.get(url, params=params, headers={"Accept-Encoding": encoding}).num_bytes_downloaded
+                for encoding in ("identity", "gzip", "br")
+            }
+
+            response_cache.enabled = False
+            uncached = timed(lambda: client.get(url, params=params, headers={"Accept-Encoding": "identity"}), args.repeat)
+            response_cache.enabled = True
+            cached = timed(lambda: client.get(url, params=params, headers={"Accept-Encoding": "identity"}), args.repeat)
+            cached_br = timed(lambda: client.get(url, params=params, headers={"Accept-Encoding": "br"}), args.repeat)
+
+            results[name] = {
+                "encode_before_stdlib": timed(lambda: json.dumps(jsonable_encoder(payload)).encode("utf-8"), args.repeat),
+                "encode_after_orjson": timed(lambda: dump_json(payload), args.repeat),
+                "bytes_on_wire": sizes,
+                "request_uncached_identity": uncached,
+                "request_cached_identity": cached,
+                "request_cached_br": cached_br,
+            }
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
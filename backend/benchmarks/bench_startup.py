@@ -0,0 +1,110 @@
+"""
+Measure cold-start cost: importing the app, and spawning a server until it answers.
+
+    cd backend && python -m benchmarks.bench_startup --repeats 5
+
+Part 1 imports `app.main` in a fresh interpreter (median over repeats) and
+lists the packages that cost the most in `python -X importtime`. Part 2 starts uvicorn
+against an already migrated and seeded database, as a worker would after the
+one-shot migrate step, and polls GET / until the first 200. Requires uvicorn.
+"""
+import argparse
+import json
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import time
+import urllib.error
+import urllib.request
+
+from benchmarks.common import configure_env, prepare_database, quiet_engines
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def import_seconds(env: dict) -> float:
+    code = "import time; t0 = time.perf_counter(); import app.main; print(time.perf_counter() - t0)"
+    out = subprocess.run([sys.executable, "-c", code], env=env, cwd=BACKEND_DIR, check=True, capture_output=True, text=True)
+    return float(out.stdout.strip().splitlines()[-1])
+
+
+def slowest_imports(env: dict, top: int) -> list[dict]:
+    """Self time from `-X importtime`, summed per top-level package (sqlalchemy, pydantic, ...)."""
+    out = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import app.main"],
+        env=env, cwd=BACKEND_DIR, check=True, capture_output=True, text=True,
+    )
+    totals: dict[str, int] = {}
+    for line in out.stderr.splitlines():
+        # "import time: self [us] | cumulative | imported package"
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        self_us, _, name = line.split(":", 1)[1].split("|")
+        package = name.strip().split(".")[0]
+        totals[package] = totals.get(package, 0) + int(self_us)
+    ranked = sorted(totals.items(), key=lambda item: item[1], reverse=True)[:top]
+    return [{"package": package, "self_ms": round(us / 1000, 1)} for package, us in ranked]
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def first_request_seconds(env: dict, timeout: float = 30.0) -> float:
+    port = free_port()
+    t0 = time.perf_counter()
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app.main:app", "--port", str(port), "--log-level", "warning"],
+        env=env, cwd=BACKEND_DIR, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE,
+    )
+    try:
+        while time.perf_counter() - t0 < timeout:
+            if server.poll() is not None:
+                raise RuntimeError(f"server exited: {server.stderr.read().decode()[-2000:]}")
+            try:
+                with urllib.request.urlopen(f"http://127.0.0.1:{port}/", timeout=1) as response:
+                    if response.status == 200:
+                        return time.perf_counter() - t0
+            except (urllib.error.URLError, ConnectionError):
+                time.sleep(0.005)
+        raise RuntimeError("server did not answer in time")
+    finally:
+        server.terminate()
+        server.wait()
+
+
+def summary(samples: list[float]) -> dict:
+    return {
+        "median_ms": round(statistics.median(samples) * 1000, 1),
+        "min_ms": round(min(samples) * 1000, 1),
+        "max_ms": round(max(samples) * 1000, 1),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--repeats", type=int, default=5)
+    parser.add_argument("--top", type=int, default=10)
+    parser.add_argument("--database-url", default=None)
+    args = parser.parse_args()
+
+    configure_env(args.database_url)
+    quiet_engines()
+    prepare_database()
+    env = {**os.environ, "PYTHONPATH": BACKEND_DIR}
+
+    import_seconds(env)  # warm the bytecode cache so every run measures the same thing
+    results = {
+        "import_app": summary([import_seconds(env) for _ in range(args.repeats)]),
+        "slowest_imports": slowest_imports(env, args.top),
+        "first_request": summary([first_request_seconds(env) for _ in range(args.repeats)]),
+    }
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
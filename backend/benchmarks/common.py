@@ -0,0 +1,126 @@
+"""
+Shared helpers for the benchmark scripts.
+
+Benchmarks run the real app in-process against a throwaway SQLite file, so
+`configure_env()` has to run before anything under `app` is imported
+(settings are read at import time).
+"""
+import os
+import random
+import statistics
+import tempfile
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Callable
+
+
+def configure_env(database_url: str | None = None) -> str:
+    """Point the app at a benchmark database and fill in required settings."""
+    if database_url is None:
+        path = os.path.join(tempfile.mkdtemp(prefix="portfolio-bench-"), "bench.db")
+        database_url = f"sqlite:///{path}"
+    os.environ["DATABASE_URL"] = database_url
+    os.environ.setdefault("API_ADMIN_USERNAME", "bench")
+    os.environ.setdefault("API_ADMIN_PASSWORD", "bench")
+    return database_url
+
+
+def prepare_database() -> None:
+    """Migrate the benchmark database to head and seed it, as a deploy would (the API only checks)."""
+    from app.db.schema import upgrade_to_head
+    from app.db.seed import seed_database
+    from app.db.session import engine
+
+    upgrade_to_head()
+    seed_database(engine)
+
+
+def quiet_engines() -> None:
+    """Turn off the engines' statement echo and the slow-query log so logging doesn't dominate timings."""
+    import logging
+    from app.db.session import async_engine, engine
+
+    engine.echo = False
+    async_engine.sync_engine.echo = False
+    logging.getLogger("app.db.slow").setLevel(logging.ERROR)
+
+
+def seed_posts(engine, count: int, published_ratio: float = 0.9, batch: int = 5000, start_at: int = 0) -> None:
+    """Bulk insert `count` synthetic posts with distinct, descending-friendly timestamps (numbered from `start_at`)."""
+    from sqlalchemy import insert
+    from app.models.blog import Blog
+
+    rng = random.Random(42 + start_at)
+    start = datetime(2015, 1, 1, tzinfo=timezone.utc)
+    tags = ["Python", "Vue", "FastAPI", "SQL", "DevOps", "Design", "Career", "Tech"]
+    with engine.begin() as conn:
+        for offset in range(start_at, start_at + count, batch):
+            rows = []
+            for i in range(offset, min(offset + batch, start_at + count)):
+                ts = start + timedelta(minutes=i)
+                rows.append({
+                    "title": f"Post {i}",
+                    "excerpt": f"Excerpt for post {i}",
+                    "content": f"## Post {i}\n\n" + "Lorem ipsum dolor sit amet. " * 40,
+                    "tags": rng.sample(tags, 2),
+                    "is_published": rng.random() < published_ratio,
+                    "created_at": ts,
+                    "updated_at": ts,
+                })
+            conn.execute(insert(Blog), rows)
+
+
+def seed_projects(engine, count: int, batch: int = 5000, start_at: int = 0) -> None:
+    """Bulk insert `count` synthetic projects (numbered from `start_at`)."""
+    from sqlalchemy import insert
+    from app.models.project import Project
+
+    rng = random.Random(7 + start_at)
+    now = datetime.now(timezone.utc)
+    tags = ["Python", "Vue", "FastAPI", "SQLModel", "TypeScript", "Docker", "Demo"]
+    with engine.begin() as conn:
+        for offset in range(start_at, start_at + count, batch):
+            conn.execute(insert(Project), [
+                {
+                    "title": f"Project {i}",
+                    "description": f"Description of project {i}. " * 5,
+                    "category": rng.choice(["Web", "Mobile", "Other"]),
+                    "tags": rng.sample(tags, 3),
+                    "github_url": f"https://github.com/example/project-{i}",
+                    "order": i,
+                    "created_at": now,
+                    "updated_at": now,
+                }
+                for i in range(offset, min(offset + batch, start_at + count))
+            ])
+
+
+def index_seeded(engine) -> None:
+    """Build the search, tag, rendered-HTML, rollup and related-post rows the write endpoints would have made for seeded rows."""
+    from app.db.related import rebuild_related
+    from app.db.rendering import render_stale_posts
+    from app.db.rollups import rebuild_rollups
+    from app.db.search import ensure_search_index
+    from app.db.tags import ensure_tag_index
+
+    with engine.begin() as conn:
+        ensure_search_index(conn)
+        ensure_tag_index(conn)
+        rebuild_rollups(conn)
+    render_stale_posts(engine)
+    rebuild_related(engine)
+
+
+def timed(fn: Callable[[], object], repeat: int) -> dict:
+    """Run `fn` `repeat` times and summarise latency in milliseconds."""
+    samples = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - t0) * 1000)
+    samples.sort()
+    return {
+        "p50_ms": round(statistics.median(samples), 3),
+        "p95_ms": round(samples[min(len(samples) - 1, int(len(samples) * 0.95))], 3),
+        "max_ms": round(samples[-1], 3),
+    }
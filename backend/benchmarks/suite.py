@@ -0,0 +1,317 @@
+"""
+End-to-end API benchmark suite: latency percentiles, throughput and allocations per endpoint.
+
+    cd backend && python -m benchmarks.suite --scale 1k 10k --out bench-results.json
+    cd backend && python -m benchmarks.suite --scale 1k --baseline bench-results.json
+
+Runs the real `app.main:app` in-process (lifespan included) over httpx's ASGI
+transport, against a migrated and seeded SQLite file (or --database-url).
+Scales grow one database in place: 1k posts + 1k projects, then topped up to
+10k, then 100k. Per scale and case it records:
+
+- sequential latency p50/p95/p99 (one request at a time),
+- throughput at --concurrency in-flight requests, with p50/p95/p99 under load,
+- tracemalloc peak and retained KiB per request (a separate, slower pass),
+- queries per request, from the Server-Timing header.
+
+Read cases run with the response cache off, so they measure the database and
+serialization path; `read_posts_cached` is the anonymous hit path for contrast.
+The JSON written to --out is what --baseline reads back to print deltas.
+Requires httpx.
+"""
+import argparse
+import asyncio
+import json
+import os
+import platform
+import re
+import statistics
+import subprocess
+import sys
+import time
+import tracemalloc
+from datetime import datetime, timezone
+from typing import Awaitable, Callable, NamedTuple
+
+from benchmarks.common import configure_env, index_seeded, prepare_database, quiet_engines, seed_posts, seed_projects
+
+SCALES = {"1k": 1_000, "10k": 10_000, "100k": 100_000}
+
+_QUERIES = re.compile(r'desc="(\d+) quer')
+
+
+class Case(NamedTuple):
+    name: str
+    send: Callable[["object", int], Awaitable["object"]]
+    # Fraction of --requests to issue; bcrypt makes logins ~100x slower than reads
+    weight: float = 1.0
+    # Concurrent writes only measure SQLite's single-writer lock; run them sequentially
+    concurrent: bool = True
+
+
+def percentiles(samples_ms: list[float]) -> dict:
+    ordered = sorted(samples_ms)
+
+    def rank(q: float) -> float:
+        return round(ordered[min(len(ordered) - 1, int(len(ordered) * q))], 3)
+
+    return {
+        "p50_ms": round(statistics.median(ordered), 3),
+        "p95_ms": rank(0.95),
+        "p99_ms": rank(0.99),
+        "mean_ms": round(statistics.fmean(ordered), 3),
+        "max_ms": round(ordered[-1], 3),
+    }
+
+
+def build_cases(engine, admin_headers: dict, scale: int, size: int) -> list[Case]:
+    from sqlalchemy import func, select
+    from app.api.v1.endpoints.blog import _encode_cursor
+    from app.models.blog import Blog
+    from app.models.project import Project
+
+    with engine.connect() as conn:
+        published = select(Blog.created_at, Blog.id).where(Blog.is_published == True).order_by(
+            Blog.created_at.desc(), Blog.id.desc())
+        # ~90% of the way down the published list
+        deep_offset = int(conn.execute(select(func.count()).where(Blog.is_published == True)).scalar() * 0.9)
+        deep_row = conn.execute(published.offset(deep_offset).limit(1)).one()
+        post_ids = conn.execute(select(Blog.id).where(Blog.is_published == True).limit(1000)).scalars().all()
+        project_ids = conn.execute(select(Project.id).limit(1000)).scalars().all()
+    deep_page = deep_offset // size + 1
+    deep_cursor = _encode_cursor(*deep_row)
+    login_form = {"username": os.environ["API_ADMIN_USERNAME"], "password": os.environ["API_ADMIN_PASSWORD"]}
+
+    async def read_posts(client, i):
+        return await client.get("/api/v1/blog/", params={"size": size})
+
+    async def read_posts_deep_page(client, i):
+        return await client.get("/api/v1/blog/", params={"size": size, "page": deep_page})
+
+    async def read_posts_deep_cursor(client, i):
+        return await client.get("/api/v1/blog/", params={"size": size, "cursor": deep_cursor})
+
+    async def read_post(client, i):
+        return await client.get(f"/api/v1/blog/{post_ids[i % len(post_ids)]}")
+
+    async def read_projects(client, i):
+        return await client.get("/api/v1/projects/")
+
+    async def read_archive(client, i):
+        return await client.get("/api/v1/blog/archive")
+
+    async def read_categories(client, i):
+        return await client.get("/api/v1/projects/categories")
+
+    async def create_post(client, i):
+        return await client.post("/api/v1/blog/", headers=admin_headers, json={
+            "title": f"Bench post {scale}-{i}",
+            "excerpt": "Written by the benchmark suite",
+            "content": "## Benchmark\n\n" + "Some *markdown* body text. " * 40,
+            "tags": ["Bench", "Python"],
+            "is_published": True,
+        })
+
+    async def update_project(client, i):
+        return await client.patch(f"/api/v1/projects/{project_ids[i % len(project_ids)]}", headers=admin_headers,
+                                  json={"title": f"Project renamed {i}"})
+
+    async def login(client, i):
+        return await client.post("/api/v1/login/token", data=login_form)
+
+    return [
+        Case("read_posts", read_posts),
+        Case("read_posts_deep_page", read_posts_deep_page),
+        Case("read_posts_deep_cursor", read_posts_deep_cursor),
+        Case("read_post", read_post),
+        Case("read_projects", read_projects, weight=0.25 if scale >= 100_000 else 1.0),
+        Case("read_archive", read_archive),
+        Case("read_categories", read_categories),
+        Case("create_post", create_post, weight=0.5, concurrent=False),
+        Case("update_project", update_project, weight=0.5, concurrent=False),
+        Case("login", login, weight=0.05),
+    ]
+
+
+async def sequential(client, case: Case, count: int) -> tuple[list[float], dict]:
+    samples, statuses, queries = [], {}, []
+    for i in range(count):
+        t0 = time.perf_counter()
+        response = await case.send(client, i)
+        samples.append((time.perf_counter() - t0) * 1000)
+        statuses[response.status_code] = statuses.get(response.status_code, 0) + 1
+        match = _QUERIES.search(response.headers.get("server-timing", ""))
+        if match:
+            queries.append(int(match.group(1)))
+    return samples, {"statuses": statuses, "queries_per_request": round(statistics.fmean(queries), 2) if queries else None}
+
+
+async def concurrent(client, case: Case, count: int, concurrency: int) -> dict:
+    samples: list[float] = []
+    errors = 0
+    issued = iter(range(count))
+
+    async def worker():
+        nonlocal errors
+        for i in issued:
+            t0 = time.perf_counter()
+            response = await case.send(client, i)
+            samples.append((time.perf_counter() - t0) * 1000)
+            errors += response.status_code >= 400
+
+    t0 = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - t0
+    return {"concurrency": concurrency, "req_per_s": round(count / elapsed, 1), "errors": errors, **percentiles(samples)}
+
+
+async def allocations(client, case: Case, count: int) -> dict:
+    peaks, retained = [], []
+    tracemalloc.start()
+    try:
+        for i in range(count):
+            before = tracemalloc.get_traced_memory()[0]
+            tracemalloc.reset_peak()
+            await case.send(client, i)
+            current, peak = tracemalloc.get_traced_memory()
+            peaks.append(peak - before)
+            retained.append(current - before)
+    finally:
+        tracemalloc.stop()
+    return {
+        "peak_kib": round(statistics.median(peaks) / 1024, 1),
+        "retained_kib": round(statistics.median(retained) / 1024, 1),
+    }
+
+
+async def run_scale(app, engine, label: str, args, admin_headers: dict) -> dict:
+    import httpx
+    from app.core.cache import response_cache
+
+    cases = build_cases(engine, admin_headers, SCALES[label], args.size)
+    transport = httpx.ASGITransport(app=app)
+    results = {}
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        # Cached anonymous list first, for contrast with the uncached cases below
+        response_cache.enabled = True
+        response_cache.clear()
+        hit = cases[0]._replace(name="read_posts_cached")
+        await hit.send(client, 0)
+        samples, info = await sequential(client, hit, args.requests)
+        results[hit.name] = {"sequential": percentiles(samples), **info,
+                             "throughput": await concurrent(client, hit, args.requests, args.concurrency)}
+
+        response_cache.enabled = False
+        for case in cases:
+            if args.cases and case.name not in args.cases:
+                continue
+            count = max(10, int(args.requests * case.weight))
+            for i in range(min(args.warmup, count)):
+                await case.send(client, i)
+            samples, info = await sequential(client, case, count)
+            entry = {"requests": count, "sequential": percentiles(samples), **info}
+            if case.concurrent:
+                entry["throughput"] = await concurrent(client, case, count, args.concurrency)
+            entry["allocations"] = await allocations(client, case, max(5, min(args.alloc_requests, count)))
+            results[case.name] = entry
+            print(f"  {label:>4} {case.name:<24} p50 {entry['sequential']['p50_ms']:>9.3f} ms"
+                  f"  p99 {entry['sequential']['p99_ms']:>9.3f} ms", file=sys.stderr)
+        response_cache.enabled = True
+    return results
+
+
+def git_revision() -> str | None:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], check=True, capture_output=True, text=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def print_comparison(baseline: dict, current: dict) -> None:
+    print(f"{'scale':>5} {'case':<24} {'p50 ms':>19} {'p99 ms':>19} {'req/s':>17}", file=sys.stderr)
+    for label, cases in current["scales"].items():
+        for name, entry in cases.items():
+            old = baseline.get("scales", {}).get(label, {}).get(name)
+            if old is None:
+                continue
+
+            def delta(section: str, key: str) -> str:
+                a, b = old.get(section, {}).get(key), entry.get(section, {}).get(key)
+                if not a or b is None:
+                    return "-"
+                return f"{a:.2f}->{b:.2f} ({(b - a) / a * 100:+.0f}%)"
+
+            print(f"{label:>5} {name:<24} {delta('sequential', 'p50_ms'):>19} {delta('sequential', 'p99_ms'):>19} "
+                  f"{delta('throughput', 'req_per_s'):>17}", file=sys.stderr)
+
+
+async def run(args) -> dict:
+    from app.core.security import create_access_token
+    from app.db.session import engine
+    from app.main import app
+
+    admin_headers = {"Authorization": f"Bearer {create_access_token({'sub': os.environ['API_ADMIN_USERNAME']})}"}
+    scales = {}
+    seeded = 0
+    async with app.router.lifespan_context(app):
+        for label in sorted(args.scale, key=SCALES.get):
+            target = SCALES[label]
+            t0 = time.perf_counter()
+            seed_posts(engine, target - seeded, start_at=seeded)
+            seed_projects(engine, target - seeded, start_at=seeded)
+            index_seeded(engine)
+            seeded = target
+            print(f"seeded {label} in {time.perf_counter() - t0:.1f}s", file=sys.stderr)
+            scales[label] = await run_scale(app, engine, label, args, admin_headers)
+    return scales
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--scale", nargs="+", choices=list(SCALES), default=["1k", "10k"])
+    parser.add_argument("--requests", type=int, default=500, help="sequential and concurrent requests per read case")
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--warmup", type=int, default=20)
+    parser.add_argument("--alloc-requests", type=int, default=50)
+    parser.add_argument("--size", type=int, default=12, help="page size for the list cases")
+    parser.add_argument("--cases", nargs="*", help="only run these cases (default: all)")
+    parser.add_argument("--database-url", default=None)
+    parser.add_argument("--out", default=None, help="write results JSON here (default: stdout)")
+    parser.add_argument("--baseline", default=None, help="results JSON from an earlier run to compare against")
+    args = parser.parse_args()
+
+    # Logins are part of the suite; keep the per-IP/username limiter from turning them into 429s
+    for name in ("LOGIN_IP_BURST", "LOGIN_USERNAME_BURST"):
+        os.environ[name] = str(10 ** 9)
+    configure_env(args.database_url)
+    quiet_engines()
+    prepare_database()
+
+    import sqlalchemy
+
+    results = {
+        "meta": {
+            "started_at": datetime.now(timezone.utc).isoformat(),
+            "git_revision": git_revision(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "sqlalchemy": sqlalchemy.__version__,
+            "database": os.environ["DATABASE_URL"].split(":", 1)[0],
+            "args": {key: value for key, value in vars(args).items() if key not in ("out", "baseline")},
+        },
+        "scales": asyncio.run(run(args)),
+    }
+
+    payload = json.dumps(results, indent=2)
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as fh:
+            fh.write(payload + "\n")
+    else:
+        print(payload)
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as fh:
+            print_comparison(json.load(fh), results)
+
+
+if __name__ == "__main__":
+    main()
@@ -7,8 +7,13 @@ from os.path import abspath, dirname
 sys.path.insert(0, dirname(dirname(abspath(__file__))))
 
 from sqlmodel import SQLModel
-from app.models.blog import Blog  # 必須引入 model，Alembic 先識掃描
+from app.models.blog import Blog, BlogArchive, BlogRelated, BlogRender, BlogTag, BlogTagGroup, BlogTagSet  # 必須引入 model，Alembic 先識掃描
+from app.models.project import Project, ProjectCategory, ProjectTag
+from app.models.image import ImageAsset
+from app.models.job import Job
+from app.models.version import ContentVersion
 from app.core.config import settings
+from app.db.search import is_search_structure
 
 # this is the Alembic Config object, which provides
 # access to the values within the .ini file in use.
@@ -18,7 +23,8 @@ config.set_main_option("sqlalchemy.url", settings.DATABASE_URL)
 
 # Interpret the config file for Python logging.
 # This line sets up loggers basically.
-if config.config_file_name is not None:
+# Skipped when run from app code (app.db.schema.upgrade_to_head) so the app's loggers survive.
+if config.config_file_name is not None and config.attributes.get("configure_logger", True):
     fileConfig(config.config_file_name)
 
 # add your model's MetaData object here
@@ -33,6 +39,13 @@ target_metadata = SQLModel.metadata
 # ... etc.
 
 
+def include_name(name, type_, parent_names) -> bool:
+    # Search structures are raw DDL (app/db/search.py); autogenerate must not propose dropping them
+    if type_ in ("column", "index") and parent_names.get("table_name") != "blog":
+        return True
+    return not is_search_structure(name, type_)
+
+
 def run_migrations_offline() -> None:
     """Run migrations in 'offline' mode.
 
@@ -51,6 +64,7 @@ def run_migrations_offline() -> None:
         target_metadata=target_metadata,
         literal_binds=True,
         dialect_opts={"paramstyle": "named"},
+        include_name=include_name,
     )
 
     with context.begin_transaction():
@@ -72,8 +86,9 @@ def run_migrations_online() -> None:
 
     with connectable.connect() as connection:
         context.configure(
-            connection=connection, 
-            target_metadata=target_metadata
+            connection=connection,
+            target_metadata=target_metadata,
+            include_name=include_name,
         )
 
         with context.begin_transaction():
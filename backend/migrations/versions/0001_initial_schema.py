@@ -0,0 +1,62 @@
+"""Initial schema: blog and project tables.
+
+Revision ID: 0001_initial_schema
+Revises:
+Create Date: 2026-10-18 00:00:00.000000
+
+Databases that were created by `create_db_and_tables()` already have these
+tables; the guards make this revision a no-op for them, so it is safe to run
+`alembic upgrade head` against existing installs.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0001_initial_schema"
+down_revision: Union[str, Sequence[str], None] = None
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    existing = set(sa.inspect(op.get_bind()).get_table_names())
+
+    if "blog" not in existing:
+        op.create_table(
+            "blog",
+            sa.Column("id", sa.Integer(), primary_key=True),
+            sa.Column("title", sqlmodel.sql.sqltypes.AutoString(), nullable=False),
+            sa.Column("excerpt", sqlmodel.sql.sqltypes.AutoString(), nullable=True),
+            sa.Column("content", sqlmodel.sql.sqltypes.AutoString(), nullable=False),
+            sa.Column("tags", sa.JSON(), nullable=True),
+            sa.Column("is_published", sa.Boolean(), nullable=False),
+            sa.Column("created_at", sa.DateTime(), server_default="now()", nullable=False),
+            sa.Column("updated_at", sa.DateTime(), server_default="now()", nullable=False),
+        )
+
+    if "project" not in existing:
+        op.create_table(
+            "project",
+            sa.Column("id", sa.Integer(), primary_key=True),
+            sa.Column("title", sqlmodel.sql.sqltypes.AutoString(), nullable=False),
+            sa.Column("description", sqlmodel.sql.sqltypes.AutoString(), nullable=False),
+            sa.Column("category", sqlmodel.sql.sqltypes.AutoString(), nullable=False),
+            sa.Column("image", sqlmodel.sql.sqltypes.AutoString(), nullable=True),
+            sa.Column("tags", sa.JSON(), nullable=True),
+            sa.Column("github_url", sqlmodel.sql.sqltypes.AutoString(), nullable=True),
+            sa.Column("live_url", sqlmodel.sql.sqltypes.AutoString(), nullable=True),
+            sa.Column("order", sqlmodel.sql.sqltypes.AutoString(), nullable=False),
+            sa.Column("created_at", sa.DateTime(), server_default="now()", nullable=False),
+            sa.Column("updated_at", sa.DateTime(), server_default="now()", nullable=False),
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table("project")
+    op.drop_table("blog")
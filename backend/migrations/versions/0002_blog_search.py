@@ -0,0 +1,60 @@
+"""Full-text search index for blog posts.
+
+Revision ID: 0002_blog_search
+Revises: 0001_initial_schema
+Create Date: 2026-10-18 00:00:00.000000
+
+Postgres: weighted `search_vector` tsvector column + GIN index.
+SQLite: standalone FTS5 table `blog_fts` keyed by the post id.
+Both are backfilled here and kept current by the blog router (app/db/search.py).
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+from app.core.config import settings
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0002_blog_search"
+down_revision: Union[str, Sequence[str], None] = "0001_initial_schema"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    bind = op.get_bind()
+    if bind.dialect.name == "postgresql":
+        op.execute("ALTER TABLE blog ADD COLUMN IF NOT EXISTS search_vector tsvector")
+        op.execute("CREATE INDEX IF NOT EXISTS ix_blog_search_vector ON blog USING GIN (search_vector)")
+        bind.execute(
+            sa.text(
+                "UPDATE blog SET search_vector = "
+                "setweight(to_tsvector(CAST(:config AS regconfig), coalesce(title, '')), 'A') || "
+                "setweight(to_tsvector(CAST(:config AS regconfig), coalesce(excerpt, '')), 'B') || "
+                "setweight(to_tsvector(CAST(:config AS regconfig), coalesce(content, '')), 'C')"
+            ),
+            {"config": settings.SEARCH_TEXT_CONFIG},
+        )
+    elif bind.dialect.name == "sqlite":
+        op.execute(
+            "CREATE VIRTUAL TABLE IF NOT EXISTS blog_fts "
+            "USING fts5(title, excerpt, content, tokenize='porter unicode61')"
+        )
+        op.execute("DELETE FROM blog_fts")
+        op.execute(
+            "INSERT INTO blog_fts (rowid, title, excerpt, content) "
+            "SELECT id, title, coalesce(excerpt, ''), content FROM blog"
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    bind = op.get_bind()
+    if bind.dialect.name == "postgresql":
+        op.execute("DROP INDEX IF EXISTS ix_blog_search_vector")
+        op.execute("ALTER TABLE blog DROP COLUMN IF EXISTS search_vector")
+    elif bind.dialect.name == "sqlite":
+        op.execute("DROP TABLE IF EXISTS blog_fts")
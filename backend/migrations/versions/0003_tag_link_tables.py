@@ -0,0 +1,63 @@
+"""Indexed tag link tables for blog and project.
+
+Revision ID: 0003_tag_link_tables
+Revises: 0002_blog_search
+Create Date: 2026-10-18 00:00:00.000000
+
+`blog.tags` / `project.tags` stay the source of truth returned by the API;
+`blog_tag` / `project_tag` mirror them with a (tag, id) index for filters and
+tag counts. Existing rows are converted from their JSON lists here.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0003_tag_link_tables"
+down_revision: Union[str, Sequence[str], None] = "0002_blog_search"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+LINKS = (("blog", "blog_tag", "blog_id"), ("project", "project_tag", "project_id"))
+
+BACKFILL = {
+    "postgresql": """
+        INSERT INTO {link} ({fk}, tag)
+        SELECT DISTINCT t.id, j.value FROM {table} AS t
+        CROSS JOIN LATERAL json_array_elements_text(CAST(t.tags AS json)) AS j(value)
+        ON CONFLICT DO NOTHING
+    """,
+    "sqlite": """
+        INSERT OR IGNORE INTO {link} ({fk}, tag)
+        SELECT t.id, j.value FROM {table} AS t, json_each(t.tags) AS j
+        WHERE t.tags IS NOT NULL
+    """,
+}
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    existing = set(sa.inspect(op.get_bind()).get_table_names())
+    for table, link, fk in LINKS:
+        if link not in existing:
+            op.create_table(
+                link,
+                sa.Column(fk, sa.Integer(), sa.ForeignKey(f"{table}.id", ondelete="CASCADE"), primary_key=True),
+                sa.Column("tag", sqlmodel.sql.sqltypes.AutoString(), primary_key=True),
+            )
+            op.create_index(f"ix_{link}_tag_{fk}", link, ["tag", fk])
+
+    statement = BACKFILL.get(op.get_bind().dialect.name)
+    if statement is not None:
+        for table, link, fk in LINKS:
+            op.execute(statement.format(table=table, link=link, fk=fk))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    for table, link, fk in LINKS:
+        op.drop_index(f"ix_{link}_tag_{fk}", table_name=link)
+        op.drop_table(link)
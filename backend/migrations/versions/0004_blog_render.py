@@ -0,0 +1,41 @@
+"""Write-time rendered HTML for blog posts.
+
+Revision ID: 0004_blog_render
+Revises: 0003_tag_link_tables
+Create Date: 2026-10-18 00:00:00.000000
+
+Rows are filled by the blog write handlers; backfill existing posts with
+`python -m app.cli render-posts`.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0004_blog_render"
+down_revision: Union[str, Sequence[str], None] = "0003_tag_link_tables"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    if "blog_render" in sa.inspect(op.get_bind()).get_table_names():
+        return
+    op.create_table(
+        "blog_render",
+        sa.Column("blog_id", sa.Integer(), sa.ForeignKey("blog.id", ondelete="CASCADE"), primary_key=True),
+        sa.Column("content_html", sa.Text(), nullable=False),
+        sa.Column("toc", sa.JSON(), nullable=True),
+        sa.Column("word_count", sa.Integer(), nullable=False),
+        sa.Column("reading_time_minutes", sa.Integer(), nullable=False),
+        sa.Column("renderer_version", sa.Integer(), nullable=False),
+        sa.Column("rendered_at", sa.DateTime(), nullable=False),
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table("blog_render")
@@ -0,0 +1,85 @@
+"""Composite indexes for the listing queries; integer Project.order.
+
+Revision ID: 0005_listing_indexes
+Revises: 0004_blog_render
+Create Date: 2026-10-18 00:00:00.000000
+
+- blog (is_published, created_at, id): public list, WHERE is_published ORDER BY created_at DESC, id DESC
+- blog (created_at, id): admin list (no filter), same order
+- project ("order", updated_at DESC): ORDER BY "order", updated_at DESC
+
+Project.order was a string ("10" sorted before "2"). Values that aren't
+integers become 0.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0005_listing_indexes"
+down_revision: Union[str, Sequence[str], None] = "0004_blog_render"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+INDEXES = (
+    ("ix_blog_published_created_at_id", "blog", ["is_published", "created_at", "id"]),
+    ("ix_blog_created_at_id", "blog", ["created_at", "id"]),
+    ("ix_project_order_updated_at", "project", [sa.text('"order"'), sa.text("updated_at DESC")]),
+)
+
+
+def _order_is_integer(bind) -> bool:
+    column = next(c for c in sa.inspect(bind).get_columns("project") if c["name"] == "order")
+    return isinstance(column["type"], sa.Integer)
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    bind = op.get_bind()
+    if not _order_is_integer(bind):
+        if bind.dialect.name == "postgresql":
+            op.execute(
+                """
+                ALTER TABLE project ALTER COLUMN "order" DROP DEFAULT;
+                ALTER TABLE project ALTER COLUMN "order" TYPE integer
+                    USING CASE WHEN trim("order") ~ '^-?[0-9]+$' THEN trim("order")::integer ELSE 0 END;
+                ALTER TABLE project ALTER COLUMN "order" SET DEFAULT 0;
+                """
+            )
+        else:
+            # SQLite can't alter a column type; batch mode rebuilds the table
+            op.execute(
+                """
+                UPDATE project SET "order" = '0'
+                WHERE trim("order") = '' OR trim("order", '-0123456789') != ''
+                """
+            )
+            with op.batch_alter_table("project") as batch:
+                batch.alter_column("order", type_=sa.Integer(), existing_nullable=False, server_default="0")
+
+    existing = {
+        table: {index["name"] for index in sa.inspect(bind).get_indexes(table)}
+        for table in ("blog", "project")
+    }
+    for name, table, columns in INDEXES:
+        if name not in existing[table]:
+            op.create_index(name, table, columns)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    for name, table, _ in INDEXES:
+        op.drop_index(name, table_name=table)
+    bind = op.get_bind()
+    if bind.dialect.name == "postgresql":
+        op.execute(
+            """
+            ALTER TABLE project ALTER COLUMN "order" DROP DEFAULT;
+            ALTER TABLE project ALTER COLUMN "order" TYPE varchar USING "order"::varchar;
+            """
+        )
+    else:
+        with op.batch_alter_table("project") as batch:
+            batch.alter_column("order", type_=sa.String(), existing_nullable=False, server_default=None)
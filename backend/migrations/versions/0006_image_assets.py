@@ -0,0 +1,49 @@
+"""Uploaded images and their variants on projects.
+
+Revision ID: 0006_image_assets
+Revises: 0005_listing_indexes
+Create Date: 2026-10-18 00:00:00.000000
+
+image_asset rows are written by the upload endpoint; project.image_variants
+is copied from the asset when a project's image is an uploaded original.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0006_image_assets"
+down_revision: Union[str, Sequence[str], None] = "0005_listing_indexes"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    inspector = sa.inspect(op.get_bind())
+    if "image_asset" not in inspector.get_table_names():
+        op.create_table(
+            "image_asset",
+            sa.Column("id", sa.String(length=64), primary_key=True),
+            sa.Column("filename", sa.String(), nullable=False),
+            sa.Column("content_type", sa.String(), nullable=False),
+            sa.Column("size_bytes", sa.Integer(), nullable=False),
+            sa.Column("width", sa.Integer(), nullable=True),
+            sa.Column("height", sa.Integer(), nullable=True),
+            sa.Column("status", sa.String(), nullable=False),
+            sa.Column("variants", sa.JSON(), nullable=True),
+            sa.Column("error", sa.String(), nullable=True),
+            sa.Column("created_at", sa.DateTime(), nullable=False),
+            sa.Column("updated_at", sa.DateTime(), nullable=False),
+        )
+    if "image_variants" not in {c["name"] for c in inspector.get_columns("project")}:
+        op.add_column("project", sa.Column("image_variants", sa.JSON(), nullable=True))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.batch_alter_table("project") as batch:
+        batch.drop_column("image_variants")
+    op.drop_table("image_asset")
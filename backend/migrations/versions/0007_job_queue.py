@@ -0,0 +1,53 @@
+"""Persistent queue for write side effects.
+
+Revision ID: 0007_job_queue
+Revises: 0006_image_assets
+Create Date: 2026-10-18 00:00:00.000000
+
+Rows are inserted by write handlers in their own transaction and claimed by
+the API's job workers (app/db/jobs.py). The partial unique index on key keeps
+one queued job per key, which is what coalesces repeated enqueues.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0007_job_queue"
+down_revision: Union[str, Sequence[str], None] = "0006_image_assets"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+QUEUED = sa.text("status = 'queued'")
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    if "job" in sa.inspect(op.get_bind()).get_table_names():
+        return
+    op.create_table(
+        "job",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("kind", sa.String(), nullable=False),
+        sa.Column("key", sa.String(), nullable=False),
+        sa.Column("payload", sa.JSON(), nullable=True),
+        sa.Column("status", sa.String(), nullable=False),
+        sa.Column("attempts", sa.Integer(), nullable=False),
+        sa.Column("coalesced", sa.Integer(), nullable=False),
+        sa.Column("run_after", sa.DateTime(), nullable=False),
+        sa.Column("created_at", sa.DateTime(), nullable=False),
+        sa.Column("started_at", sa.DateTime(), nullable=True),
+        sa.Column("finished_at", sa.DateTime(), nullable=True),
+        sa.Column("last_error", sa.String(), nullable=True),
+    )
+    op.create_index("ix_job_status_run_after", "job", ["status", "run_after"])
+    op.create_index("uq_job_queued_key", "job", ["key"], unique=True, sqlite_where=QUEUED, postgresql_where=QUEUED)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index("uq_job_queued_key", table_name="job")
+    op.drop_index("ix_job_status_run_after", table_name="job")
+    op.drop_table("job")
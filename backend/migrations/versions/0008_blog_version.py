@@ -0,0 +1,31 @@
+"""Version counter on blog posts, for optimistic concurrency on edits.
+
+Revision ID: 0008_blog_version
+Revises: 0007_job_queue
+Create Date: 2026-10-18 00:00:00.000000
+
+Existing posts start at version 1.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0008_blog_version"
+down_revision: Union[str, Sequence[str], None] = "0007_job_queue"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    if "version" not in {c["name"] for c in sa.inspect(op.get_bind()).get_columns("blog")}:
+        op.add_column("blog", sa.Column("version", sa.Integer(), nullable=False, server_default="1"))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.batch_alter_table("blog") as batch:
+        batch.drop_column("version")
@@ -0,0 +1,52 @@
+"""Precomputed related posts, and the tag-set index that keeps them current.
+
+Revision ID: 0009_blog_related
+Revises: 0008_blog_version
+Create Date: 2026-10-18 00:00:00.000000
+
+Lists are maintained by the related_posts job after each post write; fill
+them for existing posts with `python -m app.cli related-posts` (`seed` does
+so when the table is empty).
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0009_blog_related"
+down_revision: Union[str, Sequence[str], None] = "0008_blog_version"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    if "blog_related" in sa.inspect(op.get_bind()).get_table_names():
+        return
+    op.create_table(
+        "blog_tag_set",
+        sa.Column("blog_id", sa.Integer(), sa.ForeignKey("blog.id", ondelete="CASCADE"), primary_key=True),
+        sa.Column("tag_key", sa.String(), nullable=False),
+        sa.Column("is_published", sa.Boolean(), nullable=False),
+        sa.Column("created_at", sa.DateTime(), nullable=False),
+    )
+    op.create_index(
+        "ix_blog_tag_set_key_published_created_at", "blog_tag_set", ["tag_key", "is_published", "created_at", "blog_id"],
+    )
+    op.create_table(
+        "blog_related",
+        sa.Column("blog_id", sa.Integer(), sa.ForeignKey("blog.id", ondelete="CASCADE"), primary_key=True),
+        sa.Column("related_id", sa.Integer(), primary_key=True),
+        sa.Column("score", sa.Float(), nullable=False),
+    )
+    op.create_index("ix_blog_related_related_id", "blog_related", ["related_id"])
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index("ix_blog_related_related_id", table_name="blog_related")
+    op.drop_table("blog_related")
+    op.drop_index("ix_blog_tag_set_key_published_created_at", table_name="blog_tag_set")
+    op.drop_table("blog_tag_set")
@@ -0,0 +1,48 @@
+"""Archive and category rollups.
+
+Revision ID: 0010_rollups
+Revises: 0009_blog_related
+Create Date: 2026-10-18 00:00:00.000000
+
+Rows are kept current by the write handlers; fill them for existing posts and
+projects with `python -m app.cli rollups` (`seed` does so on every deploy).
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0010_rollups"
+down_revision: Union[str, Sequence[str], None] = "0009_blog_related"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    if "blog_archive" in sa.inspect(op.get_bind()).get_table_names():
+        return
+    op.create_table(
+        "blog_archive",
+        sa.Column("year", sa.Integer(), primary_key=True),
+        sa.Column("month", sa.Integer(), primary_key=True),
+        sa.Column("count", sa.Integer(), nullable=False),
+        sa.Column("ids", sa.JSON(), nullable=True),
+        sa.Column("updated_at", sa.DateTime(), nullable=False),
+    )
+    op.create_table(
+        "project_category",
+        sa.Column("category", sa.String(), primary_key=True),
+        sa.Column("count", sa.Integer(), nullable=False),
+        sa.Column("updated_at", sa.DateTime(), nullable=False),
+    )
+    op.create_index("ix_project_category", "project", ["category"])
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index("ix_project_category", table_name="project")
+    op.drop_table("project_category")
+    op.drop_table("blog_archive")
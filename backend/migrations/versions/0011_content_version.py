@@ -0,0 +1,40 @@
+"""Write-version counters for the list validators.
+
+Revision ID: 0011_content_version
+Revises: 0010_rollups
+Create Date: 2026-10-18 00:00:00.000000
+
+One row per collection, bumped by every write to it (app/db/versions.py).
+"""
+from datetime import datetime, timezone
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0011_content_version"
+down_revision: Union[str, Sequence[str], None] = "0010_rollups"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    if "content_version" in sa.inspect(op.get_bind()).get_table_names():
+        return
+    table = op.create_table(
+        "content_version",
+        sa.Column("scope", sa.String(), primary_key=True),
+        sa.Column("version", sa.Integer(), nullable=False),
+        sa.Column("changed_at", sa.DateTime(), nullable=False),
+    )
+    now = datetime.now(timezone.utc).replace(tzinfo=None)
+    op.bulk_insert(table, [{"scope": "blog", "version": 0, "changed_at": now},
+                           {"scope": "projects", "version": 0, "changed_at": now}])
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table("content_version")
@@ -0,0 +1,42 @@
+"""Tag -> tag set lookup for related-post updates.
+
+Revision ID: 0012_blog_tag_group
+Revises: 0011_content_version
+Create Date: 2026-10-18 00:00:00.000000
+
+A related_posts job finds the tag sets sharing a tag with a post by seeking
+on tag here, instead of aggregating all of blog_tag_set (app/db/related.py).
+Filled from the tag sets already in blog_tag_set.
+"""
+import json
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0012_blog_tag_group"
+down_revision: Union[str, Sequence[str], None] = "0011_content_version"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    if "blog_tag_group" in sa.inspect(op.get_bind()).get_table_names():
+        return
+    table = op.create_table(
+        "blog_tag_group",
+        sa.Column("tag", sa.String(), primary_key=True),
+        sa.Column("tag_key", sa.String(), primary_key=True),
+    )
+    keys = [row[0] for row in op.get_bind().execute(sa.text("SELECT DISTINCT tag_key FROM blog_tag_set"))]
+    rows = [{"tag": tag, "tag_key": key} for key in keys for tag in json.loads(key)]
+    if rows:
+        op.bulk_insert(table, rows)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table("blog_tag_group")
@@ -0,0 +1,44 @@
+"""
+Tests run the real app code against a throwaway database: a temporary SQLite
+file, or TEST_DATABASE_URL (an empty Postgres database, say). As with the
+benchmarks, the environment has to be set before anything under `app` is
+imported, because settings are read at import time.
+"""
+import os
+import tempfile
+
+os.environ["DATABASE_URL"] = os.environ.get("TEST_DATABASE_URL") or "sqlite:///" + os.path.join(
+    tempfile.mkdtemp(prefix="portfolio-test-"), "test.db")
+os.environ.setdefault("API_ADMIN_USERNAME", "test")
+os.environ.setdefault("API_ADMIN_PASSWORD", "test")
+os.environ["MEDIA_DIR"] = tempfile.mkdtemp(prefix="portfolio-test-media-")
+# Jobs are run by the tests that need them, not by background workers
+os.environ["JOB_WORKERS"] = "0"
+
+import pytest  # noqa: E402
+
+
+@pytest.fixture(scope="session")
+def engine():
+    """The sync engine, on a database migrated to head and seeded as a deploy would."""
+    from app.db.schema import upgrade_to_head
+    from app.db.seed import seed_database
+    from app.db.session import engine
+
+    upgrade_to_head()
+    seed_database(engine)
+    return engine
+
+
+@pytest.fixture
+def anyio_backend():
+    return "asyncio"
+
+
+@pytest.fixture
+async def async_engine(engine):
+    """The app's async engine; its pool is dropped after each test, since each test gets a fresh event loop."""
+    from app.db.session import async_engine
+
+    yield async_engine
+    await async_engine.dispose()
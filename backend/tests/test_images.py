@@ -0,0 +1,69 @@
+import io
+from datetime import timedelta
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlmodel import Session, select
+
+from app.core.config import settings
+from app.core.security import create_access_token
+from app.db.images import media_root
+from app.main import app
+from app.models.image import ImageAsset
+
+
+@pytest.fixture
+def client(engine):
+    token = create_access_token({"sub": settings.API_ADMIN_USERNAME}, timedelta(minutes=5))
+    with TestClient(app, headers={"Authorization": f"Bearer {token}"}) as client:
+        yield client
+
+
+def _png(color: str) -> bytes:
+    from PIL import Image
+
+    buffer = io.BytesIO()
+    Image.new("RGB", (4, 4), color).save(buffer, "PNG")
+    return buffer.getvalue()
+
+
+def _stored(engine) -> tuple[list[str], int]:
+    originals = media_root() / "originals"
+    files = sorted(path.name for path in originals.iterdir()) if originals.exists() else []
+    with Session(engine) as session:
+        return files, len(session.exec(select(ImageAsset.id)).all())
+
+
+def test_rejected_file_stores_nothing_from_the_request(client, engine):
+    before = _stored(engine)
+    response = client.post("/api/v1/images/", files=[
+        ("files", ("red.png", _png("red"), "image/png")),
+        ("files", ("notes.txt", b"not an image", "text/plain")),
+    ])
+    assert response.status_code == 415
+    assert _stored(engine) == before
+
+
+def test_oversized_file_stores_nothing_from_the_request(client, engine, monkeypatch):
+    monkeypatch.setattr(settings, "IMAGE_MAX_BYTES", len(_png("blue")) + 1)
+    before = _stored(engine)
+    response = client.post("/api/v1/images/", files=[
+        ("files", ("blue.png", _png("blue"), "image/png")),
+        ("files", ("big.png", b"\0" * (settings.IMAGE_MAX_BYTES + 1), "image/png")),
+    ])
+    assert response.status_code == 413
+    assert _stored(engine) == before
+
+
+def test_upload_stores_every_file(client, engine):
+    response = client.post("/api/v1/images/", files=[
+        ("files", ("green.png", _png("green"), "image/png")),
+        ("files", ("green-again.png", _png("green"), "image/png")),
+    ])
+    assert response.status_code == 202
+    [first, second] = response.json()
+    assert first["id"] == second["id"]
+    files, _ = _stored(engine)
+    assert [name for name in files if name.startswith(first["id"])] == [f"{first['id']}.png"]
+    # No temp files left over
+    assert not [name for name in files if name.startswith(".upload-")]
@@ -0,0 +1,73 @@
+import uuid
+from datetime import datetime, timezone
+
+import pytest
+from sqlalchemy import update
+from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from app.db import jobs
+from app.models.job import Job
+
+pytestmark = pytest.mark.anyio
+
+
+async def _jobs_with_key(async_engine, key: str) -> list[Job]:
+    async with AsyncSession(async_engine) as session:
+        return list((await session.exec(select(Job).where(Job.key == key).order_by(Job.id))).all())
+
+
+async def test_enqueue_coalesces_on_key(async_engine):
+    key = f"render_post:{uuid.uuid4()}"
+    async with AsyncSession(async_engine) as session:
+        await jobs.enqueue(session, "render_post", key, {"blog_id": 1}, delay=3600)
+        await session.commit()
+    first_due = (await _jobs_with_key(async_engine, key))[0].run_after
+    async with AsyncSession(async_engine) as session:
+        await jobs.enqueue(session, "render_post", key, {"blog_id": 2}, delay=7200)
+        await jobs.enqueue(session, "render_post", key, {"blog_id": 3}, delay=7200)
+        await session.commit()
+
+    [job] = await _jobs_with_key(async_engine, key)
+    assert job.status == "queued"
+    assert job.coalesced == 2
+    # The newest payload wins; the first deadline stands
+    assert job.payload == {"blog_id": 3}
+    assert job.run_after == first_due
+
+
+async def test_enqueue_brings_the_deadline_forward(async_engine):
+    key = f"render_post:{uuid.uuid4()}"
+    async with AsyncSession(async_engine) as session:
+        await jobs.enqueue(session, "render_post", key, {"blog_id": 1}, delay=3600)
+        await session.commit()
+    async with AsyncSession(async_engine) as session:
+        await jobs.enqueue(session, "render_post", key, {"blog_id": 1}, delay=60)
+        await session.commit()
+
+    [job] = await _jobs_with_key(async_engine, key)
+    assert (jobs._utc(job.run_after) - jobs._utc(job.created_at)).total_seconds() == pytest.approx(60, abs=5)
+
+
+async def test_enqueue_while_running_queues_a_new_job(async_engine):
+    key = f"render_post:{uuid.uuid4()}"
+    async with AsyncSession(async_engine) as session:
+        await jobs.enqueue(session, "render_post", key, {"blog_id": 1}, delay=0)
+        # Due before anything other tests queued, so it is the one claimed
+        await session.execute(update(Job).where(Job.key == key).values(run_after=datetime(2000, 1, 1, tzinfo=timezone.utc)))
+        await session.commit()
+    claimed = await jobs._claim(async_engine)
+    assert claimed is not None and claimed.key == key
+
+    # The running job may have read the row before this write
+    async with AsyncSession(async_engine) as session:
+        await jobs.enqueue(session, "render_post", key, {"blog_id": 1}, delay=3600)
+        await session.commit()
+    assert [(job.status, job.coalesced) for job in await _jobs_with_key(async_engine, key)] == [
+        ("running", 0), ("queued", 0)]
+
+
+async def test_enqueue_rejects_unknown_kinds(async_engine):
+    async with AsyncSession(async_engine) as session:
+        with pytest.raises(ValueError):
+            await jobs.enqueue(session, "no_such_job")
@@ -0,0 +1,27 @@
+from datetime import timedelta
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.core.security import create_access_token
+from app.main import app
+
+
+def _get_metrics(host: str, **headers) -> int:
+    # No lifespan: /metrics needs neither the database nor the job workers
+    return TestClient(app, client=(host, 50000)).get("/metrics", headers=headers).status_code
+
+
+@pytest.mark.parametrize("host, status", [("127.0.0.1", 200), ("::1", 200), ("203.0.113.9", 403), ("172.18.0.3", 403)])
+def test_metrics_allow_list(host, status):
+    assert _get_metrics(host) == status
+
+
+def test_metrics_for_the_admin():
+    token = create_access_token({"sub": "test"}, timedelta(minutes=5))
+    assert _get_metrics("203.0.113.9", Authorization=f"Bearer {token}") == 200
+    assert _get_metrics("203.0.113.9", Authorization="Bearer not-a-token") == 403
+
+
+def test_metrics_ignores_forwarded_addresses_from_untrusted_peers():
+    assert _get_metrics("203.0.113.9", **{"X-Real-IP": "127.0.0.1"}) == 403
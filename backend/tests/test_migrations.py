@@ -0,0 +1,11 @@
+from alembic import command
+from alembic.config import Config
+
+from app.db.schema import BACKEND_DIR
+
+
+def test_models_match_the_migrated_schema(engine):
+    """`alembic check`: nothing for autogenerate to add or drop, search structures and partial indexes included."""
+    config = Config(str(BACKEND_DIR / "alembic.ini"))
+    config.attributes["configure_logger"] = False
+    command.check(config)
@@ -0,0 +1,128 @@
+import pytest
+
+from app.core.patch import PatchError, PatchTestFailed, apply_content_diff, apply_json_patch, apply_splices
+
+DOCUMENT = {"title": "Post", "excerpt": "", "content": "Hello", "tags": ["a", "b"], "is_published": True}
+
+
+def test_patch_is_applied_to_a_copy():
+    patched = apply_json_patch(DOCUMENT, [{"op": "add", "path": "/tags/-", "value": "c"}])
+    assert patched["tags"] == ["a", "b", "c"]
+    assert DOCUMENT["tags"] == ["a", "b"]
+
+
+def test_failed_patch_applies_nothing():
+    document = {"tags": ["a"]}
+    with pytest.raises(PatchError):
+        apply_json_patch(document, [{"op": "add", "path": "/tags/-", "value": "b"}, {"op": "remove", "path": "/nope"}])
+    assert document == {"tags": ["a"]}
+
+
+@pytest.mark.parametrize("path, tags", [
+    ("/tags/-", ["a", "b", "c"]),
+    ("/tags/0", ["c", "a", "b"]),
+    ("/tags/2", ["a", "b", "c"]),
+])
+def test_add_to_array(path, tags):
+    assert apply_json_patch(DOCUMENT, [{"op": "add", "path": path, "value": "c"}])["tags"] == tags
+
+
+@pytest.mark.parametrize("operation", [
+    {"op": "remove", "path": "/tags/-"},
+    {"op": "replace", "path": "/tags/-", "value": "c"},
+    {"op": "test", "path": "/tags/-", "value": "b"},
+    {"op": "add", "path": "/tags/3", "value": "c"},
+    {"op": "add", "path": "/tags/01", "value": "c"},
+])
+def test_array_index_out_of_range_or_invalid(operation):
+    with pytest.raises(PatchError):
+        apply_json_patch(DOCUMENT, [operation])
+
+
+def test_move_into_itself_is_rejected():
+    document = {"a": {"b": {}}}
+    with pytest.raises(PatchError, match="into itself"):
+        apply_json_patch(document, [{"op": "move", "from": "/a", "path": "/a/b/c"}])
+
+
+def test_move_onto_itself_and_next_to_itself():
+    document = {"a": {"b": 1}, "ab": 2}
+    assert apply_json_patch(document, [{"op": "move", "from": "/a", "path": "/a"}]) == document
+    # A shared string prefix isn't a shared path
+    assert apply_json_patch(document, [{"op": "move", "from": "/a", "path": "/ab"}]) == {"ab": {"b": 1}}
+
+
+def test_move_within_array():
+    patched = apply_json_patch(DOCUMENT, [{"op": "move", "from": "/tags/0", "path": "/tags/-"}])
+    assert patched["tags"] == ["b", "a"]
+
+
+@pytest.mark.parametrize("actual, expected", [
+    (True, 1),
+    (1, True),
+    (False, 0),
+    (0, False),
+    ([1], [True]),
+    ({"x": True}, {"x": 1}),
+])
+def test_test_op_tells_booleans_from_numbers(actual, expected):
+    with pytest.raises(PatchTestFailed):
+        apply_json_patch({"value": actual}, [{"op": "test", "path": "/value", "value": expected}])
+
+
+@pytest.mark.parametrize("actual, expected", [
+    (True, True),
+    (1, 1.0),
+    ([1, {"x": False}], [1, {"x": False}]),
+    ({"x": [True]}, {"x": [True]}),
+])
+def test_test_op_matches_equal_values(actual, expected):
+    apply_json_patch({"value": actual}, [{"op": "test", "path": "/value", "value": expected}])
+
+
+def test_splices_are_applied_in_order():
+    assert apply_splices("Hello world", [[0, 5, "Goodbye"], [6, 11, "moon"], [11, 11, "!"]]) == "Goodbye moon!"
+
+
+@pytest.mark.parametrize("splices", [
+    [[3, 2, ""]],
+    [[0, 12, ""]],
+    [[4, 6, ""], [5, 7, ""]],
+    [[True, 1, ""]],
+    [[0, 1]],
+])
+def test_bad_splices(splices):
+    with pytest.raises(PatchError):
+        apply_splices("Hello world", splices)
+
+
+def test_splice_offsets_count_utf16_code_units():
+    # The emoji is two UTF-16 code units (a surrogate pair), as in a JavaScript string
+    text = "a😀b😀c"
+    assert apply_splices(text, [[3, 4, "B"]]) == "a😀B😀c"
+    assert apply_splices(text, [[1, 3, ""], [6, 7, "C"]]) == "ab😀C"
+    assert apply_splices(text, [[7, 7, "!"]]) == text + "!"
+    with pytest.raises(PatchError):
+        apply_splices(text, [[0, 8, ""]])
+
+
+def test_splice_offsets_without_astral_characters():
+    assert apply_splices("café", [[3, 4, "e"]]) == "cafe"
+
+
+@pytest.mark.parametrize("splices", [
+    [[2, 2, "x"]],
+    [[0, 2, ""]],
+    [[2, 4, ""]],
+])
+def test_splitting_a_surrogate_pair_is_an_error(splices):
+    with pytest.raises(PatchError, match="splits a character"):
+        apply_splices("a😀b", splices)
+
+
+def test_content_diff():
+    patched = apply_content_diff(DOCUMENT, {"content": [[5, 5, ", world"]], "title": "New"})
+    assert patched["content"] == "Hello, world"
+    assert patched["title"] == "New"
+    with pytest.raises(PatchError, match="unknown field"):
+        apply_content_diff(DOCUMENT, {"slug": "x"})
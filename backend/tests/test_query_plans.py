@@ -0,0 +1,78 @@
+"""
+The blog and project list queries are served by their composite indexes.
+
+EXPLAINs the exact statements the endpoints build (`list_posts_statement` /
+`list_projects_statement`) over a seeded fixture and checks the plan names the
+expected index for the database's dialect.
+"""
+from datetime import datetime, timezone
+
+import pytest
+
+from benchmarks.common import seed_posts, seed_projects
+
+POSTS = 20_000
+PROJECTS = 2_000
+
+# check -> index, per dialect
+EXPECTED_INDEXES = {
+    "sqlite": {
+        "public list, page 1": "ix_blog_published_created_at_id",
+        "public list, cursor": "ix_blog_published_created_at_id",
+        "admin list, page 1": "ix_blog_created_at_id",
+        "admin list, cursor": "ix_blog_created_at_id",
+        "projects list": "ix_project_order_updated_at",
+    },
+    "postgresql": {
+        "public list, page 1": "ix_blog_published_created_at_id",
+        "public list, cursor": "ix_blog_published_created_at_id",
+        "admin list, page 1": "ix_blog_created_at_id",
+        "admin list, cursor": "ix_blog_created_at_id",
+        "projects list": "ix_project_order_updated_at",
+    },
+}
+
+
+def _statements() -> dict:
+    from app.api.v1.endpoints.blog import BLOG_SUMMARY_FIELDS, list_posts_statement
+    from app.api.v1.endpoints.projects import PROJECT_READ_FIELDS, list_projects_statement
+    from app.db.tags import TagFilter
+
+    no_tags = TagFilter(any=(), all=())
+    after = (datetime(2016, 1, 1, tzinfo=timezone.utc), POSTS // 2)
+
+    def posts(published, after):
+        return list_posts_statement(BLOG_SUMMARY_FIELDS, published=published, tags=no_tags, after=after, page=1, size=12)
+
+    return {
+        "public list, page 1": posts(True, None),
+        "public list, cursor": posts(True, after),
+        "admin list, page 1": posts(False, None),
+        "admin list, cursor": posts(False, after),
+        "projects list": list_projects_statement(PROJECT_READ_FIELDS, no_tags),
+    }
+
+
+def _explain(connection, statement) -> str:
+    sql = str(statement.compile(dialect=connection.dialect, compile_kwargs={"literal_binds": True}))
+    if connection.dialect.name == "sqlite":
+        return "\n".join(row[-1] for row in connection.exec_driver_sql(f"EXPLAIN QUERY PLAN {sql}"))
+    return "\n".join(row[0] for row in connection.exec_driver_sql(f"EXPLAIN {sql}"))
+
+
+@pytest.fixture(scope="module")
+def plans(engine) -> dict[str, str]:
+    if engine.dialect.name not in EXPECTED_INDEXES:
+        pytest.skip(f"no expected plans for {engine.dialect.name}")
+    # Numbered after anything already there, so other tests' rows are left alone
+    seed_posts(engine, POSTS, start_at=1_000_000)
+    seed_projects(engine, PROJECTS, start_at=1_000_000)
+    with engine.begin() as connection:
+        connection.exec_driver_sql("ANALYZE")
+        return {name: _explain(connection, statement) for name, statement in _statements().items()}
+
+
+@pytest.mark.parametrize("check", list(EXPECTED_INDEXES["sqlite"]))
+def test_list_query_uses_index(plans, engine, check):
+    index = EXPECTED_INDEXES[engine.dialect.name][check]
+    assert index in plans[check], f"{check}: expected {index}, got plan:\n{plans[check]}"
@@ -0,0 +1,99 @@
+"""
+The related_posts job's incremental update (`update_related`) against a full
+rebuild: after any sequence of writes, each followed by its update, the lists
+and tag-set rows must be what `rebuild_related` computes from scratch.
+"""
+import json
+import random
+import uuid
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from app.core.config import settings
+from app.db.related import rebuild_related, update_related
+from app.models.blog import Blog, BlogRelated, BlogTagGroup, BlogTagSet
+
+pytestmark = pytest.mark.anyio
+
+START = datetime(2020, 1, 1, tzinfo=timezone.utc)
+
+
+def _stored(engine, ids: set[int]) -> tuple[dict, dict]:
+    """{blog_id: [(score, related_id)] best first} and {blog_id: (tag_key, is_published)} for `ids`."""
+    from sqlmodel import Session
+
+    with Session(engine) as session:
+        lists: dict[int, list] = {}
+        for blog_id, score, related_id in session.exec(
+            select(BlogRelated.blog_id, BlogRelated.score, BlogRelated.related_id)
+            .where(BlogRelated.blog_id.in_(ids))
+        ):
+            lists.setdefault(blog_id, []).append((round(score, 9), related_id))
+        sets = {
+            blog_id: (tag_key, bool(is_published))
+            for blog_id, tag_key, is_published in session.exec(
+                select(BlogTagSet.blog_id, BlogTagSet.tag_key, BlogTagSet.is_published).where(BlogTagSet.blog_id.in_(ids))
+            )
+        }
+    return {blog_id: sorted(entries, reverse=True) for blog_id, entries in lists.items()}, sets
+
+
+def _groups(engine, tags: list[str]) -> set[tuple[str, str]]:
+    from sqlmodel import Session
+
+    with Session(engine) as session:
+        return set(session.exec(select(BlogTagGroup.tag, BlogTagGroup.tag_key).where(BlogTagGroup.tag.in_(tags))).all())
+
+
+async def test_incremental_updates_match_a_rebuild(engine, async_engine):
+    rng = random.Random(23)
+    # Tags nobody else uses, so these posts only relate to each other
+    tags = [f"t{n}-{uuid.uuid4().hex[:8]}" for n in range(4)]
+
+    def random_post_fields() -> dict:
+        return {
+            "tags": rng.sample(tags, rng.randint(0, 3)),
+            "is_published": rng.random() < 0.8,
+            "created_at": START + timedelta(days=rng.randint(0, 720), seconds=rng.randint(0, 3)),
+        }
+
+    ids: set[int] = set()
+    live: list[int] = []
+    for step in range(120):
+        async with AsyncSession(async_engine) as session:
+            action = rng.random() if live else 0.0
+            if action < 0.45:
+                blog = Blog(title=f"Post {step}", content="", **random_post_fields())
+                session.add(blog)
+                await session.flush()
+                blog_id = blog.id
+                await session.commit()
+                ids.add(blog_id)
+                live.append(blog_id)
+            elif action < 0.9:
+                blog_id = rng.choice(live)
+                blog = await session.get(Blog, blog_id)
+                field, value = rng.choice(list(random_post_fields().items()))
+                setattr(blog, field, value)
+                session.add(blog)
+                await session.commit()
+            else:
+                blog_id = live.pop(rng.randrange(len(live)))
+                await session.delete(await session.get(Blog, blog_id))
+                await session.commit()
+            await update_related(session, blog_id)
+            await session.commit()
+
+    # Enough posts that lists fill up, and entries have to be dropped and refilled
+    assert len(ids) > 2 * settings.RELATED_POSTS
+    incremental = _stored(engine, ids)
+    assert incremental[0]
+    # Every tag set in use can be found from each of its tags (empty groups may linger until met)
+    assert _groups(engine, tags) >= {(tag, key) for key, _ in incremental[1].values() for tag in json.loads(key)}
+    rebuild_related(engine)
+    rebuilt = _stored(engine, ids)
+    assert incremental == rebuilt
+    assert _groups(engine, tags) == {(tag, key) for key, _ in rebuilt[1].values() for tag in json.loads(key)}
@@ -0,0 +1,37 @@
+/**
+ * Compact edits for PATCH /api/v1/blog/{id}/delta (application/x-content-diff+json).
+ *
+ * A diff is an object of the fields that changed, except `content`, which is sent as
+ * [start, end, text] splices against the version the editor started from. Offsets are
+ * JavaScript string indexes (UTF-16 code units), which is what the backend expects.
+ */
+export type Splice = [start: number, end: number, text: string]
+
+export const CONTENT_DIFF_MEDIA_TYPE = 'application/x-content-diff+json'
+
+/** The single splice that turns `before` into `after` (everything between their common prefix and suffix). */
+export function contentSplice(before: string, after: string): Splice | null {
+  if (before === after) return null
+  const limit = Math.min(before.length, after.length)
+  let prefix = 0
+  while (prefix < limit && before.charCodeAt(prefix) === after.charCodeAt(prefix)) prefix++
+  let suffix = 0
+  while (
+    suffix < limit - prefix &&
+    before.charCodeAt(before.length - 1 - suffix) === after.charCodeAt(after.length - 1 - suffix)
+  ) {
+    suffix++
+  }
+  // Never cut a surrogate pair (emoji) in half
+  if (prefix > 0 && isHighSurrogate(before.charCodeAt(prefix - 1))) prefix--
+  if (suffix > 0 && isLowSurrogate(before.charCodeAt(before.length - suffix))) suffix--
+  return [prefix, before.length - suffix, after.slice(prefix, after.length - suffix)]
+}
+
+function isHighSurrogate(code: number): boolean {
+  return code >= 0xd800 && code <= 0xdbff
+}
+
+function isLowSurrogate(code: number): boolean {
+  return code >= 0xdc00 && code <= 0xdfff
+}
@@ -1,6 +1,8 @@
 import { reactive } from 'vue'
+import axios from 'axios'
 import { toast } from 'vue-sonner'
 import { i18n } from '@/i18n'
+import { apiBaseUrl } from '@/config/site'
 
 export const auth = reactive({
   // check if there is an old token in localStorage
@@ -19,6 +21,14 @@ export const auth = reactive({
 
   // after logout, call: clear token and show toast (no redirect)
   logout() {
+    // revoke the token server-side too; the local logout doesn't wait for it
+    if (this.token) {
+      axios
+        .post(`${apiBaseUrl}/api/v1/login/logout`, null, {
+          headers: { Authorization: `Bearer ${this.token}` },
+        })
+        .catch(() => {})
+    }
     this.token = null
     localStorage.removeItem('admin_token')
     const t = i18n.global.t.bind(i18n.global)
@@ -1,3 +1,10 @@
+export interface PostLink {
+    id: number
+    title: string
+    excerpt?: string | null
+    created_at: string
+}
+
 export interface Post {
     id: number
     title: string
@@ -7,4 +14,7 @@ export interface Post {
     is_published?: boolean
     created_at?: string
     updated_at?: string
-}
\ No newline at end of file
+    version?: number
+    related?: PostLink[]
+    adjacent?: { previous: PostLink | null, next: PostLink | null }
+}
@@ -1,12 +1,22 @@
+/** Resized copies of an uploaded image (backend ImageVariants). */
+export interface ImageVariants {
+    width: number;
+    height: number;
+    placeholder: string;  // tiny blurred WebP data: URI
+    src: string;
+    srcset: Record<string, string>;  // MIME type -> "url 320w, url 640w, ..."
+}
+
 export interface Project {
     id: number;
     title: string;
     description: string;
     category: string;
     image: string;
+    image_variants?: ImageVariants | null;
     tags: string[];
     github_url?: string;
     live_url?: string;
     updated_at: string;
-    order: string;
+    order: number;
 }
\ No newline at end of file